@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+import pytest
+import requests
+import swagger_client
+from tests.helper.classes.junit_generator import JUnitGenerator
+
+# The shape of the generated JUnitXML files. (Only the number of 'testcase' elements changes between benchmarks)
+JUNIT_GENERATOR_OPTIONS = {'step_ratio': 0.2,
+                           'steps_per_case': 5,
+                           'failure_rate': 0.1,
+                           'skip_rate': 0.05,
+                           'failure_output_size': 1024,
+                           'jira_count': 2,
+                           'seed': 0}
+
+
+# ======================================================================================================================
+# Hooks
+# ======================================================================================================================
+def pytest_addoption(parser):
+    """Add the options of the benchmark suite."""
+
+    parser.addoption('--testcase-counts',
+                     default='1000,10000,100000',
+                     help="A comma separated list of the number of 'testcase' elements to benchmark")
+
+
+def pytest_generate_tests(metafunc):
+    """Run every benchmark that uses the 'testcase_count' fixture once per number of 'testcase' elements."""
+
+    if 'testcase_count' in metafunc.fixturenames:
+        counts = [int(count) for count in metafunc.config.getoption('testcase_counts').split(',')]
+        metafunc.parametrize('testcase_count', counts, scope='session')
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the memory used by every phase of the pipeline."""
+
+    report = getattr(terminalreporter.config, '_memory_report', None)
+    if not report:
+        return
+
+    terminalreporter.section('memory (MB)')
+    row = '{:<24}{:>12}{:>12}{:>12}{:>14}'
+    terminalreporter.write_line(row.format('Phase', 'Testcases', 'Peak', 'Retained', 'RSS growth'))
+    for result in report:
+        rss_growth = '{:.1f}'.format(result['rss_growth']) if result['rss_growth'] is not None else '-'
+        terminalreporter.write_line(row.format(result['phase'],
+                                               result['testcases'],
+                                               '{:.1f}'.format(result['peak']),
+                                               '{:.1f}'.format(result['retained']),
+                                               rss_growth))
+
+
+# ======================================================================================================================
+# Fixtures
+# ======================================================================================================================
+@pytest.fixture(scope='session')
+def junit_xml_file(tmpdir_factory, testcase_count):
+    """A synthetic JUnitXML file with 'testcase_count' testcase elements.
+
+    Returns:
+        str: The path of the file.
+    """
+
+    file_path = tmpdir_factory.mktemp('data').join('junit_{}.xml'.format(testcase_count)).strpath
+    JUnitGenerator(testcase_count, **JUNIT_GENERATOR_OPTIONS).write(file_path)
+
+    return file_path
+
+
+@pytest.fixture(scope='session')
+def config_file(tmpdir_factory):
+    """A ZigZag config file.
+
+    Returns:
+        str: The path of the file.
+    """
+
+    config = {'zigzag': {'test_cycle': 'pike',
+                         'project_id': '12345',
+                         'build_url': 'https://bar.com/foo',
+                         'build_number': '78',
+                         'module_hierarchy': ['one', 'two', 'three'],
+                         'path_to_test_exec_dir': ''}}
+    config_path = tmpdir_factory.mktemp('data').join('conf.json').strpath
+
+    with open(config_path, 'w') as f:
+        json.dump(config, f)
+
+    return config_path
+
+
+@pytest.fixture(scope='session')
+def memory_report(request):
+    """The memory used by every phase of the pipeline which is printed at the end of the session.
+
+    Returns:
+        list(dict): The results of the memory benchmarks.
+    """
+
+    request.config._memory_report = []
+
+    return request.config._memory_report
+
+
+@pytest.fixture
+def mock_qtest(mocker):
+    """Mock every qTest request made while parsing and generating test logs so that only zigzag is measured."""
+
+    mock_post_response = mocker.Mock(spec=requests.Response)
+    mock_post_response.text = json.dumps({'items': [], 'total': 0})
+    mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+    mock_field_resp.id = 12345
+    mock_field_resp.label = 'Failure Output'
+    mock_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+    mock_tc_resp.to_dict.return_value = {'name': 'pike', 'pid': 'CL-1', 'id': 1}
+
+    mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+    mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
+    # the in memory parser is measured at every size so the guard that sends large files to the streaming parser
+    # is lifted
+    mocker.patch('zigzag.xml_parsing_facade.XmlParsingFacade._MAX_FILE_SIZE', float('inf'))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import sys
+import timeit
+import subprocess
+
+MAX_IMPORT_TIME_RATIO = 2.0     # 'import zigzag.cli' may only be this many times slower than 'import click'
+
+
+# ======================================================================================================================
+# Helpers
+# ======================================================================================================================
+def _best_import_time(statement, repeat=10):
+    """Measure the best wall time it takes a fresh interpreter to run an import statement
+
+    Args:
+        statement (str): the import statement
+        repeat (int): the number of measurements
+
+    Returns:
+        float: the best measurement in seconds
+    """
+
+    return min(timeit.repeat(lambda: subprocess.check_call([sys.executable, '-c', statement]), number=1, repeat=repeat))
+
+
+# ======================================================================================================================
+# Benchmarks
+# ======================================================================================================================
+def test_import_time():
+    """Verify that importing the CLI costs about as much as importing click"""
+
+    baseline = _best_import_time('import click')
+    observed = _best_import_time('import zigzag.cli')
+
+    assert observed < baseline * MAX_IMPORT_TIME_RATIO, \
+        "'import zigzag.cli' took {:.3f}s which is more than {} times the {:.3f}s of 'import click'".format(
+            observed, MAX_IMPORT_TIME_RATIO, baseline)
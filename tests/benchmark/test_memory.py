@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import sys
+import json
+import pytest
+import subprocess
+from zigzag.zigzag import ZigZag
+from zigzag.zigzag_test_log import ZigZagTestLogs
+
+tracemalloc = pytest.importorskip('tracemalloc')    # Python 3 only
+
+MB = 1024 * 1024
+
+# The most memory in MB that every phase may allocate while it runs (peak) and keep alive once it finished (retained)
+# for each number of 'testcase' elements. Memory allocated by libxml2 for the lxml tree is not traced by tracemalloc
+# so it only shows up in the growth of the peak RSS of the process which is reported but not budgeted.
+BUDGETS = {
+    'read': {1000: {'peak': 2, 'retained': 2},
+             10000: {'peak': 14, 'retained': 14},
+             100000: {'peak': 135, 'retained': 135}},
+    'validate': {1000: {'peak': 1, 'retained': 1},
+                 10000: {'peak': 1, 'retained': 1},
+                 100000: {'peak': 1, 'retained': 1}},
+    'test_logs': {1000: {'peak': 3, 'retained': 3},
+                  10000: {'peak': 22, 'retained': 22},
+                  100000: {'peak': 220, 'retained': 220}},
+    'generate_auto_request': {1000: {'peak': 9, 'retained': 5},
+                              10000: {'peak': 70, 'retained': 25},
+                              100000: {'peak': 680, 'retained': 230}},
+}
+
+# The most the peak RSS of a fresh process may grow in MB while it parses and creates the test logs with 'stream=True'
+# for each number of 'testcase' elements. Streaming frees every 'testcase' element once its test log was created so
+# the growth must stay well below the growth of the in memory parser which keeps the whole tree.
+STREAM_RSS_BUDGETS = {1000: 8, 10000: 50, 100000: 450}
+
+# Parse a JUnitXML file in a fresh process and report the memory used while parsing as JSON. The peak RSS is read from
+# 'VmHWM' because 'ru_maxrss' keeps the peak of the parent process across 'exec'.
+_PARSE_SCRIPT = """
+import re, sys, json, tracemalloc
+from zigzag.zigzag import ZigZag
+
+def peak_rss():
+    with open('/proc/self/status') as f:
+        return int(re.search(r'VmHWM:\\s+(\\d+) kB', f.read()).group(1)) * 1024
+
+zz = ZigZag(sys.argv[1], sys.argv[2], 'totally_a_real_token', stream=sys.argv[3] == 'stream')
+zz._parsing_facade._MAX_FILE_SIZE = float('inf')
+rss_before = peak_rss()
+tracemalloc.start()
+zz.parse()
+retained, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+print(json.dumps({'peak': peak, 'retained': retained, 'rss_growth': peak_rss() - rss_before}))
+"""
+
+
+# ======================================================================================================================
+# Helpers
+# ======================================================================================================================
+def _peak_rss():
+    """Get the peak resident set size of the process in MB or None if the platform does not report it.
+
+    Returns:
+        float
+    """
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0   # KB on Linux
+
+
+def _measure(phase, func, *args):
+    """Trace the Python memory allocated by a single phase of the pipeline.
+
+    Tracing restarts for every phase so the peak and retained memory of a phase do not include the memory of the
+    phases before it.
+
+    Args:
+        phase (str): The name of the phase.
+        func (callable): The function that runs the phase.
+        *args: The arguments of the function.
+
+    Returns:
+        dict: The 'phase', 'peak' and 'retained' memory in MB and the growth of the peak RSS of the process in MB.
+    """
+
+    rss_before = _peak_rss()
+    tracemalloc.start()
+    try:
+        func(*args)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    rss_after = _peak_rss()
+
+    return {'phase': phase,
+            'peak': peak / float(MB),
+            'retained': retained / float(MB),
+            'rss_growth': rss_after - rss_before if rss_before is not None else None}
+
+
+def _measure_parse_process(junit_xml_file, config_file, mode):
+    """Measure the memory used to parse a JUnitXML file in a fresh process so the peak RSS only covers the parse.
+
+    Args:
+        junit_xml_file (str): The path of the JUnitXML file.
+        config_file (str): The path of the ZigZag config file.
+        mode (str): 'stream' to parse incrementally or 'memory' to parse the whole tree.
+
+    Returns:
+        dict: The 'phase', 'peak' and 'retained' memory in MB and the growth of the peak RSS of the process in MB.
+    """
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.check_output([sys.executable, '-c', _PARSE_SCRIPT, junit_xml_file, config_file, mode], env=env)
+    result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+    return {'phase': 'parse_{}'.format(mode),
+            'peak': result['peak'] / float(MB),
+            'retained': result['retained'] / float(MB),
+            'rss_growth': result['rss_growth'] / float(MB)}
+
+
+def _test_logs(zz):
+    """Create the test logs of a JUnitXML file that was already read and validated like ZigZag.parse does.
+
+    Args:
+        zz (ZigZag): The mediator.
+    """
+
+    ZigZagTestLogs(zz)
+    zz.testsuite_props = {p.attrib['name']: p.attrib['value'] for p in zz.junit_xml.findall('./properties/property')}
+
+
+# ======================================================================================================================
+# Benchmarks
+# ======================================================================================================================
+def test_memory(junit_xml_file, config_file, testcase_count, mock_qtest, memory_report):
+    """Verify that every phase of the pipeline stays within the memory budget of its number of test cases."""
+
+    zz = ZigZag(junit_xml_file, config_file, 'totally_a_real_token')
+    parsing_facade = zz._parsing_facade
+
+    results = [_measure('read', parsing_facade._read, junit_xml_file),
+               _measure('validate', parsing_facade._validate),
+               _measure('test_logs', _test_logs, zz),
+               _measure('generate_auto_request', zz._generate_auto_request)]
+    memory_report.extend(dict(result, testcases=testcase_count) for result in results)
+
+    over_budget = []
+    for result in results:
+        budget = BUDGETS[result['phase']].get(testcase_count)
+        if budget is None:
+            continue    # only the reported numbers are useful for counts without a budget
+        for measure in ('peak', 'retained'):
+            if result[measure] > budget[measure]:
+                over_budget.append("{} {} {:.1f} MB > {} MB".format(
+                    result['phase'], measure, result[measure], budget[measure]))
+
+    assert not over_budget, "Memory budget exceeded for {} test cases:\n{}".format(testcase_count,
+                                                                                   '\n'.join(over_budget))
+
+
+def test_stream_memory(junit_xml_file, config_file, testcase_count, memory_report):
+    """Verify that parsing with 'stream=True' does not keep the 'testcase' elements alive."""
+
+    if not os.path.exists('/proc/self/status'):
+        pytest.skip('The peak RSS of a process is only read on Linux')
+
+    stream = _measure_parse_process(junit_xml_file, config_file, 'stream')
+    memory = _measure_parse_process(junit_xml_file, config_file, 'memory')
+    memory_report.extend(dict(result, testcases=testcase_count) for result in (stream, memory))
+
+    budget = STREAM_RSS_BUDGETS.get(testcase_count)
+    if budget is not None:
+        assert stream['rss_growth'] <= budget, "Streaming {} test cases grew the RSS by {:.1f} MB > {} MB".format(
+            testcase_count, stream['rss_growth'], budget)
+    assert stream['rss_growth'] < memory['rss_growth'] / 2, \
+        "Streaming grew the RSS by {:.1f} MB which is not far below the {:.1f} MB of the in memory parser".format(
+            stream['rss_growth'], memory['rss_growth'])
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+import pytest
+from lxml import etree
+from zigzag.zigzag import ZigZag
+from zigzag.zigzag_test_log import ZigZagTestLogs
+from tests.helper.classes.junit_generator import JUnitGenerator
+from tests.benchmark.conftest import JUNIT_GENERATOR_OPTIONS
+
+# Every phase is measured ten times on the same input so the fastest round, which the regression check compares, is
+# stable even though a single round of the largest files takes seconds
+ROUNDS = 10
+
+
+# The number of 'testcase' elements of the fixed document read by the calibration benchmark
+CALIBRATION_TESTCASES = 1000
+
+
+# ======================================================================================================================
+# Fixtures
+# ======================================================================================================================
+@pytest.fixture(scope='module')
+def calibration_document():
+    """A fixed JUnitXML document that the calibration benchmark reads.
+
+    Returns:
+        bytes
+    """
+
+    return ''.join(JUnitGenerator(CALIBRATION_TESTCASES, **JUNIT_GENERATOR_OPTIONS).generate()).encode('utf-8')
+
+
+# ======================================================================================================================
+# Helpers
+# ======================================================================================================================
+def _zigzag(junit_xml_file, config_file, stream=False):
+    """Create a ZigZag mediator for a JUnitXML file.
+
+    Returns:
+        ZigZag
+    """
+
+    return ZigZag(junit_xml_file, config_file, 'totally_a_real_token', stream=stream)
+
+
+# ======================================================================================================================
+# Benchmarks
+# ======================================================================================================================
+def test_calibration(benchmark, calibration_document):
+    """Measure a fixed workload that does not run zigzag so the other benchmarks can be compared between machines as
+    multiples of it. (See tests/helper/benchmark_baseline.py)"""
+
+    def _workload():
+        root = etree.fromstring(calibration_document)
+
+        return json.dumps([dict(element.attrib) for element in root.iter('testcase', 'property')])
+
+    benchmark.pedantic(_workload, rounds=ROUNDS * 3, warmup_rounds=1)
+
+
+def test_parse(benchmark, junit_xml_file, config_file, mock_qtest):
+    """Measure reading, validating and creating the test logs of a JUnitXML file in memory."""
+
+    def _setup():
+        return (_zigzag(junit_xml_file, config_file),), {}
+
+    benchmark.pedantic(ZigZag.parse, setup=_setup, rounds=ROUNDS)
+
+
+def test_parse_stream(benchmark, junit_xml_file, config_file, mock_qtest):
+    """Measure reading, validating and creating the test logs of a JUnitXML file incrementally."""
+
+    def _setup():
+        return (_zigzag(junit_xml_file, config_file, stream=True),), {}
+
+    benchmark.pedantic(ZigZag.parse, setup=_setup, rounds=ROUNDS)
+
+
+def test_test_logs(benchmark, junit_xml_file, config_file, mock_qtest):
+    """Measure creating the test logs of a JUnitXML file that was already read and validated."""
+
+    def _setup():
+        zz = _zigzag(junit_xml_file, config_file)
+        zz.parse()
+        zz.test_logs = []
+
+        return (zz,), {}
+
+    benchmark.pedantic(ZigZagTestLogs, setup=_setup, rounds=ROUNDS)
+
+
+def test_generate_auto_request(benchmark, junit_xml_file, config_file, mock_qtest):
+    """Measure converting the test logs into a qTest automation request."""
+
+    zz = _zigzag(junit_xml_file, config_file)
+    zz.parse()
+
+    benchmark.pedantic(zz._generate_auto_request, rounds=ROUNDS, warmup_rounds=1)
+
+
+def test_serialize_auto_request(benchmark, junit_xml_file, config_file, mock_qtest):
+    """Measure serializing a qTest automation request to the JSON sent to qTest."""
+
+    zz = _zigzag(junit_xml_file, config_file)
+    zz.parse()
+    auto_request = zz._generate_auto_request()
+    api_client = zz.qtest_session.api_client
+
+    def _serialize():
+        return json.dumps(api_client.sanitize_for_serialization(auto_request))
+
+    benchmark.pedantic(_serialize, rounds=ROUNDS)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from zigzag.zigzag import ZigZag
+from tests.helper.classes.junit_generator import JUnitGenerator
+from tests.helper.classes.fake_qtest_server import FakeQTestServer
+from tests.benchmark.conftest import JUNIT_GENERATOR_OPTIONS
+
+# The number of 'testcase' elements uploaded and the round trip time of the local qTest stand-in in seconds
+TESTCASES = 1000
+LATENCY = 0.02
+
+
+# ======================================================================================================================
+# Fixtures
+# ======================================================================================================================
+@pytest.fixture(scope='module')
+def throughput_junit_xml_file(tmpdir_factory):
+    """A synthetic JUnitXML file that is uploaded to the local qTest stand-in.
+
+    Returns:
+        str: The path of the file.
+    """
+
+    file_path = tmpdir_factory.mktemp('data').join('junit_throughput.xml').strpath
+    JUnitGenerator(TESTCASES, **dict(JUNIT_GENERATOR_OPTIONS, jira_pool=200)).write(file_path)
+
+    return file_path
+
+
+# ======================================================================================================================
+# Benchmarks
+# ======================================================================================================================
+@pytest.mark.parametrize('workers', [1, 4, 16])
+def test_upload_throughput(benchmark, throughput_junit_xml_file, config_file, workers):
+    """Measure uploading and linking the test results through a local qTest stand-in with network latency."""
+
+    fake_qtest = FakeQTestServer(latency=LATENCY)
+
+    def _upload():
+        zz = ZigZag(throughput_junit_xml_file, config_file, 'totally_a_real_token', max_concurrency=workers,
+                    pool_size=workers, qtest_url=fake_qtest.url)
+        zz.parse()
+        job_ids = zz.upload_test_results(batch_size=100, max_workers=workers)
+        zz.link_requirements(job_ids, max_workers=workers, incremental=False)
+
+    with fake_qtest:
+        benchmark.pedantic(_upload, rounds=1)
+
+        requests = sum(fake_qtest.request_counts.values())
+        benchmark.extra_info['requests'] = requests
+        benchmark.extra_info['requests_per_second'] = requests / benchmark.stats.stats.mean
+        benchmark.extra_info['testcases_per_second'] = TESTCASES / benchmark.stats.stats.mean
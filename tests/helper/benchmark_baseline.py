@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Check the results of the benchmarks against the committed baseline, or record a new baseline.
+
+The baseline stores the fastest round of every benchmark divided by the fastest round of a calibration benchmark of
+the same run so it does not depend on the machine.
+
+Example:
+    py.test tests/benchmark --benchmark-json=tests/benchmark/results.json
+    python -m tests.helper.benchmark_baseline tests/benchmark/results.json
+
+    # record the median of several runs as the new baseline
+    python -m tests.helper.benchmark_baseline --record results_1.json results_2.json results_3.json
+"""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import sys
+import json
+import click
+from tests.helper.classes.benchmark_baseline import CALIBRATION_BENCHMARK, normalize, median_ratios, compare, \
+    format_comparison
+
+# The committed baseline
+DEFAULT_BASELINE = 'tests/benchmark/baseline.json'
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.argument('results', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--baseline', type=click.Path(dir_okay=False), default=DEFAULT_BASELINE,
+              help='The baseline to check against or to record')
+@click.option('--tolerance', type=click.FloatRange(min=0), default=0.75,
+              help='The fraction by which a benchmark may get slower relative to the calibration benchmark')
+@click.option('--record', is_flag=True, default=False,
+              help='Record the results as the new baseline instead of checking them')
+def main(results, baseline, tolerance, record):
+    """Fail when a benchmark in RESULTS, one or more pytest-benchmark JSON reports, regressed against the baseline.
+
+    The median ratio of every benchmark across the reports is used.
+    """
+
+    runs = []
+    for path in results:
+        with open(path) as f:
+            runs.append(normalize(json.load(f)))
+    ratios = median_ratios(runs)
+
+    if record:
+        with open(baseline, 'w') as f:
+            json.dump({'calibration': CALIBRATION_BENCHMARK, 'ratios': ratios}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        click.echo('Recorded the ratios of {} benchmarks in {}'.format(len(ratios), baseline))
+        return
+
+    with open(baseline) as f:
+        baseline_ratios = json.load(f)['ratios']
+
+    click.echo(format_comparison(ratios, baseline_ratios, tolerance))
+
+    if compare(ratios, baseline_ratios, tolerance):
+        click.echo(click.style('\nBenchmarks regressed by more than {:.0%}!'.format(tolerance), fg='red'))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
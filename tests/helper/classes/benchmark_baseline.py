@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+
+# The benchmark every other benchmark is divided by. (It does not run any zigzag code)
+CALIBRATION_BENCHMARK = 'test_calibration'
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def normalize(results, calibration=CALIBRATION_BENCHMARK):
+    """Divide the fastest round of every benchmark by the fastest round of the calibration benchmark of the same run.
+
+    The ratios only change when zigzag gets slower or faster relative to a fixed workload so they can be compared
+    between machines.
+
+    Args:
+        results (dict): The JSON report written by pytest-benchmark with '--benchmark-json'.
+        calibration (str): The name of the calibration benchmark.
+
+    Returns:
+        dict(str: float): The ratio of every benchmark except the calibration benchmark.
+
+    Raises:
+        RuntimeError: The calibration benchmark did not run.
+    """
+
+    minimums = {benchmark['name']: benchmark['stats']['min'] for benchmark in results['benchmarks']}
+    if not minimums.get(calibration):
+        raise RuntimeError("The '{}' benchmark is missing from the results!".format(calibration))
+
+    return {name: minimum / minimums[calibration] for name, minimum in minimums.items() if name != calibration}
+
+
+def median_ratios(runs):
+    """Combine the ratios of several runs into the median ratio of every benchmark so a noisy run does not move them.
+
+    Args:
+        runs (list(dict(str: float))): The ratios of every run. (See 'normalize')
+
+    Returns:
+        dict(str: float)
+    """
+
+    ratios = {}
+    for run in runs:
+        for name, ratio in run.items():
+            ratios.setdefault(name, []).append(ratio)
+
+    return {name: _median(values) for name, values in ratios.items()}
+
+
+def compare(ratios, baseline, tolerance):
+    """Compare the ratios of a run to the ratios of the baseline.
+
+    Only the benchmarks in both are compared so a quicker run with fewer testcase counts can be checked as well.
+
+    Args:
+        ratios (dict(str: float)): The ratios of the run. (See 'normalize')
+        baseline (dict(str: float)): The ratios of the baseline.
+        tolerance (float): The fraction by which a ratio may grow before it is a regression.
+
+    Returns:
+        list(tuple(str, float, float)): The name, baseline ratio and ratio of every regressed benchmark.
+    """
+
+    return [(name, baseline[name], ratios[name]) for name in sorted(set(ratios) & set(baseline))
+            if ratios[name] > baseline[name] * (1 + tolerance)]
+
+
+def format_comparison(ratios, baseline, tolerance):
+    """Format the comparison of a run to the baseline as text.
+
+    Args:
+        ratios (dict(str: float)): The ratios of the run. (See 'normalize')
+        baseline (dict(str: float)): The ratios of the baseline.
+        tolerance (float): The fraction by which a ratio may grow before it is a regression.
+
+    Returns:
+        str
+    """
+
+    regressed = set(name for name, _, _ in compare(ratios, baseline, tolerance))
+    row = '{:<40}{:>12}{:>12}{:>10}  {}'
+    lines = [row.format('Benchmark', 'Baseline', 'Ratio', 'Change', '')]
+    for name in sorted(set(ratios) & set(baseline)):
+        change = '{:+.0%}'.format(ratios[name] / baseline[name] - 1)
+        lines.append(row.format(name, '{:.3f}'.format(baseline[name]), '{:.3f}'.format(ratios[name]), change,
+                                'REGRESSED' if name in regressed else ''))
+    not_run = sorted(set(baseline) - set(ratios))
+    if not_run:
+        lines.append('Not run: {}'.format(', '.join(not_run)))
+
+    return '\n'.join(lines)
+
+
+def _median(values):
+    """Get the median of a list of values.
+
+    Args:
+        values (list(float)): The values.
+
+    Returns:
+        float
+    """
+
+    values = sorted(values)
+    middle = len(values) // 2
+
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
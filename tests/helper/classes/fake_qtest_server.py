@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import re
+import json
+import time
+from random import Random
+from threading import Condition, Lock, Thread
+from future.moves.socketserver import ThreadingMixIn
+from future.moves.urllib.parse import urlparse, parse_qs
+from future.moves.http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class FakeQTestServer(object):
+    # Class variables
+    # (method, path regex, endpoint name) of every qTest API endpoint that ZigZag uses
+    _ROUTES = [('POST', re.compile(r'^/api/v3/projects/(\d+)/auto-test-logs$'), 'submit'),
+               ('GET', re.compile(r'^/api/v3/projects/queue-processing/(\d+)$'), 'track'),
+               ('POST', re.compile(r'^/api/v3/projects/(\d+)/search$'), 'search'),
+               ('GET', re.compile(r'^/api/v3/projects/(\d+)/settings/([\w-]+)/fields$'), 'fields'),
+               ('GET', re.compile(r'^/api/v3/projects/(\d+)/test-cycles$'), 'list_test_cycles'),
+               ('POST', re.compile(r'^/api/v3/projects/(\d+)/test-cycles$'), 'create_test_cycle'),
+               ('GET', re.compile(r'^/api/v3/projects/(\d+)/test-cycles/(\d+)$'), 'get_test_cycle'),
+               ('POST', re.compile(r'^/api/v3/projects/(\d+)/requirements/(\d+)/link$'), 'link'),
+               ('GET', re.compile(r'^/api/v3/projects/(\d+)/linked-artifacts$'), 'find_links')]
+    _AUTOMATION_CONTENT_RGX = re.compile(r"'Automation Content' = '([^']*)'")
+    _NAME_RGX = re.compile(r"'name' ~ '([^']*)'")
+    _DEFAULT_FIELD_LABELS = ('Failure Output', 'Failure Link', 'Test SHA')
+
+    def __init__(self,
+                 latency=0.0,
+                 latency_jitter=0.0,
+                 error_rate=0.0,
+                 error_status=500,
+                 error_endpoints=None,
+                 job_duration=0.0,
+                 barriers=None,
+                 barrier_timeout=10.0,
+                 auto_requirements=True,
+                 field_labels=None,
+                 seed=0,
+                 host='127.0.0.1',
+                 port=0):
+        """A local stand-in for the qTest API endpoints that ZigZag uses so uploads can be measured offline.
+
+        The stand-in keeps its state in memory: submitted test logs create test cases once their queue job finished,
+        test cycles and requirement links are stored per project and a requirement exists for every Jira ticket that
+        is searched for. Every request is delayed by the configured latency and can fail with an injected error.
+
+        Args:
+            latency (float): The number of seconds every request is delayed.
+            latency_jitter (float): The maximum number of random seconds added to the latency of a request.
+            error_rate (float): The fraction of requests that fail with 'error_status'. (0.0 - 1.0)
+            error_status (int): The HTTP status code of an injected error.
+            error_endpoints (list(str)): The names of the endpoints that errors are injected into. (All if None)
+                (Valid values: 'submit', 'track', 'search', 'fields', 'list_test_cycles', 'create_test_cycle',
+                'get_test_cycle', 'link', 'find_links')
+            job_duration (float): The number of seconds a queue job stays pending after it was submitted.
+            barriers (dict(str: int)): The number of requests every listed endpoint holds back until they are
+                answered together. (ex: {'list_test_cycles': 4} lets 4 jobs list the test cycles before any of them
+                can create one)
+            barrier_timeout (float): The number of seconds a held request waits for the rest of its barrier.
+            auto_requirements (bool): Create a requirement for every Jira ticket that is searched for.
+            field_labels (list(str)): The labels of the test run fields. (Defaults to the fields ZigZag fills in)
+            seed (int): The seed of the latency jitter and the injected errors.
+            host (str): The address to listen on.
+            port (int): The port to listen on. (A free port is picked if 0)
+        """
+
+        self._latency = latency
+        self._latency_jitter = latency_jitter
+        self._error_rate = error_rate
+        self._error_status = error_status
+        self._error_endpoints = set(error_endpoints) if error_endpoints is not None else None
+        self._job_duration = job_duration
+        self._barriers = dict(barriers) if barriers is not None else {}
+        self._barrier_timeout = barrier_timeout
+        self._auto_requirements = auto_requirements
+        self._field_labels = list(field_labels) if field_labels is not None else list(self._DEFAULT_FIELD_LABELS)
+        self._random = Random(seed)
+        self._host = host
+        self._port = port
+
+        self._lock = Lock()
+        self._condition = Condition(self._lock)
+        self._arrivals = {}         # endpoint: the number of requests that reached its barrier
+        self._next_id = 1
+        self._request_counts = {}
+        self._error_counts = {}
+        self._jobs = {}
+        self._test_cases = {}       # project id: {automation content: test case id}
+        self._requirements = {}     # project id: {Jira ticket ID: requirement id}
+        self._test_cycles = {}      # project id: [test cycle]
+        self._links = {}            # project id: {requirement id: set(test case id)}
+
+        self._httpd = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        """The base URL of the running stand-in to pass to ZigZag as the qTest URL.
+
+        Returns:
+            str
+        """
+
+        return 'http://{}:{}'.format(*self._httpd.server_address[:2])
+
+    @property
+    def request_counts(self):
+        """The number of requests received by every endpoint. (Injected errors included)
+
+        Returns:
+            dict(str: int)
+        """
+
+        with self._lock:
+            return dict(self._request_counts)
+
+    @property
+    def error_counts(self):
+        """The number of injected errors returned by every endpoint.
+
+        Returns:
+            dict(str: int)
+        """
+
+        with self._lock:
+            return dict(self._error_counts)
+
+    def start(self):
+        """Start serving requests on a background thread."""
+
+        self._httpd = _ThreadingHTTPServer((self._host, self._port), _FakeQTestRequestHandler)
+        self._httpd.fake_qtest = self
+        self._thread = Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving requests and release the port."""
+
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def reset_counts(self):
+        """Forget the number of requests and errors of every endpoint."""
+
+        with self._lock:
+            self._request_counts.clear()
+            self._error_counts.clear()
+
+    def add_requirement(self, project_id, jira_id):
+        """Create the requirement of a Jira ticket.
+
+        Args:
+            project_id (int): The qTest project.
+            jira_id (str): The Jira ticket ID that starts the name of the requirement.
+
+        Returns:
+            int: The requirement id.
+        """
+
+        with self._lock:
+            return self._add_requirement(str(project_id), jira_id)
+
+    def test_cycles(self, project_id):
+        """The test cycles of a project in the order they were created.
+
+        Args:
+            project_id (int): The qTest project.
+
+        Returns:
+            list(dict)
+        """
+
+        with self._lock:
+            return [dict(test_cycle) for test_cycle in self._test_cycles.get(str(project_id), [])]
+
+    def test_case_ids(self, project_id):
+        """The test cases of a project.
+
+        Args:
+            project_id (int): The qTest project.
+
+        Returns:
+            dict(str: int): The test case id of every automation content.
+        """
+
+        with self._lock:
+            return dict(self._test_cases.get(str(project_id), {}))
+
+    def links(self, project_id):
+        """The test cases linked to every requirement of a project.
+
+        Args:
+            project_id (int): The qTest project.
+
+        Returns:
+            dict(int: set(int))
+        """
+
+        with self._lock:
+            return {requirement_id: set(test_case_ids)
+                    for requirement_id, test_case_ids in self._links.get(str(project_id), {}).items()}
+
+    def handle(self, method, path, body):
+        """Answer a single request to the qTest API.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path and query of the request.
+            body (bytes): The body of the request.
+
+        Returns:
+            tuple(int, object): The HTTP status code and the JSON serializable response.
+        """
+
+        parsed_url = urlparse(path)
+        url_path = re.sub(r'/+', '/', parsed_url.path)
+        query = parse_qs(parsed_url.query)
+
+        for route_method, route_rgx, endpoint in self._ROUTES:
+            match = route_rgx.match(url_path)
+            if method == route_method and match:
+                break
+        else:
+            return 404, {'message': 'Unknown endpoint: {} {}'.format(method, url_path)}
+
+        with self._lock:
+            self._request_counts[endpoint] = self._request_counts.get(endpoint, 0) + 1
+            delay = self._latency + self._random.uniform(0, self._latency_jitter)
+            inject_error = ((self._error_endpoints is None or endpoint in self._error_endpoints) and
+                            self._random.random() < self._error_rate)
+            if inject_error:
+                self._error_counts[endpoint] = self._error_counts.get(endpoint, 0) + 1
+
+        time.sleep(delay)
+        if endpoint in self._barriers:
+            self._wait_for_barrier(endpoint)
+        if inject_error:
+            return self._error_status, {'message': 'Injected error'}
+
+        payload = json.loads(body.decode('utf-8')) if body else None
+        with self._lock:
+            return getattr(self, '_{}'.format(endpoint))(query, payload, *match.groups())
+
+    def _wait_for_barrier(self, endpoint):
+        """Hold a request until the barrier of its endpoint is full or the barrier timeout passed.
+
+        Args:
+            endpoint (str): The name of the endpoint.
+        """
+
+        deadline = time.time() + self._barrier_timeout
+        with self._condition:
+            self._arrivals[endpoint] = self._arrivals.get(endpoint, 0) + 1
+            self._condition.notify_all()
+            while self._arrivals[endpoint] < self._barriers[endpoint] and time.time() < deadline:
+                self._condition.wait(deadline - time.time())
+
+    def _submit(self, query, payload, project_id):
+        """Queue the test logs of an automation request."""
+
+        job_id = self._new_id()
+        self._jobs[job_id] = {'project_id': project_id,
+                              'test_logs': payload.get('test_logs') or [],
+                              'submitted': time.time(),
+                              'state': 'IN_WAITING'}
+
+        return 201, self._job_response(job_id)
+
+    def _track(self, query, payload, job_id):
+        """Get the state of a queue job and create its test cases once it finished."""
+
+        job = self._jobs.get(int(job_id))
+        if job is None:
+            return 404, {'message': 'Job not found'}
+
+        if job['state'] != 'SUCCESS' and time.time() - job['submitted'] >= self._job_duration:
+            test_cases = self._test_cases.setdefault(job['project_id'], {})
+            for test_log in job['test_logs']:
+                automation_content = test_log.get('automation_content')
+                if automation_content not in test_cases:
+                    test_cases[automation_content] = self._new_id()
+            job['state'] = 'SUCCESS'
+        elif job['state'] == 'IN_WAITING':
+            job['state'] = 'IN_PROCESSING'
+
+        return 200, self._job_response(int(job_id))
+
+    def _search(self, query, payload, project_id):
+        """Find the test cases by automation content or the requirements by Jira ticket ID of a query."""
+
+        if payload['object_type'] == 'test-cases':
+            test_cases = self._test_cases.get(project_id, {})
+            items = [{'id': test_cases[automation_content],
+                      'properties': [{'field_name': 'Automation Content', 'field_value': automation_content}]}
+                     for automation_content in self._AUTOMATION_CONTENT_RGX.findall(payload['query'])
+                     if automation_content in test_cases]
+        elif payload['object_type'] == 'requirements':
+            requirements = self._requirements.setdefault(project_id, {})
+            jira_ids = self._NAME_RGX.findall(payload['query'])
+            if self._auto_requirements:
+                for jira_id in jira_ids:
+                    self._add_requirement(project_id, jira_id)
+            items = [{'id': requirements[jira_id], 'name': '{} synthetic requirement'.format(jira_id)}
+                     for jira_id in jira_ids if jira_id in requirements]
+        else:
+            items = []
+
+        page_size = int(query.get('pageSize', ['100'])[0])
+        page = int(query.get('page', ['1'])[0])
+
+        return 200, {'page': page,
+                     'page_size': page_size,
+                     'total': len(items),
+                     'items': items[(page - 1) * page_size:page * page_size]}
+
+    def _fields(self, query, payload, project_id, object_type):
+        """Get the fields of an object type."""
+
+        return 200, [{'id': index + 1, 'label': label, 'required': False, 'searchable': True}
+                     for index, label in enumerate(self._field_labels)]
+
+    def _list_test_cycles(self, query, payload, project_id):
+        """Get the test cycles of a project or only the ones under the root."""
+
+        test_cycles = self._test_cycles.get(project_id, [])
+        if query.get('parentType', [''])[0] == 'root':
+            test_cycles = [test_cycle for test_cycle in test_cycles if test_cycle['parent_id'] == 0]
+
+        return 200, [self._test_cycle_response(test_cycle) for test_cycle in test_cycles]
+
+    def _create_test_cycle(self, query, payload, project_id):
+        """Create a test cycle even if one with the same name exists like qTest does."""
+
+        test_cycle_id = self._new_id()
+        test_cycle = {'id': test_cycle_id,
+                      'pid': 'CL-{}'.format(test_cycle_id),
+                      'name': payload['name'],
+                      'parent_id': int(query.get('parentId', ['0'])[0])}
+        self._test_cycles.setdefault(project_id, []).append(test_cycle)
+
+        return 200, self._test_cycle_response(test_cycle)
+
+    def _get_test_cycle(self, query, payload, project_id, test_cycle_id):
+        """Get a single test cycle."""
+
+        for test_cycle in self._test_cycles.get(project_id, []):
+            if test_cycle['id'] == int(test_cycle_id):
+                return 200, self._test_cycle_response(test_cycle)
+
+        return 404, {'message': 'Test cycle not found'}
+
+    def _link(self, query, payload, project_id, requirement_id):
+        """Link test cases to a requirement."""
+
+        linked = self._links.setdefault(project_id, {}).setdefault(int(requirement_id), set())
+        linked.update(payload)
+
+        return 200, [self._link_response(int(requirement_id), linked)]
+
+    def _find_links(self, query, payload, project_id):
+        """Get the test cases linked to requirements."""
+
+        links = self._links.get(project_id, {})
+
+        return 200, [self._link_response(int(requirement_id), links.get(int(requirement_id), set()))
+                     for requirement_id in query.get('ids', [])]
+
+    def _new_id(self):
+        """Get an id that is unique across every object of the stand-in."""
+
+        new_id = self._next_id
+        self._next_id += 1
+
+        return new_id
+
+    def _add_requirement(self, project_id, jira_id):
+        """Create the requirement of a Jira ticket if it does not exist yet."""
+
+        requirements = self._requirements.setdefault(project_id, {})
+        if jira_id not in requirements:
+            requirements[jira_id] = self._new_id()
+
+        return requirements[jira_id]
+
+    def _job_response(self, job_id):
+        """Build the queue processing response of a job."""
+
+        job = self._jobs[job_id]
+
+        return {'id': job_id,
+                'type': 'automation',
+                'state': job['state'],
+                'contentType': 'application/json',
+                'content': 'Processed {} test logs'.format(len(job['test_logs']))}
+
+    @staticmethod
+    def _test_cycle_response(test_cycle):
+        """Build the test cycle resource of a test cycle."""
+
+        return {'id': test_cycle['id'], 'pid': test_cycle['pid'], 'name': test_cycle['name']}
+
+    @staticmethod
+    def _link_response(requirement_id, test_case_ids):
+        """Build the linked artifact container of a requirement."""
+
+        return {'id': requirement_id,
+                'pid': 'RQ-{}'.format(requirement_id),
+                'objects': [{'id': test_case_id, 'pid': 'TC-{}'.format(test_case_id), 'link_type': 'is covered by'}
+                            for test_case_id in sorted(test_case_ids)]}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    # many ZigZag processes connect at the same time during a load test
+    request_queue_size = 256
+
+
+class _FakeQTestRequestHandler(BaseHTTPRequestHandler):
+    # keep connections alive like qTest so the connection pool of ZigZag is exercised
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Answer a GET request."""
+
+        self._respond()
+
+    def do_POST(self):
+        """Answer a POST request."""
+
+        self._respond()
+
+    def log_message(self, format, *args):
+        pass    # keep the output of the tests clean
+
+    def _respond(self):
+        """Answer the request with the JSON response of the stand-in."""
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, response = self.server.fake_qtest.handle(self.command, self.path, body)
+        data = json.dumps(response).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import io
+import os
+import uuid
+from random import Random
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from jinja2 import Environment, FileSystemLoader
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class JUnitGenerator(object):
+    # Class variables
+    _template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..', 'data'))
+    _jinja2_env = Environment(loader=FileSystemLoader(_template_dir),
+                              trim_blocks=True,
+                              lstrip_blocks=True,
+                              keep_trailing_newline=True)
+    _junit_template = _jinja2_env.get_template('junit.xml.j2')
+    _default_global_props = OrderedDict([('BUILD_URL', 'https://example.com/job/synthetic/1/'),
+                                         ('BUILD_NUMBER', '1')])
+
+    def __init__(self,
+                 testcases,
+                 step_ratio=0.0,
+                 steps_per_case=5,
+                 failure_rate=0.0,
+                 error_rate=0.0,
+                 skip_rate=0.0,
+                 failure_output_size=1024,
+                 system_out_size=64,
+                 system_err_size=64,
+                 jira_count=1,
+                 jira_pool=1000,
+                 global_props=None,
+                 seed=0):
+        """Generate synthetic JUnitXML files of any size offline from the same template as the integration tests.
+
+        The 'testcase' elements are created one at a time while the file is written so that files of many GB can be
+        generated without holding them in memory. The same seed always generates the same file.
+
+        Args:
+            testcases (int): The number of 'testcase' elements to generate. (Test steps included)
+            step_ratio (float): The fraction of 'testcase' elements that are test steps. (0.0 - 1.0)
+            steps_per_case (int): The number of test steps of every test case with steps.
+            failure_rate (float): The fraction of 'testcase' elements in the 'failure' state. (0.0 - 1.0)
+            error_rate (float): The fraction of 'testcase' elements in the 'error' state. (0.0 - 1.0)
+            skip_rate (float): The fraction of 'testcase' elements in the 'skipped' state. (0.0 - 1.0)
+            failure_output_size (int): The number of characters of the output of every failure, error and skip.
+            system_out_size (int): The number of characters of every 'system-out' element.
+            system_err_size (int): The number of characters of every 'system-err' element.
+            jira_count (int): The number of 'jira' properties of every 'testcase' element.
+            jira_pool (int): The number of distinct Jira ticket IDs to pick the 'jira' properties from.
+            global_props (dict): The test suite properties. (Defaults to a build URL and number)
+            seed (int): The seed of the random states, durations and Jira ticket IDs.
+
+        Raises:
+            RuntimeError: Invalid value provided for an argument.
+        """
+
+        for name, rate in (('step_ratio', step_ratio),
+                           ('failure_rate', failure_rate),
+                           ('error_rate', error_rate),
+                           ('skip_rate', skip_rate)):
+            if not 0.0 <= rate <= 1.0:
+                raise RuntimeError("Invalid value provided for the '{}' argument!".format(name))
+        if failure_rate + error_rate + skip_rate > 1.0:
+            raise RuntimeError("The sum of the 'failure_rate', 'error_rate' and 'skip_rate' arguments exceeds 1.0!")
+        if testcases < 0 or steps_per_case < 1 or jira_count < 0 or jira_pool < 1:
+            raise RuntimeError('Invalid count provided for the generator!')
+
+        self._testcases = testcases
+        self._step_ratio = step_ratio
+        self._steps_per_case = steps_per_case
+        self._failure_rate = failure_rate
+        self._error_rate = error_rate
+        self._skip_rate = skip_rate
+        self._failure_output_size = failure_output_size
+        self._system_out_size = system_out_size
+        self._system_err_size = system_err_size
+        self._jira_count = jira_count
+        self._jira_pool = jira_pool
+        self._global_props = global_props if global_props is not None else self._default_global_props
+        self._seed = seed
+        self._start_time = datetime(2018, 4, 10, 21, 38, 18)
+        self._fillers = {}
+
+    @property
+    def testcases(self):
+        """The number of 'testcase' elements to generate.
+
+        Returns:
+            int
+        """
+
+        return self._testcases
+
+    @property
+    def start_time(self):
+        """The execution start time of the first 'testcase' element.
+
+        Returns:
+            datetime.datetime
+        """
+
+        return self._start_time
+
+    def write(self, file_path):
+        """Stream the JUnitXML document to a file.
+
+        Args:
+            file_path (str): The path of the file to write.
+        """
+
+        with io.open(file_path, 'w', encoding='utf-8') as f:
+            for chunk in self.generate():
+                f.write(chunk)
+
+    def generate(self):
+        """Render the JUnitXML document one piece at a time.
+
+        Returns:
+            iter(str): The pieces of the document in order.
+        """
+
+        return self._junit_template.generate(tests=_SyntheticTestSuite(self), global_props=self._global_props)
+
+    def plan(self):
+        """Decide the shape of every 'testcase' element without rendering its text.
+
+        Returns:
+            iter(tuple(int, int, str, int, list)): The index, test case group (None if the element is not a test
+                step), state, duration in seconds and Jira ticket IDs of every 'testcase' element in order.
+        """
+
+        rng = Random(self._seed)
+        index = 0
+        step_count = 0
+        group = 0
+        while index < self._testcases:
+            # test steps are spread evenly between the test cases so every part of the file has the same shape
+            size = min(self._steps_per_case, self._testcases - index)
+            step_error = abs(step_count + size - self._step_ratio * (index + size))
+            testcase_error = abs(step_count - self._step_ratio * (index + 1))
+            if self._step_ratio and step_error <= testcase_error:
+                step_count += size
+                group += 1
+                for _ in range(size):
+                    yield self._plan_testcase(rng, index, group)
+                    index += 1
+            else:
+                yield self._plan_testcase(rng, index, None)
+                index += 1
+
+    def build_testcase(self, index, group, state, duration, jira_tickets, start):
+        """Create the values rendered for a single 'testcase' element.
+
+        Args:
+            index (int): The position of the 'testcase' element in the document.
+            group (int): The test case the element is a test step of or None.
+            state (str): The state of the test. ('passed', 'skipped', 'failure', 'error')
+            duration (int): The duration of the test in seconds.
+            jira_tickets (list(str)): The Jira ticket IDs of the test.
+            start (datetime.datetime): Execution start time.
+
+        Returns:
+            _SyntheticTestCase
+        """
+
+        if group is None:
+            class_name = 'tests.test_synthetic'
+            name = 'test_case_{}'.format(index)
+        else:
+            class_name = 'tests.test_synthetic.TestCase{}'.format(group)
+            name = 'test_step_{}'.format(index)
+
+        return _SyntheticTestCase(class_name=class_name,
+                                  file_path='tests/test_synthetic.py',
+                                  line=index + 1,
+                                  name=name,
+                                  duration=duration,
+                                  jira_tickets=jira_tickets,
+                                  test_id=str(uuid.UUID(int=index + 1)),
+                                  is_test_step=group is not None,
+                                  start_time=start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                                  end_time=(start + timedelta(seconds=duration)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                                  state=state,
+                                  short_msg='State: {}'.format(state),
+                                  long_msg=self._filler(self._failure_output_size, state),
+                                  system_out=self._filler(self._system_out_size, 'stdout'),
+                                  system_err=self._filler(self._system_err_size, 'stderr'))
+
+    def _plan_testcase(self, rng, index, group):
+        """Pick the random state, duration and Jira ticket IDs of a 'testcase' element.
+
+        Args:
+            rng (random.Random): The random number generator of the current pass over the document.
+            index (int): The position of the 'testcase' element in the document.
+            group (int): The test case the element is a test step of or None.
+
+        Returns:
+            tuple(int, int, str, int, list)
+        """
+
+        roll = rng.random()
+        if roll < self._failure_rate:
+            state = 'failure'
+        elif roll < self._failure_rate + self._error_rate:
+            state = 'error'
+        elif roll < self._failure_rate + self._error_rate + self._skip_rate:
+            state = 'skipped'
+        else:
+            state = 'passed'
+        duration = rng.randint(1, 10)
+        jira_tickets = ['JIRA-{}'.format(rng.randint(1, self._jira_pool)) for _ in range(self._jira_count)]
+
+        return index, group, state, duration, jira_tickets
+
+    def _filler(self, size, label):
+        """Get XML safe text of an exact size that is shared by every 'testcase' element.
+
+        Args:
+            size (int): The number of characters.
+            label (str): A word repeated on every line of the text.
+
+        Returns:
+            str
+        """
+
+        key = (size, label)
+        if key not in self._fillers:
+            line = 'synthetic {} line\n'.format(label)
+            self._fillers[key] = (line * (size // len(line) + 1))[:size]
+
+        return self._fillers[key]
+
+
+class _SyntheticTestSuite(object):
+    def __init__(self, generator):
+        """The 'tests' of the JUnitXML template that creates every 'testcase' element only when it is rendered.
+
+        The totals in the 'testsuite' element are rendered first so they are counted by an extra pass over the plan
+        of the generator which does not create any text.
+
+        Args:
+            generator (JUnitGenerator): The generator that plans the 'testcase' elements.
+        """
+
+        self._generator = generator
+        self.total_count = 0
+        self.failure_count = 0
+        self.error_count = 0
+        self.skip_count = 0
+        self.total_duration = 0
+
+        for _, _, state, duration, _ in generator.plan():
+            self.total_count += 1
+            self.failure_count += state == 'failure'
+            self.error_count += state == 'error'
+            self.skip_count += state == 'skipped'
+            self.total_duration += duration
+
+    def __iter__(self):
+        """Create the 'testcase' elements one at a time.
+
+        Returns:
+            iter(_SyntheticTestCase)
+        """
+
+        start = self._generator.start_time
+        for index, group, state, duration, jira_tickets in self._generator.plan():
+            yield self._generator.build_testcase(index, group, state, duration, jira_tickets, start)
+            start += timedelta(seconds=duration)
+
+
+class _SyntheticTestCase(object):
+    __slots__ = ('class_name', 'file_path', 'line', 'name', 'duration', 'jira_tickets', 'test_id', 'is_test_step',
+                 'start_time', 'end_time', 'state', 'short_msg', 'long_msg', 'system_out', 'system_err')
+
+    def __init__(self, **kwargs):
+        """The values rendered for a single 'testcase' element of the JUnitXML template.
+
+        Args:
+            **kwargs: A value for every attribute in '__slots__'.
+        """
+
+        for name in self.__slots__:
+            setattr(self, name, kwargs[name])
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import math
+import time
+import multiprocessing
+from future.moves.queue import Empty
+from zigzag.zigzag import ZigZag
+
+
+# ======================================================================================================================
+# Classes
+# ======================================================================================================================
+class LoadTest(object):
+    def __init__(self,
+                 junit_xml_file_path,
+                 config_file_path,
+                 jobs=40,
+                 ramp_up=0.0,
+                 batch_size=1000,
+                 max_workers=4,
+                 link=True,
+                 cache_path=None,
+                 timeout=600):
+        """Upload the same JUnitXML file from many ZigZag processes at the same time like concurrent CI jobs do.
+
+        Every job parses the file in its own process first and the uploads only start once every job finished parsing
+        so the qTest API sees the whole load at once.
+
+        Args:
+            junit_xml_file_path (str): A file path to the JUnitXML file that every job uploads.
+            config_file_path (str): A file path to the ZigZag config file of every job.
+            jobs (int): The number of ZigZag processes.
+            ramp_up (float): The number of seconds over which the start of the uploads is spread evenly.
+            batch_size (int): The maximum number of test logs submitted in a single request.
+            max_workers (int): The maximum number of requests every job sends at the same time.
+            link (bool): Link the requirements (Jira tickets) of the test logs after the upload.
+            cache_path (str): The path to a cache of qTest lookups shared between the jobs. (Disabled if None)
+            timeout (float): The number of seconds to wait for every job to be ready and to finish.
+        """
+
+        self._junit_xml_file_path = junit_xml_file_path
+        self._config_file_path = config_file_path
+        self._jobs = jobs
+        self._ramp_up = ramp_up
+        self._batch_size = batch_size
+        self._max_workers = max_workers
+        self._link = link
+        self._cache_path = cache_path
+        self._timeout = timeout
+
+    def run(self, fake_qtest):
+        """Run every job against a local qTest stand-in and report how the uploads performed.
+
+        Args:
+            fake_qtest (FakeQTestServer): The running qTest stand-in that receives the uploads.
+
+        Returns:
+            dict: The report of the run. (See 'format_report')
+
+        Raises:
+            RuntimeError: A job did not get ready or did not finish before the timeout.
+        """
+
+        queue = multiprocessing.Queue()
+        start_event = multiprocessing.Event()
+        options = {'junit_xml_file_path': self._junit_xml_file_path,
+                   'config_file_path': self._config_file_path,
+                   'qtest_url': fake_qtest.url,
+                   'batch_size': self._batch_size,
+                   'max_workers': self._max_workers,
+                   'link': self._link,
+                   'cache_path': self._cache_path}
+        processes = [multiprocessing.Process(target=_run_job,
+                                             args=(index, self._start_delay(index), options, queue, start_event))
+                     for index in range(self._jobs)]
+
+        fake_qtest.reset_counts()
+        for process in processes:
+            process.daemon = True
+            process.start()
+
+        try:
+            for _ in range(self._jobs):
+                self._get(queue, 'ready')
+            start = time.time()
+            start_event.set()
+            results = sorted((self._get(queue, 'result') for _ in range(self._jobs)), key=lambda r: r['index'])
+            duration = time.time() - start
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+        return self._report(fake_qtest, results, duration)
+
+    def _start_delay(self, index):
+        """Get the number of seconds a job waits after the start before it uploads.
+
+        Args:
+            index (int): The index of the job.
+
+        Returns:
+            float
+        """
+
+        return self._ramp_up * index / self._jobs
+
+    def _get(self, queue, kind):
+        """Get the next message of the jobs.
+
+        Args:
+            queue (multiprocessing.Queue): The queue the jobs send their messages to.
+            kind (str): The expected kind of message. ('ready' or 'result')
+
+        Returns:
+            object: The content of the message.
+
+        Raises:
+            RuntimeError: No message arrived before the timeout.
+        """
+
+        try:
+            message_kind, content = queue.get(timeout=self._timeout)
+        except Empty:
+            message = "A load test job did not send a '{}' message within {} seconds!"
+            raise RuntimeError(message.format(kind, self._timeout))
+        assert message_kind == kind, "Expected a '{}' message but got '{}'".format(kind, message_kind)
+
+        return content
+
+    def _report(self, fake_qtest, results, duration):
+        """Build the report of a run.
+
+        Args:
+            fake_qtest (FakeQTestServer): The qTest stand-in that received the uploads.
+            results (list(dict)): The result of every job.
+            duration (float): The number of seconds from the start of the uploads until the last job finished.
+
+        Returns:
+            dict
+        """
+
+        succeeded = [result for result in results if result['error'] is None]
+        test_logs = sum(result['test_logs'] for result in succeeded)
+        latencies = [result['latency'] for result in succeeded]
+        project_ids = sorted(set(result['project_id'] for result in succeeded))
+        root_test_cycles = [test_cycle for project_id in project_ids
+                            for test_cycle in fake_qtest.test_cycles(project_id) if test_cycle['parent_id'] == 0]
+
+        return {'jobs': len(results),
+                'failed_jobs': {result['index']: result['error'] for result in results if result['error'] is not None},
+                'duration': duration,
+                'uploads_per_second': len(succeeded) / duration if duration else 0.0,
+                'test_logs_per_second': test_logs / duration if duration else 0.0,
+                'latency_p50': percentile(latencies, 50),
+                'latency_p99': percentile(latencies, 99),
+                'request_counts': fake_qtest.request_counts,
+                'error_counts': fake_qtest.error_counts,
+                'duplicate_test_cycles': duplicate_test_cycles(root_test_cycles),
+                'test_cycle_pids': sorted(set(result['test_cycle_pid'] for result in succeeded))}
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def percentile(values, percent):
+    """Get a percentile of a list of values with the nearest rank method.
+
+    Args:
+        values (list(float)): The values.
+        percent (float): The percentile. (0 - 100)
+
+    Returns:
+        float: The percentile or None if there are no values.
+    """
+
+    if not values:
+        return None
+
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+
+    return sorted(values)[max(rank, 1) - 1]
+
+
+def duplicate_test_cycles(test_cycles):
+    """Find the test cycles that were created more than once under the same parent. (Case insensitive)
+
+    Args:
+        test_cycles (list(dict)): The test cycles with their 'name' and 'parent_id'.
+
+    Returns:
+        dict(str: int): The number of test cycles with every duplicated name.
+    """
+
+    counts = {}
+    names = {}
+    for test_cycle in test_cycles:
+        key = (test_cycle['parent_id'], test_cycle['name'].lower())
+        counts[key] = counts.get(key, 0) + 1
+        names.setdefault(key, test_cycle['name'])
+
+    return {names[key]: count for key, count in counts.items() if count > 1}
+
+
+def format_report(report):
+    """Format the report of a load test as text.
+
+    Args:
+        report (dict): The report returned by 'LoadTest.run'.
+
+    Returns:
+        str
+    """
+
+    def _seconds(value):
+        return '{:.3f}s'.format(value) if value is not None else '-'
+
+    lines = ['Jobs: {} ({} failed)'.format(report['jobs'], len(report['failed_jobs'])),
+             'Duration: {}'.format(_seconds(report['duration'])),
+             'Throughput: {:.2f} uploads/s, {:.1f} test logs/s'.format(
+                 report['uploads_per_second'], report['test_logs_per_second']),
+             'Upload latency: p50 {} p99 {}'.format(_seconds(report['latency_p50']), _seconds(report['latency_p99'])),
+             'Requests:']
+    row = '    {:<20}{:>10}{:>10}'
+    lines.append(row.format('Endpoint', 'Count', 'Errors'))
+    for endpoint, count in sorted(report['request_counts'].items()):
+        lines.append(row.format(endpoint, count, report['error_counts'].get(endpoint, 0)))
+    lines.append('Duplicate test cycles: {}'.format(
+        ', '.join("'{}' x{}".format(name, count) for name, count in sorted(report['duplicate_test_cycles'].items()))
+        or 'none'))
+    lines.append('Test cycles used by the jobs: {}'.format(', '.join(report['test_cycle_pids']) or '-'))
+    for index, error in sorted(report['failed_jobs'].items()):
+        lines.append('Job {} failed: {}'.format(index, error))
+
+    return '\n'.join(lines)
+
+
+def _run_job(index, start_delay, options, queue, start_event):
+    """Parse and upload a JUnitXML file in a job process of a load test.
+
+    Args:
+        index (int): The index of the job.
+        start_delay (float): The number of seconds to wait after the start before uploading.
+        options (dict): The options of the load test.
+        queue (multiprocessing.Queue): The queue to send the 'ready' and 'result' messages to.
+        start_event (multiprocessing.Event): The event that starts the uploads of every job.
+    """
+
+    result = {'index': index, 'error': None, 'latency': None, 'test_logs': 0, 'project_id': None,
+              'test_cycle_pid': None}
+    zz = None
+    try:
+        zz = ZigZag(options['junit_xml_file_path'],
+                    options['config_file_path'],
+                    'totally_a_real_token',
+                    pool_size=options['max_workers'],
+                    cache_path=options['cache_path'],
+                    max_concurrency=options['max_workers'],
+                    qtest_url=options['qtest_url'])
+        zz.parse()
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+
+    queue.put(('ready', index))
+    start_event.wait()
+    time.sleep(start_delay)
+
+    if result['error'] is None:
+        started = time.time()
+        try:
+            job_ids = zz.upload_test_results(batch_size=options['batch_size'], max_workers=options['max_workers'])
+            if options['link']:
+                zz.link_requirements(job_ids, max_workers=options['max_workers'])
+            result.update(latency=time.time() - started,
+                          test_logs=len(zz.test_logs),
+                          project_id=zz.qtest_project_id,
+                          test_cycle_pid=zz.qtest_test_cycle_pid)
+        except Exception as e:
+            result['error'] = '{}: {}'.format(type(e).__name__, e)
+
+    queue.put(('result', result))
@@ -64,7 +64,7 @@ class ZigZagRunner(object):
         self._junit_xml_file_path = junit_xml_file_path
         self._metadata = metadata if metadata else {}
 
-        self._last_invocation_queue_job_id = None   # Also used to indicate if runner has ran before
+        self._last_invocation_queue_job_ids = None   # Also used to indicate if runner has ran before
         self._tests = TestSuiteInfo(self.qtest_api_token, self._qtest_project_id, self._qtest_root_req_module.id)
         self._last_line = 0
         self._last_time = 1
@@ -140,18 +140,18 @@ class ZigZagRunner(object):
         return self._tests
 
     @property
-    def last_invocation_queue_job_id(self):
-        """The queue job ID for the last call to "invoke_zigzag".
+    def last_invocation_queue_job_ids(self):
+        """The queue job IDs for the last call to "invoke_zigzag". (One per uploaded batch)
 
         Returns:
-            int: The queue job ID for the last call to "invoke_zigzag".
+            list(int): The queue job IDs for the last call to "invoke_zigzag".
 
         Raises:
             AssertionError: The "invoke_zigzag" has not been called yet.
         """
 
-        assert self._last_invocation_queue_job_id
-        return self._last_invocation_queue_job_id
+        assert self._last_invocation_queue_job_ids
+        return self._last_invocation_queue_job_ids
 
     @property
     def metadata(self):
@@ -246,7 +246,8 @@ class ZigZagRunner(object):
                     False)
         zz.parse()
 
-        self._last_invocation_queue_job_id = zz.upload_test_results()
+        self._last_invocation_queue_job_ids = zz.upload_test_results()
+        zz.link_requirements(self._last_invocation_queue_job_ids)   # the CLI links by default as well
 
     def clean_up(self):
         """Remove qTest elements from the "Test Design" and "Test Execution" views.
@@ -255,7 +256,7 @@ class ZigZagRunner(object):
             RuntimeError: Failed to cleanup all qTest elements.
         """
 
-        if self._last_invocation_queue_job_id:
+        if self._last_invocation_queue_job_ids:
             test_cycle_api = swagger_client.TestcycleApi()
 
             self.tests.clean_up()
@@ -271,39 +272,40 @@ class ZigZagRunner(object):
                                    "Reason: {}\n"
                                    "Message: {}".format(e.status, e.reason, e.body))
 
-            self._last_invocation_queue_job_id = None
+            self._last_invocation_queue_job_ids = None
 
     def assert_queue_job_complete(self):
-        """Verify that the queue job for the last call to "invoke_zigzag" completed successfully.
+        """Verify that every queue job for the last call to "invoke_zigzag" completed successfully.
 
         Raises:
             AssertionError: Queue job failed or timeout while waiting for job to complete.
         """
 
         queue_api = swagger_client.TestlogApi()
-        queue_job_timeout = True
 
-        for i in range(1, 11):
-            try:
-                response = queue_api.track(self.last_invocation_queue_job_id)
-
-                if response.state == 'SUCCESS':
-                    queue_job_timeout = False
-                    break
-                elif response.state == 'FAILED':
-                    raise AssertionError(
-                        "Processing for queue job '{}' failed!".format(str(self.last_invocation_queue_job_id))
-                    )
-                else:
-                    warn(UserWarning("WARNING! Queue job retry: #{}".format(str(i))))
-                    sleep(3 * i)
-            except ApiException as e:
-                raise AssertionError("The qTest API reported an error!\n"
-                                     "Status code: {}\n"
-                                     "Reason: {}\n"
-                                     "Message: {}".format(e.status, e.reason, e.body))
-
-        assert not queue_job_timeout, 'Timeout while waiting for queue job to complete!'
+        for queue_job_id in self.last_invocation_queue_job_ids:
+            queue_job_timeout = True
+
+            for i in range(1, 11):
+                try:
+                    response = queue_api.track(queue_job_id)
+
+                    if response.state == 'SUCCESS':
+                        queue_job_timeout = False
+                        break
+                    elif response.state == 'FAILED':
+                        raise AssertionError("Processing for queue job '{}' failed!".format(str(queue_job_id)))
+                    else:
+                        warn(UserWarning("WARNING! Queue job '{}' retry: #{}".format(str(queue_job_id), str(i))))
+                        sleep(3 * i)
+                except ApiException as e:
+                    raise AssertionError("The qTest API reported an error!\n"
+                                         "Status code: {}\n"
+                                         "Reason: {}\n"
+                                         "Message: {}".format(e.status, e.reason, e.body))
+
+            assert not queue_job_timeout, \
+                "Timeout while waiting for queue job '{}' to complete!".format(str(queue_job_id))
 
     def assert_tests(self):
         """Verify that the test cases exist along with associate test runs.
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Generate synthetic JUnitXML files for reproducing large test runs offline.
+
+Example:
+    python -m tests.helper.generate_junit_xml --testcases 100000 --step-ratio 0.2 --failure-rate 0.05 junit.xml
+"""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import click
+from tests.helper.classes.junit_generator import JUnitGenerator
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.option('--testcases', type=click.IntRange(min=0), default=1000,
+              help="The number of 'testcase' elements to generate (Test steps included)")
+@click.option('--step-ratio', type=click.FloatRange(0, 1), default=0.0,
+              help="The fraction of 'testcase' elements that are test steps")
+@click.option('--steps-per-case', type=click.IntRange(min=1), default=5,
+              help='The number of test steps of every test case with steps')
+@click.option('--failure-rate', type=click.FloatRange(0, 1), default=0.0,
+              help="The fraction of 'testcase' elements that failed")
+@click.option('--error-rate', type=click.FloatRange(0, 1), default=0.0,
+              help="The fraction of 'testcase' elements that errored")
+@click.option('--skip-rate', type=click.FloatRange(0, 1), default=0.0,
+              help="The fraction of 'testcase' elements that were skipped")
+@click.option('--failure-output-size', type=click.IntRange(min=0), default=1024,
+              help='The number of characters of the output of every failure, error and skip')
+@click.option('--system-out-size', type=click.IntRange(min=0), default=64,
+              help="The number of characters of every 'system-out' element")
+@click.option('--system-err-size', type=click.IntRange(min=0), default=64,
+              help="The number of characters of every 'system-err' element")
+@click.option('--jira-count', type=click.IntRange(min=0), default=1,
+              help="The number of 'jira' properties of every 'testcase' element")
+@click.option('--jira-pool', type=click.IntRange(min=1), default=1000,
+              help='The number of distinct Jira ticket IDs to pick from')
+@click.option('--seed', type=int, default=0,
+              help='The seed of the random states, durations and Jira ticket IDs')
+@click.argument('output_file', type=click.Path(dir_okay=False, writable=True))
+def main(testcases,
+         step_ratio,
+         steps_per_case,
+         failure_rate,
+         error_rate,
+         skip_rate,
+         failure_output_size,
+         system_out_size,
+         system_err_size,
+         jira_count,
+         jira_pool,
+         seed,
+         output_file):
+    """Write a synthetic JUnitXML file that ZigZag can parse to OUTPUT_FILE."""
+
+    try:
+        generator = JUnitGenerator(testcases,
+                                   step_ratio,
+                                   steps_per_case,
+                                   failure_rate,
+                                   error_rate,
+                                   skip_rate,
+                                   failure_output_size,
+                                   system_out_size,
+                                   system_err_size,
+                                   jira_count,
+                                   jira_pool,
+                                   seed=seed)
+    except RuntimeError as e:
+        raise click.BadParameter(str(e))
+
+    generator.write(output_file)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""Upload a JUnitXML file from many ZigZag processes at the same time against a local qTest stand-in.
+
+Example:
+    python -m tests.helper.load_test --jobs 40 --testcases 1000 --latency 0.05
+"""
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import os
+import sys
+import json
+import click
+import shutil
+import tempfile
+from tests.helper.classes.junit_generator import JUnitGenerator
+from tests.helper.classes.fake_qtest_server import FakeQTestServer
+from tests.helper.classes.load_test import LoadTest, format_report
+
+# The config of every job when no config file is given
+DEFAULT_CONFIG = {'zigzag': {'test_cycle': 'pike',
+                             'project_id': '12345',
+                             'build_url': 'https://bar.com/foo',
+                             'build_number': '78',
+                             'module_hierarchy': ['one', 'two', 'three'],
+                             'path_to_test_exec_dir': ''}}
+
+
+# ======================================================================================================================
+# Main
+# ======================================================================================================================
+@click.command()
+@click.option('--jobs', type=click.IntRange(min=1), default=40,
+              help='The number of ZigZag processes uploading at the same time')
+@click.option('--ramp-up', type=click.FloatRange(min=0), default=0.0,
+              help='The number of seconds over which the start of the uploads is spread evenly')
+@click.option('--testcases', type=click.IntRange(min=1), default=1000,
+              help="The number of 'testcase' elements of the generated JUnitXML file")
+@click.option('--junit-xml', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='Upload this JUnitXML file instead of a generated one')
+@click.option('--config', type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Use this ZigZag config file instead of one with the 'pike' test cycle")
+@click.option('--latency', type=click.FloatRange(min=0), default=0.05,
+              help='The number of seconds every request to the qTest stand-in is delayed')
+@click.option('--latency-jitter', type=click.FloatRange(min=0), default=0.0,
+              help='The maximum number of random seconds added to the latency of a request')
+@click.option('--error-rate', type=click.FloatRange(0, 1), default=0.0,
+              help='The fraction of requests that fail with --error-status')
+@click.option('--error-status', type=int, default=503,
+              help='The HTTP status code of an injected error')
+@click.option('--job-duration', type=click.FloatRange(min=0), default=0.0,
+              help='The number of seconds a queue job of the qTest stand-in stays pending')
+@click.option('--batch-size', type=click.IntRange(min=1), default=1000,
+              help='The maximum number of test logs submitted in a single request')
+@click.option('--workers', type=click.IntRange(min=1), default=4,
+              help='The maximum number of requests every job sends at the same time')
+@click.option('--no-link', is_flag=True, default=False,
+              help='Do not link the requirements (Jira tickets) of the test logs')
+@click.option('--cache-path', type=click.Path(dir_okay=False), default=None,
+              help='The path to a cache of qTest lookups shared between the jobs')
+@click.option('--json', 'json_output', is_flag=True, default=False,
+              help='Print the report as JSON')
+@click.option('--fail-on-duplicates', is_flag=True, default=False,
+              help='Exit with an error when a test cycle was created more than once')
+def main(jobs,
+         ramp_up,
+         testcases,
+         junit_xml,
+         config,
+         latency,
+         latency_jitter,
+         error_rate,
+         error_status,
+         job_duration,
+         batch_size,
+         workers,
+         no_link,
+         cache_path,
+         json_output,
+         fail_on_duplicates):
+    """Report the throughput, upload latency, requests per endpoint and duplicate test cycles of concurrent uploads."""
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        if junit_xml is None:
+            junit_xml = os.path.join(temp_dir, 'junit.xml')
+            JUnitGenerator(testcases, step_ratio=0.2, failure_rate=0.1, skip_rate=0.05, jira_count=2,
+                           jira_pool=200).write(junit_xml)
+        if config is None:
+            config = os.path.join(temp_dir, 'conf.json')
+            with open(config, 'w') as f:
+                json.dump(DEFAULT_CONFIG, f)
+
+        load_test = LoadTest(junit_xml, config, jobs, ramp_up, batch_size, workers, not no_link, cache_path)
+        with FakeQTestServer(latency=latency,
+                             latency_jitter=latency_jitter,
+                             error_rate=error_rate,
+                             error_status=error_status,
+                             job_duration=job_duration) as fake_qtest:
+            report = load_test.run(fake_qtest)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    click.echo(json.dumps(report, indent=2, sort_keys=True) if json_output else format_report(report))
+
+    if report['failed_jobs'] or (fail_on_duplicates and report['duplicate_test_cycles']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
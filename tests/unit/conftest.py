@@ -152,6 +152,30 @@ def simple_json_config(tmpdir_factory):
     return config_path
 
 
+@pytest.fixture(scope='session')
+def per_log_attachment_json_config(tmpdir_factory):
+    """config sample that attaches the junit.xml to every test log"""
+    config = \
+"""
+{
+    "zigzag": {
+        "test_cycle": "pike",
+        "project_id": "12345",
+        "module_hierarchy": ["one","two","three"],
+        "path_to_test_exec_dir": "{{ '' }}",
+        "junit_xml_attachment": "log"
+    }
+}
+""" # noqa
+
+    config_path = tmpdir_factory.mktemp('data').join('./conf.json').strpath
+
+    with open(str(config_path), 'w') as f:
+        f.write(config)
+
+    return config_path
+
+
 @pytest.fixture(scope='session')
 def single_passing_xml(tmpdir_factory,
                        default_global_properties,
@@ -714,6 +738,28 @@ def xml_with_unknown_elements(tmpdir_factory, default_global_properties):
     return filename
 
 
+@pytest.fixture(scope='session')
+def schema_violation_xml(tmpdir_factory, default_global_properties, default_testcase_properties):
+    """JUnitXML sample representing a test suite that is missing attributes required by the schema."""
+
+    filename = tmpdir_factory.mktemp('data').join('schema_violation.xml').strpath
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+        <testsuite name="pytest" tests="1">
+            {global_properties}
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+            name="test_pass[ansible://localhost]" time="0.00372695922852">
+                {testcase_properties}
+            </testcase>
+        </testsuite>
+        """.format(global_properties=default_global_properties, testcase_properties=default_testcase_properties)
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
+
+
 @pytest.fixture(scope='session')
 def missing_build_url_xml(tmpdir_factory, default_testcase_properties, default_testcase_elements):
     """JUnitXML sample representing a test suite that is missing the "BUILD_URL" property."""
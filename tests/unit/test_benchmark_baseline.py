@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from tests.helper.classes.benchmark_baseline import normalize, median_ratios, compare, format_comparison
+
+
+# ======================================================================================================================
+# Helpers
+# ======================================================================================================================
+def _results(minimums):
+    """Build a pytest-benchmark JSON report with the given fastest rounds.
+
+    Returns:
+        dict
+    """
+
+    return {'benchmarks': [{'name': name, 'stats': {'min': minimum}} for name, minimum in minimums.items()]}
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestBenchmarkBaseline(object):
+    """Tests for the machine independent baseline of the benchmarks"""
+
+    def test_normalize(self):
+        """Verify that the same code on a machine twice as fast has the same ratios"""
+
+        # Setup
+        slow = _results({'test_calibration': 0.02, 'test_parse[1000]': 0.08})
+        fast = _results({'test_calibration': 0.01, 'test_parse[1000]': 0.04})
+
+        # Test
+        assert {'test_parse[1000]': 4.0} == normalize(slow) == normalize(fast)
+
+    def test_normalize_without_calibration(self):
+        """Verify that results without the calibration benchmark are rejected"""
+
+        # Test
+        with pytest.raises(RuntimeError, match="The 'test_calibration' benchmark is missing"):
+            normalize(_results({'test_parse[1000]': 0.08}))
+
+    def test_median_ratios(self):
+        """Verify that the median ratio of every benchmark across runs is used"""
+
+        # Test
+        assert {'a': 2.0, 'b': 1.5} == median_ratios([{'a': 1.0, 'b': 1.0}, {'a': 2.0, 'b': 2.0}, {'a': 9.0}])
+
+    def test_compare(self):
+        """Verify that only benchmarks in both the run and the baseline that grew beyond the tolerance regressed"""
+
+        # Setup
+        baseline = {'test_parse[1000]': 4.0, 'test_test_logs[1000]': 2.0, 'test_parse[100000]': 300.0}
+        ratios = {'test_parse[1000]': 6.5, 'test_test_logs[1000]': 2.9, 'test_calibration_free': 1.0}
+
+        # Test
+        assert [('test_parse[1000]', 4.0, 6.5)] == compare(ratios, baseline, 0.5)
+        assert not compare(ratios, baseline, 1.0)
+        report = format_comparison(ratios, baseline, 0.5)
+        assert 'REGRESSED' in report.splitlines()[1]
+        assert 'Not run: test_parse[100000]' in report
@@ -5,7 +5,9 @@
 # ======================================================================================================================
 import swagger_client
 from zigzag import cli
+from swagger_client.rest import ApiException
 from click.testing import CliRunner
+from tests.helper.classes.fake_qtest_server import FakeQTestServer
 import requests
 import json
 
@@ -39,8 +41,9 @@ def test_cli_happy_path(single_passing_xml, simple_json_config, mocker):
 
     mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
     mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
     mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
-    mocker.patch('requests.post', return_value=mock_post_response)
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
     mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
     # Test
@@ -50,6 +53,173 @@ def test_cli_happy_path(single_passing_xml, simple_json_config, mocker):
     assert 'Success!' in result.output
 
 
+def test_cli_queue_timeout(single_passing_xml, simple_json_config, mocker):
+    """Verify that a slow queue is reported as a timeout and not as a failed upload."""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    runner = CliRunner()
+
+    # Mock
+    response = {'items': [], 'total': 0}
+    mock_post_response = mocker.Mock(spec=requests.Response)
+    mock_post_response.text = json.dumps(response)
+    mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+    mock_field_resp.id = 12345
+    mock_field_resp.label = 'Failure Output'
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id='54321')
+    mock_track_resp = swagger_client.QueueProcessingResponse(id=54321, state='IN_PROCESSING')
+    mock_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+    mock_tc_resp.to_dict.return_value = {'name': 'pike', 'pid': 'CL-1'}
+
+    mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mock_track_resp)
+    mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
+
+    # Test
+    result = runner.invoke(cli.main, args=('--wait-timeout', '0', simple_json_config, single_passing_xml),
+                           env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Timed out after 0.0 seconds waiting for Job IDs: 54321' in result.output
+    assert 'Uploaded!' in result.output
+    assert 'Failed!' not in result.output
+
+    result = runner.invoke(cli.main, args=('--wait', '--wait-timeout', '0', simple_json_config, single_passing_xml),
+                           env=env_vars)
+    assert 1 == result.exit_code
+    assert 'Timed out!' in result.output
+    assert 'Failed!' not in result.output
+
+
+def test_cli_poll_errors(single_passing_xml, simple_json_config, mocker):
+    """Verify that the CLI reports the polls of the queue jobs that failed and were tried again."""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    runner = CliRunner()
+    cli_arguments = ('--wait', '--no-link', simple_json_config, single_passing_xml)
+
+    # Mock
+    mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+    mock_field_resp.id = 12345
+    mock_field_resp.label = 'Failure Output'
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id='54321')
+    mock_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+    mock_tc_resp.to_dict.return_value = {'name': 'pike', 'pid': 'CL-1'}
+
+    mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track',
+                 side_effect=[ApiException(status=502, reason='Bad Gateway'),
+                              swagger_client.QueueProcessingResponse(id=54321, state='SUCCESS')])
+    mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
+    mocker.patch('zigzag.queue_job_facade.time').time.return_value = 0
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Failed to poll Job ID: 54321, polled again' in result.output
+    assert 'Reason: Bad Gateway' in result.output
+    assert 'Queue Job ID: 54321 State: SUCCESS' in result.output
+
+
+def test_cli_wait(single_passing_xml, simple_json_config, mocker):
+    """Verify that the CLI will wait for the queue job to finish when asked to."""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    runner = CliRunner()
+    cli_arguments = ('--wait', simple_json_config, single_passing_xml)
+
+    # Expectation
+    job_id = '54321'
+
+    # Mock
+    response = {'items': [], 'total': 0}
+    mock_post_response = mocker.Mock(spec=requests.Response)
+    mock_post_response.text = json.dumps(response)
+    mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+    mock_field_resp.id = 12345
+    mock_field_resp.label = 'Failure Output'
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id=job_id)
+    mock_track_resp = swagger_client.QueueProcessingResponse(id=int(job_id), state='SUCCESS')
+    mock_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+    mock_tc_resp.to_dict.return_value = {'name': 'pike', 'pid': 'CL-1'}
+
+    mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mock_track = mocker.patch('swagger_client.TestlogApi.track', return_value=mock_track_resp)
+    mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    assert 'Queue Job ID: {} State: SUCCESS'.format(job_id) in result.output
+    mock_track.assert_called_once_with(int(job_id))
+
+
+def test_cli_profile(single_passing_xml, simple_json_config, tmpdir, mocker):
+    """Verify that the CLI will write the timing of every phase as JSON when asked to."""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    runner = CliRunner()
+    profile_path = tmpdir.join('profile.json').strpath
+    cli_arguments = ('--no-link', '--profile', 'json', '--profile-output', profile_path,
+                     simple_json_config, single_passing_xml)
+
+    # Mock
+    response = {'items': [], 'total': 0}
+    mock_post_response = mocker.Mock(spec=requests.Response)
+    mock_post_response.text = json.dumps(response)
+    mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+    mock_field_resp.id = 12345
+    mock_field_resp.label = 'Failure Output'
+    mock_queue_resp = mocker.Mock(state='IN_WAITING', id='54321')
+    mock_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+    mock_tc_resp.to_dict.return_value = {'name': 'pike', 'pid': 'CL-1'}
+
+    mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+    mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
+
+    # Test
+    result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+    assert 0 == result.exit_code
+    with open(profile_path) as f:
+        spans = {span['name']: span for span in json.load(f)['spans']}
+    for name in ('parse', 'generate', 'upload', 'qtest.submit'):
+        assert 1 == spans[name]['calls']
+        assert spans[name]['wall_time'] >= 0
+    assert 'wait' not in spans
+
+
+def test_cli_fake_qtest(single_passing_xml, simple_json_config):
+    """Verify that the CLI uploads and links the test results end to end against a local qTest stand-in that fails
+    some requests."""
+
+    # Setup
+    env_vars = {'QTEST_API_TOKEN': 'valid_token'}
+    runner = CliRunner()
+
+    with FakeQTestServer(error_rate=0.3, error_status=503, error_endpoints=['search', 'track']) as fake_qtest:
+        cli_arguments = ('--qtest-url', fake_qtest.url, simple_json_config, single_passing_xml)
+
+        # Test
+        result = runner.invoke(cli.main, args=cli_arguments, env=env_vars)
+        assert 0 == result.exit_code
+        assert 'Success!' in result.output
+        assert ['pike'] == [test_cycle['name'] for test_cycle in fake_qtest.test_cycles(12345)]
+        test_case_ids = list(fake_qtest.test_case_ids(12345).values())
+        assert 1 == len(test_case_ids)
+        assert [{test_case_ids[0]}] * 2 == list(fake_qtest.links(12345).values())
+        assert 1 == fake_qtest.request_counts['submit']
+
+
 def test_cli_missing_api_token(single_passing_xml, simple_json_config, mocker):
     """Verify that the CLI will gracefully fail if the expected API token env var is not set."""
 
@@ -74,6 +244,7 @@ def test_cli_missing_api_token(single_passing_xml, simple_json_config, mocker):
 
     mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
     mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
     mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
 
     # Test
@@ -113,7 +284,8 @@ def test_specify_test_cycle(single_passing_xml, simple_json_config, mocker):
 
     mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
     mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
-    mocker.patch('requests.post', return_value=mock_post_response)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
     mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
     mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_get_tc_resp])
     mocker.patch('swagger_client.TestcycleApi.create_cycle', return_value=mock_create_tc_resp)
@@ -151,6 +323,7 @@ def test_cli_pprint_on_fail(xml_with_unknown_elements, simple_json_config, mocke
 
     mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
     mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
     mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
 
     # Test
@@ -188,8 +361,9 @@ def test_cli_config_option(simple_json_config, single_passing_xml, mocker):
 
     mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
     mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
     mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
-    mocker.patch('requests.post', return_value=mock_post_response)
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
     mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
     # Test
@@ -227,8 +401,9 @@ def test_cli_malformed_config(invalid_json_config, single_passing_xml, mocker):
 
     mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
     mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
     mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
-    mocker.patch('requests.post', return_value=mock_post_response)
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
     mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
     # Test
@@ -264,8 +439,9 @@ def test_cli_missing_config(simple_json_config, single_passing_xml, mocker):
 
     mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
     mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
+    mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='SUCCESS'))
     mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
-    mocker.patch('requests.post', return_value=mock_post_response)
+    mocker.patch('requests.Session.post', return_value=mock_post_response)
     mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
     # Test
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import os
+import sys
+import json
+import subprocess
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+HEAVY_MODULES = ['swagger_client', 'lxml', 'jinja2', 'jsonschema', 'requests', 'pkg_resources']
+IMPORTED_HEAVY_MODULES_SCRIPT = \
+    """
+import sys
+import json
+from zigzag import cli
+try:
+    cli.main({args}, standalone_mode=False)
+except SystemExit:
+    pass
+print(json.dumps(sorted(m for m in {heavy_modules} if m in sys.modules)))
+"""
+
+
+# ======================================================================================================================
+# Helpers
+# ======================================================================================================================
+def _imported_heavy_modules(args, env=None):
+    """Run the zigzag CLI in a fresh interpreter and report which heavy dependencies were imported
+
+    Args:
+        args (list(str)): the CLI arguments
+        env (dict): the environment for the interpreter
+
+    Returns:
+        list(str): the heavy modules that were imported
+    """
+
+    script = IMPORTED_HEAVY_MODULES_SCRIPT.format(args=args, heavy_modules=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', script], env=env).decode('UTF-8')
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestImportTime(object):
+    """Tests that the zigzag CLI only imports its heavy dependencies when it needs them
+    (The wall time of the import is measured by 'make benchmark-import')"""
+
+    def test_help_imports_no_heavy_modules(self):
+        """Verify that printing the CLI help does not import any heavy dependency"""
+
+        assert [] == _imported_heavy_modules(['--help'])
+
+    def test_missing_token_imports_no_heavy_modules(self, single_passing_xml, simple_json_config):
+        """Verify that failing on a missing API token does not import any heavy dependency"""
+
+        env = {k: v for k, v in os.environ.items() if k != 'QTEST_API_TOKEN'}
+
+        assert [] == _imported_heavy_modules([simple_json_config, single_passing_xml], env)
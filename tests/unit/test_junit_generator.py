@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from lxml import etree
+from zigzag.zigzag import ZigZag
+from tests.helper.classes.junit_generator import JUnitGenerator
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestJUnitGenerator(object):
+    """Tests for the synthetic JUnitXML generator used to reproduce large test runs offline"""
+
+    def test_parse(self, simple_json_config, tmpdir, mocker):
+        """Verify that ZigZag can parse a generated file with test steps, failures and Jira tickets"""
+
+        # Mock
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[])
+
+        # Setup
+        file_path = tmpdir.join('synthetic.xml').strpath
+        JUnitGenerator(100, step_ratio=0.5, steps_per_case=5, failure_rate=0.2, skip_rate=0.1, jira_count=2).write(
+            file_path)
+        zz = ZigZag(file_path, simple_json_config, 'totally_a_real_token')
+        zz.parse()
+
+        # Test
+        testsuite = zz.junit_xml
+        assert '100' == testsuite.attrib['tests']
+        assert str(len(testsuite.findall("./testcase/failure"))) == testsuite.attrib['failures']
+        assert str(len(testsuite.findall("./testcase/skipped"))) == testsuite.attrib['skips']
+        assert 50 == len(testsuite.findall("./testcase/properties/property[@name='test_step'][@value='true']"))
+        assert 200 == len(testsuite.findall("./testcase/properties/property[@name='jira']"))
+        assert 50 + 10 == len(zz.test_logs)
+
+    def test_streaming(self):
+        """Verify that the document is rendered one 'testcase' element at a time and the same seed renders it again"""
+
+        # Setup
+        generator = JUnitGenerator(1000, failure_rate=0.5, failure_output_size=10000, seed=42)
+        chunks = list(generator.generate())
+
+        # Test
+        assert max(len(chunk) for chunk in chunks) < 20000
+        assert chunks == list(generator.generate())
+        assert 1000 == len(etree.fromstring(''.join(chunks).encode('utf-8')).findall('./testcase'))
+
+    def test_invalid_rates(self):
+        """Verify that failure, error and skip rates above 100% are rejected"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            JUnitGenerator(10, failure_rate=0.6, skip_rate=0.6)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+from tests.helper.classes.junit_generator import JUnitGenerator
+from tests.helper.classes.fake_qtest_server import FakeQTestServer
+from tests.helper.classes.load_test import LoadTest, percentile, duplicate_test_cycles, format_report
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestLoadTest(object):
+    """Tests for the harness that uploads from many ZigZag processes at the same time"""
+
+    def test_contention(self, tmpdir):
+        """Verify that concurrent uploads are reported and the root test cycle created by every job is caught"""
+
+        # Setup
+        junit_xml_file = tmpdir.join('junit.xml').strpath
+        JUnitGenerator(20, jira_count=1, jira_pool=5).write(junit_xml_file)
+        config_file = tmpdir.join('conf.json').strpath
+        with open(config_file, 'w') as f:
+            json.dump({'zigzag': {'test_cycle': 'pike',
+                                  'project_id': '12345',
+                                  'build_url': 'https://bar.com/foo',
+                                  'build_number': '78',
+                                  'module_hierarchy': ['one', 'two', 'three'],
+                                  'path_to_test_exec_dir': ''}}, f)
+
+        # every job lists the test cycles before any of them can create the root test cycle
+        with FakeQTestServer(barriers={'list_test_cycles': 4}) as fake_qtest:
+            report = LoadTest(junit_xml_file, config_file, jobs=4).run(fake_qtest)
+            root_test_cycles = fake_qtest.test_cycles(12345)
+
+        # Test
+        assert 4 == report['jobs']
+        assert not report['failed_jobs']
+        assert 0 < report['latency_p50'] <= report['latency_p99']
+        assert 0 < report['uploads_per_second']
+        assert 4 == report['request_counts']['submit']
+        assert 4 == report['request_counts']['list_test_cycles']
+        assert 4 == report['request_counts']['create_test_cycle']
+        assert 4 == len(root_test_cycles)
+        assert {'pike': 4} == report['duplicate_test_cycles']
+        assert "Duplicate test cycles: 'pike' x4" in format_report(report)
+
+    def test_percentile(self):
+        """Verify that percentiles use the nearest rank"""
+
+        # Setup
+        values = [float(value) for value in range(100, 0, -1)]
+
+        # Test
+        assert 50.0 == percentile(values, 50)
+        assert 99.0 == percentile(values, 99)
+        assert 7.0 == percentile([7.0], 99)
+        assert percentile([], 50) is None
+
+    def test_duplicate_test_cycles(self):
+        """Verify that only test cycles with the same name under the same parent are duplicates (Case insensitive)"""
+
+        # Setup
+        test_cycles = [{'name': 'Pike', 'parent_id': 0},
+                       {'name': 'pike', 'parent_id': 0},
+                       {'name': 'pike', 'parent_id': 7},
+                       {'name': 'queens', 'parent_id': 0}]
+
+        # Test
+        assert {'Pike': 2} == duplicate_test_cycles(test_cycles)
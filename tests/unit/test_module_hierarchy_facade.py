@@ -48,7 +48,7 @@ class TestDiscoverParentTestCycle(object):
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
 
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
 
@@ -75,7 +75,7 @@ class TestDiscoverParentTestCycle(object):
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
 
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
 
@@ -108,7 +108,7 @@ class TestDiscoverParentTestCycle(object):
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
 
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_get_tc_resp])
         mocker.patch('swagger_client.TestcycleApi.create_cycle', return_value=mock_create_tc_resp)
@@ -136,7 +136,7 @@ class TestDiscoverParentTestCycle(object):
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
 
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_tc_resp])
 
@@ -158,7 +158,7 @@ class TestDiscoverParentTestCycle(object):
         response = {'items': [{'name': 'insert name here', 'id': 12345}], 'total': 1}
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.TestcycleApi.get_test_cycles', side_effect=ApiException('Super duper failure!'))
 
@@ -184,7 +184,7 @@ class TestDiscoverParentTestCycle(object):
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
 
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_get_tc_resp])
         mocker.patch('swagger_client.TestcycleApi.create_cycle', side_effect=ApiException('Super duper failure!'))
@@ -197,3 +197,71 @@ class TestDiscoverParentTestCycle(object):
         # Test
         with pytest.raises(RuntimeError):
             mhf.discover_root_test_cycle(test_cycle_name)
+
+
+class TestCachedTestCycle(object):
+    """Test cases for discovering test cycles with the persistent cache"""
+
+    def test_root_test_cycles_only(self, single_passing_xml, mocker):
+        """Verify that only the test cycles at the root are listed"""
+
+        # Mock
+        mock_get_tcs = mocker.patch('swagger_client.TestcycleApi.get_test_cycles',
+                                    return_value=[swagger_client.TestCycleResource(id=1, name='Queens', pid='CL-1')])
+
+        # Setup
+        zz = ZigZag(single_passing_xml, TOKEN, PROJECT_ID, TEST_CYCLE)
+        zz.qtest_project_id = PROJECT_ID
+        mhf = ModuleHierarchyFacade(zz)
+
+        # Test
+        assert 'CL-1' == mhf.discover_root_test_cycle('queens')
+        mock_get_tcs.assert_called_once_with(PROJECT_ID, parent_id=0, parent_type='root')
+
+    def test_cache_hit(self, single_passing_xml, mocker, tmpdir):
+        """Verify that a cached test cycle is checked instead of listing the test cycles again"""
+
+        # Mock
+        test_cycle = swagger_client.TestCycleResource(id=1, name='queens', pid='CL-1')
+        mock_get_tcs = mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[test_cycle])
+        mock_get_tc = mocker.patch('swagger_client.TestcycleApi.get_test_cycle', return_value=test_cycle)
+        cache_path = tmpdir.join('zigzag.sqlite3').strpath
+
+        # Setup
+        pids = []
+        for _ in range(3):
+            zz = ZigZag(single_passing_xml, TOKEN, PROJECT_ID, TEST_CYCLE, cache_path=cache_path)
+            zz.qtest_project_id = PROJECT_ID
+            pids.append(ModuleHierarchyFacade(zz).discover_root_test_cycle('Queens'))
+
+        # Test
+        assert ['CL-1', 'CL-1', 'CL-1'] == pids
+        assert 1 == mock_get_tcs.call_count
+        assert [mocker.call(PROJECT_ID, 1), mocker.call(PROJECT_ID, 1)] == mock_get_tc.call_args_list
+
+    @pytest.mark.parametrize('get_test_cycle', [
+        {'side_effect': ApiException(status=404, reason='Not Found')},
+        {'return_value': swagger_client.TestCycleResource(id=1, name='renamed', pid='CL-1')},
+    ])
+    def test_stale_cache(self, single_passing_xml, mocker, tmpdir, get_test_cycle):
+        """Verify that a test cycle that was deleted or renamed since it was cached is discovered again"""
+
+        # Mock
+        mocker.patch('swagger_client.TestcycleApi.get_test_cycles',
+                     return_value=[swagger_client.TestCycleResource(id=1, name='queens', pid='CL-1')])
+        cache_path = tmpdir.join('zigzag.sqlite3').strpath
+
+        # Setup
+        zz = ZigZag(single_passing_xml, TOKEN, PROJECT_ID, TEST_CYCLE, cache_path=cache_path)
+        zz.qtest_project_id = PROJECT_ID
+        ModuleHierarchyFacade(zz).discover_root_test_cycle('queens')
+        mocker.patch('swagger_client.TestcycleApi.get_test_cycle', **get_test_cycle)
+        mock_get_tcs = mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[])
+        mocker.patch('swagger_client.TestcycleApi.create_cycle',
+                     return_value=swagger_client.TestCycleResource(id=2, name='queens', pid='CL-2'))
+
+        # Test
+        assert 'CL-2' == ModuleHierarchyFacade(zz).discover_root_test_cycle('queens')
+        assert 1 == mock_get_tcs.call_count
+        cache_key = (str(PROJECT_ID), 'queens')
+        assert {cache_key: {'id': 2, 'pid': 'CL-2'}} == zz.persistent_cache.get_many('test-cycles', [cache_key])
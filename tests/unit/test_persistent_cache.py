@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from multiprocessing.pool import ThreadPool
+from zigzag.persistent_cache import PersistentCache
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestPersistentCache(object):
+    """Tests for the PersistentCache class"""
+
+    def test_round_trip(self, tmpdir):
+        """Verify that entries are shared between cache instances using the same file"""
+
+        # Setup
+        path = tmpdir.join('cache', 'zigzag.sqlite3').strpath
+        PersistentCache(path).set_many('test-cases', {('1', 'uuid-1'): 123, ('1', 'uuid-2'): None})
+
+        # Test
+        result = PersistentCache(path).get_many('test-cases', [('1', 'uuid-1'), ('1', 'uuid-2'), ('2', 'uuid-1')])
+        assert {('1', 'uuid-1'): 123, ('1', 'uuid-2'): None} == result
+
+    def test_namespaces(self, tmpdir):
+        """Verify that the same key in different namespaces are different entries"""
+
+        # Setup
+        cache = PersistentCache(tmpdir.join('zigzag.sqlite3').strpath)
+        cache.set_many('test-cases', {('1', 'ASC-123'): 123})
+
+        # Test
+        assert {} == cache.get_many('requirements', [('1', 'ASC-123')])
+
+    def test_ttl(self, tmpdir, mocker):
+        """Verify that expired entries are not returned"""
+
+        # Mock
+        mock_time = mocker.patch('zigzag.persistent_cache.time')
+
+        # Setup
+        cache = PersistentCache(tmpdir.join('zigzag.sqlite3').strpath, ttl=100)
+        mock_time.time.return_value = 1000
+        cache.set_many('test-cases', {('1', 'uuid-1'): 1})
+        cache.set_many('test-cases', {('1', 'uuid-2'): 2}, ttl=10)
+
+        # Test
+        mock_time.time.return_value = 1050
+        assert {('1', 'uuid-1'): 1} == cache.get_many('test-cases', [('1', 'uuid-1'), ('1', 'uuid-2')])
+        mock_time.time.return_value = 1100
+        assert {} == cache.get_many('test-cases', [('1', 'uuid-1'), ('1', 'uuid-2')])
+
+    def test_max_entries(self, tmpdir, mocker):
+        """Verify that the least recently used entries are evicted"""
+
+        # Mock
+        mock_time = mocker.patch('zigzag.persistent_cache.time')
+
+        # Setup
+        cache = PersistentCache(tmpdir.join('zigzag.sqlite3').strpath, max_entries=2)
+        mock_time.time.return_value = 1
+        cache.set_many('test-cases', {('1', 'uuid-1'): 1})
+        mock_time.time.return_value = 2
+        cache.set_many('test-cases', {('1', 'uuid-2'): 2})
+        mock_time.time.return_value = 3
+        cache.get_many('test-cases', [('1', 'uuid-1')])
+        mock_time.time.return_value = 4
+        cache.set_many('test-cases', {('1', 'uuid-3'): 3})
+
+        # Test
+        keys = [('1', 'uuid-{}'.format(i)) for i in range(1, 4)]
+        assert {('1', 'uuid-1'): 1, ('1', 'uuid-3'): 3} == cache.get_many('test-cases', keys)
+
+    def test_many_keys(self, tmpdir):
+        """Verify that more keys than SQLite accepts in a single statement can be read at once"""
+
+        # Setup
+        cache = PersistentCache(tmpdir.join('zigzag.sqlite3').strpath)
+        values = {('1', 'uuid-{}'.format(i)): i for i in range(2000)}
+        cache.set_many('test-cases', values)
+
+        # Test
+        assert values == cache.get_many('test-cases', list(values))
+
+    def test_concurrent_writers(self, tmpdir):
+        """Verify that concurrent writers do not lose entries"""
+
+        # Setup
+        path = tmpdir.join('zigzag.sqlite3').strpath
+
+        def _write(i):
+            PersistentCache(path).set_many('test-cases', {('1', 'uuid-{}'.format(i)): i})
+
+        pool = ThreadPool(8)
+        pool.map(_write, range(50))
+        pool.close()
+        pool.join()
+
+        # Test
+        keys = [('1', 'uuid-{}'.format(i)) for i in range(50)]
+        assert 50 == len(PersistentCache(path).get_many('test-cases', keys))
+
+    def test_disabled(self):
+        """Verify that a cache without a path does not store anything"""
+
+        # Setup
+        cache = PersistentCache()
+        cache.set_many('test-cases', {('1', 'uuid-1'): 1})
+
+        # Test
+        assert not cache.enabled
+        assert {} == cache.get_many('test-cases', [('1', 'uuid-1')])
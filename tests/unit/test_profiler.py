@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import json
+import time
+import pytest
+from zigzag.qtest_engine import QTestEngine
+from zigzag.profiler import Profiler
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestSpan(object):
+    """Tests for the span() function"""
+
+    def test_totals(self):
+        """Verify that every call of a span is counted and timed"""
+
+        # Setup
+        profiler = Profiler()
+        for _ in range(3):
+            with profiler.span('parse'):
+                time.sleep(0.01)
+
+        # Test
+        report = profiler.report()
+        assert ['parse'] == [span['name'] for span in report]
+        assert 3 == report[0]['calls']
+        assert report[0]['wall_time'] >= 0.03
+        assert report[0]['cpu_time'] >= 0
+
+    def test_nesting(self):
+        """Verify that nested spans are reported in the order they were first opened"""
+
+        # Setup
+        profiler = Profiler()
+        with profiler.span('parse'):
+            with profiler.span('parse.read'):
+                pass
+            with profiler.span('parse.validate'):
+                pass
+
+        # Test
+        assert ['parse', 'parse.read', 'parse.validate'] == [span['name'] for span in profiler.report()]
+
+    def test_exception(self):
+        """Verify that a span is counted when the block raises"""
+
+        # Setup
+        profiler = Profiler()
+        with pytest.raises(RuntimeError):
+            with profiler.span('upload'):
+                raise RuntimeError('The qTest API reported an error!')
+
+        # Test
+        assert 1 == profiler.report()[0]['calls']
+
+    def test_threads(self):
+        """Verify that spans opened concurrently on several threads are all counted"""
+
+        # Setup
+        profiler = Profiler()
+
+        def _call(i):
+            with profiler.span('qtest.search'):
+                time.sleep(0.01)
+
+        QTestEngine(4).map(_call, range(20))
+
+        # Test
+        assert 20 == profiler.report()[0]['calls']
+
+
+class TestFormat(object):
+    """Tests for the format_text() and format_json() functions"""
+
+    def test_text(self):
+        """Verify that the text report has a row for every span"""
+
+        # Setup
+        profiler = Profiler()
+        with profiler.span('parse'):
+            pass
+        with profiler.span('upload'):
+            pass
+
+        # Test
+        lines = profiler.format_text().splitlines()
+        assert 3 == len(lines)
+        assert lines[0].split() == ['Phase', 'Calls', 'Wall', '(s)', 'CPU', '(s)']
+        assert lines[1].split()[:2] == ['parse', '1']
+        assert lines[2].split()[:2] == ['upload', '1']
+
+    def test_json(self):
+        """Verify that the JSON report has the totals of every span"""
+
+        # Setup
+        profiler = Profiler()
+        with profiler.span('parse'):
+            pass
+
+        # Test
+        report = json.loads(profiler.format_json())
+        assert profiler.report() == report['spans']
+        assert {'name', 'calls', 'wall_time', 'cpu_time'} == set(report['spans'][0])
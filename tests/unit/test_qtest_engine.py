@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import time
+import pytest
+from threading import Lock
+from zigzag.qtest_engine import QTestEngine
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestQTestEngine(object):
+    """Tests for the map() function"""
+
+    def test_order(self):
+        """Verify that the results are in the order of the items"""
+
+        # Setup
+        engine = QTestEngine(4)
+
+        # Test
+        assert [i * 2 for i in range(20)] == engine.map(lambda i: i * 2, range(20))
+        assert [] == engine.map(lambda i: i * 2, [])
+
+    def test_concurrency(self):
+        """Verify that calls run concurrently without going over the concurrency limit"""
+
+        # Setup
+        lock = Lock()
+        running = [0]
+        max_running = [0]
+
+        def _call(i):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        engine = QTestEngine(3)
+        start = time.time()
+        engine.map(_call, range(9))
+
+        # Test
+        assert 3 == max_running[0]
+        assert time.time() - start < 0.05 * 9
+
+    def test_concurrency_override(self, mocker):
+        """Verify that the concurrency limit can be overridden for a single call"""
+
+        # Mock
+        mock_pool = mocker.patch('zigzag.qtest_engine.ThreadPool')
+
+        # Setup
+        QTestEngine(3).map(lambda i: i, range(9), max_concurrency=5)
+
+        # Test
+        mock_pool.assert_called_once_with(5)
+
+    def test_exception(self):
+        """Verify that an exception raised by a call is raised to the caller"""
+
+        # Setup
+        def _call(i):
+            if i == 5:
+                raise RuntimeError('The qTest API reported an error!')
+            return i
+
+        # Test
+        with pytest.raises(RuntimeError, match='The qTest API reported an error'):
+            QTestEngine(4).map(_call, range(10))
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+import urllib3
+import requests
+import swagger_client
+from swagger_client.rest import ApiException
+from zigzag.zigzag import ZigZag
+from zigzag.qtest_session import RateLimiter
+from tests.helper.classes.fake_qtest_server import FakeQTestServer
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+TOKEN = 'VALID_TOKEN'
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestQTestSession(object):
+    """Tests for the pooled qTest session"""
+
+    def test_shared_connection_pool(self, single_passing_xml, simple_json_config):
+        """Verify that the swagger client uses the same connection pool as the session"""
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN, pool_size=7)
+        # noinspection PyProtectedMember
+        pool_manager = zz.qtest_session._adapter.poolmanager
+
+        # Test
+        assert 7 == zz.qtest_session.pool_size
+        assert 7 == pool_manager.connection_pool_kw['maxsize']
+        assert zz.qtest_session.api_client is swagger_client.configuration.api_client
+        assert zz.qtest_session.api_client is swagger_client.FieldApi().api_client
+        assert pool_manager is swagger_client.FieldApi().api_client.rest_client.pool_manager
+
+    def test_retry_policy(self, single_passing_xml, simple_json_config):
+        """Verify that a POST sent by the swagger client is only retried when qTest did not process it"""
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        # noinspection PyProtectedMember
+        retry = zz.qtest_session._adapter.poolmanager.connection_pool_kw['retries']
+
+        # Test
+        for status in (429, 500, 502, 503, 504):
+            assert retry.is_retry('GET', status)
+        for status in (429, 503):
+            assert retry.is_retry('POST', status)
+        for status in (400, 401, 404, 500, 502, 504):
+            assert not retry.is_retry('POST', status)
+        # a POST that timed out while reading the response may have been processed already
+        assert not retry._is_method_retryable('POST')
+        assert retry._is_method_retryable('GET')
+        assert not retry.raise_on_status
+
+    def test_submit_retries(self, single_passing_xml, simple_json_config):
+        """Verify that a submit is not sent again after a 500 response but is after a 503 response"""
+
+        for status, expected_submits in ((500, 1), (503, 4)):
+            # Setup
+            with FakeQTestServer(error_rate=1.0, error_status=status, error_endpoints=['submit']) as fake_qtest:
+                zz = ZigZag(single_passing_xml, simple_json_config, TOKEN, qtest_url=fake_qtest.url)
+                zz.parse()
+                with pytest.raises(RuntimeError):
+                    zz.upload_test_results()
+
+                # Test
+                assert expected_submits == fake_qtest.request_counts['submit']
+
+    def test_read_only_retry_policy(self, single_passing_xml, simple_json_config):
+        """Verify that the searches sent through the session are retried on 429 and 5xx responses like a GET"""
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        # noinspection PyProtectedMember
+        retry = zz.qtest_session._adapter.max_retries
+
+        # Test
+        for status in (429, 500, 502, 503, 504):
+            assert retry.is_retry('POST', status)
+        for status in (400, 401, 404):
+            assert not retry.is_retry('POST', status)
+        assert retry._is_method_retryable('POST')
+        assert not retry.raise_on_status
+
+    def test_swagger_connection_error(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that the swagger client reports a request that never got a response as an ApiException"""
+
+        # Mock
+        mocker.patch('urllib3.PoolManager.request',
+                     side_effect=urllib3.exceptions.MaxRetryError(None, '/api/v3/projects', 'Connection refused'))
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+
+        # Test
+        with pytest.raises(ApiException) as e:
+            zz.qtest_session.api_client.rest_client.request('GET', 'https://qtest.example.com/api/v3/projects')
+        assert 0 == e.value.status
+        assert 'MaxRetryError' in e.value.reason
+
+    def test_base_url(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that every request is sent to the configured qTest instance"""
+
+        # Mock
+        mock_post = mocker.patch('requests.Session.post')
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN, qtest_url='http://localhost:8080/')
+        zz.qtest_session.post(zz.qtest_session.url('/api/v3/projects/1/search'))
+
+        # Test
+        assert 'http://localhost:8080' == zz.qtest_session.base_url
+        assert 'http://localhost:8080' == swagger_client.FieldApi().api_client.host
+        assert 'http://localhost:8080/api/v3/projects/1/search' == mock_post.call_args[0][0]
+        assert 'https://apitryout.qtestnet.com/api/v3' == ZigZag(single_passing_xml, simple_json_config,
+                                                                 TOKEN).qtest_session.url('api/v3')
+
+
+class TestRateLimiter(object):
+    """Tests for the per host rate limit"""
+
+    def test_spacing(self, mocker):
+        """Verify that requests to the same host are spaced evenly and other hosts are not delayed"""
+
+        # Mock
+        mock_time = mocker.patch('zigzag.qtest_session.time')
+        mock_time.time.return_value = 100
+
+        # Setup
+        limiter = RateLimiter(4)
+        for _ in range(3):
+            limiter.acquire('qtest.example.com')
+        limiter.acquire('other.example.com')
+
+        # Test
+        assert [mocker.call(0.25), mocker.call(0.5)] == mock_time.sleep.call_args_list
+
+    def test_unlimited(self, mocker):
+        """Verify that requests are not delayed without a rate"""
+
+        # Mock
+        mock_time = mocker.patch('zigzag.qtest_session.time')
+        mock_time.time.return_value = 100
+
+        # Setup
+        limiter = RateLimiter()
+        for _ in range(3):
+            limiter.acquire('qtest.example.com')
+
+        # Test
+        assert not mock_time.sleep.called
+
+    def test_session_requests_limited(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that both the 'requests' calls and the swagger client calls go through the rate limiter"""
+
+        # Mock
+        mocker.patch('requests.Session.post', return_value=mocker.Mock(spec=requests.Response))
+        mock_request = mocker.patch('swagger_client.rest.RESTClientObject.request')
+        mock_acquire = mocker.patch.object(RateLimiter, 'acquire')
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN, rate_limit=5)
+        zz.qtest_session.post('https://qtest.example.com/api/v3/projects/1/search')
+        zz.qtest_session.api_client.rest_client.request('GET', 'https://swagger.example.com/api/v3/projects')
+
+        # Test
+        assert 5 == zz.qtest_session.rate_limiter.rate
+        assert [mocker.call('qtest.example.com'), mocker.call('swagger.example.com')] == mock_acquire.call_args_list
+        assert mock_request.called
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+import swagger_client
+from zigzag.zigzag import ZigZag
+from zigzag.queue_job_facade import QueueJobTimeoutError
+from swagger_client.rest import ApiException
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+TOKEN = 'VALID_TOKEN'
+
+
+# ======================================================================================================================
+# Fixtures
+# ======================================================================================================================
+@pytest.fixture
+def mock_track(mocker):
+    """A mock patcher for the qTest queue processing endpoint that walks each job through a list of states."""
+
+    def _factory(job_states):
+        def _track(job_id):
+            states = job_states[job_id]
+            state = states.pop(0) if len(states) > 1 else states[0]
+            content = 'Job {} content'.format(job_id)
+            return swagger_client.QueueProcessingResponse(id=job_id, state=state, content=content)
+
+        return mocker.patch('swagger_client.TestlogApi.track', side_effect=_track)
+
+    return _factory
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestWait(object):
+    """Tests for the wait() function"""
+
+    def test_happy_path(self, single_passing_xml, simple_json_config, mock_track, mocker):
+        """Verify that every job is polled until it finished with a backoff between polls"""
+
+        # Mock
+        mock_track({1: ['IN_WAITING', 'SUCCESS'],
+                    2: ['IN_WAITING', 'IN_PROCESSING', 'PENDING', 'SUCCESS'],
+                    3: ['SUCCESS']})
+        mock_time = mocker.patch('zigzag.queue_job_facade.time')
+        mock_time.time.return_value = 0
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        states = zz.queue_job_facade.wait([1, 2, 3], interval=1, max_interval=3, backoff_factor=2)
+
+        # Test
+        assert {1: 'SUCCESS', 2: 'SUCCESS', 3: 'SUCCESS'} == states
+        assert [mocker.call(1), mocker.call(2), mocker.call(3)] == mock_time.sleep.call_args_list
+
+    def test_finished_jobs_not_polled_again(self, single_passing_xml, simple_json_config, mock_track, mocker):
+        """Verify that only the unfinished jobs are polled again"""
+
+        # Mock
+        mock = mock_track({1: ['SUCCESS'], 2: ['IN_WAITING', 'SUCCESS']})
+        mocker.patch('zigzag.queue_job_facade.time').time.return_value = 0
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        zz.queue_job_facade.wait([1, 2])
+
+        # Test
+        assert [mocker.call(1), mocker.call(2), mocker.call(2)] == sorted(mock.call_args_list)
+
+    def test_failed_job(self, single_passing_xml, simple_json_config, mock_track, mocker):
+        """Verify that a failed job is reported with its content"""
+
+        # Mock
+        mock_track({1: ['SUCCESS'], 2: ['IN_PROCESSING', 'FAILED']})
+        mocker.patch('zigzag.queue_job_facade.time').time.return_value = 0
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+
+        # Test
+        with pytest.raises(RuntimeError, match='Failed to process 1 of 2 jobs') as e:
+            zz.queue_job_facade.wait([1, 2])
+        assert 'Job ID: 2 State: FAILED\nJob 2 content' in str(e.value)
+
+    def test_api_exception(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that a 4xx error from the qTest API fails the job without polling it again"""
+
+        # Mock
+        mock = mocker.patch('swagger_client.TestlogApi.track',
+                            side_effect=ApiException(status=404, reason='Super duper failure!'))
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+
+        # Test
+        with pytest.raises(RuntimeError, match='The qTest API reported an error') as e:
+            zz.queue_job_facade.wait([1])
+        assert 'Job ID: 1 State: ERROR' in str(e.value)
+        assert 1 == mock.call_count
+
+    def test_transient_poll_errors(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that a job is polled again with the same backoff after a connection error, a 429 or a 5xx error"""
+
+        # Mock
+        mocker.patch('swagger_client.TestlogApi.track',
+                     side_effect=[ApiException(status=502, reason='Bad Gateway'),
+                                  ApiException(status=0, reason='MaxRetryError'),
+                                  ApiException(status=429, reason='Too Many Requests'),
+                                  swagger_client.QueueProcessingResponse(id=1, state='SUCCESS')])
+        mock_time = mocker.patch('zigzag.queue_job_facade.time')
+        mock_time.time.return_value = 0
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        states = zz.queue_job_facade.wait([1], interval=1, max_interval=3, backoff_factor=2)
+
+        # Test
+        assert {1: 'SUCCESS'} == states
+        assert [mocker.call(1), mocker.call(2), mocker.call(3)] == mock_time.sleep.call_args_list
+        assert 3 == len(zz.queue_job_facade.poll_errors)
+        assert zz.queue_job_facade.poll_errors[0].startswith('Failed to poll Job ID: 1, polled again')
+        assert 'Reason: Bad Gateway' in zz.queue_job_facade.poll_errors[0]
+
+    def test_transient_poll_errors_deadline(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that a job whose polls keep failing times out with the last poll error"""
+
+        # Mock
+        mocker.patch('swagger_client.TestlogApi.track', side_effect=ApiException(status=503, reason='Unavailable'))
+        mock_time = mocker.patch('zigzag.queue_job_facade.time')
+        mock_time.time.side_effect = [0, 4, 8, 12]
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+
+        # Test
+        with pytest.raises(RuntimeError, match='Timed out after 10 seconds waiting for Job IDs: 1') as e:
+            zz.queue_job_facade.wait([1], timeout=10, interval=5)
+        assert 'Job ID: 1 Last poll error:' in str(e.value)
+        assert 'Reason: Unavailable' in str(e.value)
+
+    def test_deadline(self, single_passing_xml, simple_json_config, mock_track, mocker):
+        """Verify that waiting stops once the deadline passed"""
+
+        # Mock
+        mock_track({1: ['SUCCESS'], 2: ['IN_WAITING']})
+        mock_time = mocker.patch('zigzag.queue_job_facade.time')
+        mock_time.time.side_effect = [0, 4, 8, 12]
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+
+        # Test
+        with pytest.raises(QueueJobTimeoutError, match='Timed out after 10 seconds waiting for Job IDs: 2') as e:
+            zz.queue_job_facade.wait([1, 2], timeout=10, interval=5)
+        assert {1: 'SUCCESS', 2: 'IN_WAITING'} == e.value.states
+        assert [mocker.call(5), mocker.call(2)] == mock_time.sleep.call_args_list
+
+    def test_failed_job_and_deadline(self, single_passing_xml, simple_json_config, mock_track, mocker):
+        """Verify that a failed job is reported as a failure and not as a timeout when other jobs are unfinished"""
+
+        # Mock
+        mock_track({1: ['FAILED'], 2: ['IN_WAITING']})
+        mocker.patch('zigzag.queue_job_facade.time').time.return_value = 0
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+
+        # Test
+        with pytest.raises(RuntimeError, match='Failed to process 2 of 2 jobs') as e:
+            zz.queue_job_facade.wait([1, 2], timeout=0)
+        assert not isinstance(e.value, QueueJobTimeoutError)
+        assert 'Timed out after 0 seconds waiting for Job IDs: 2' in str(e.value)
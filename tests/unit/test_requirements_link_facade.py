@@ -3,9 +3,13 @@
 # ======================================================================================================================
 # Imports
 # ======================================================================================================================
+import pytest
 import swagger_client
 from zigzag.zigzag import ZigZag
+from zigzag.search_facade import SearchFacade
+from zigzag.persistent_cache import PersistentCache
 from zigzag.requirements_link_facade import RequirementsLinkFacade
+from swagger_client.rest import ApiException
 import requests
 import json
 
@@ -70,15 +74,21 @@ class TestRequirementsLinkFacade(object):
         """The happy path"""
 
         id = 8675309
+        other_id = 8675310
         response_body = {
             "links": [],
             "page": 1,
             "page_size": 100,
-            "total": 1,
+            "total": 2,
             "items": [
                 {
                     "id": id,
-                    "name": 'This is the name'
+                    "name": 'ASC-123 This is the name',
+                    "properties": [{"field_name": "Automation Content", "field_value": "1"}]
+                },
+                {
+                    "id": other_id,
+                    "name": 'ASC-456 This is the other name'
                 }
             ]
         }
@@ -88,10 +98,11 @@ class TestRequirementsLinkFacade(object):
         mock_field_resp.label = 'Failure Output'
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.SearchApi.search', return_value=response_body)
+        mocker.patch('swagger_client.ObjectlinkApi.find', return_value=[])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response_body)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
 
         # Setup
         zz = ZigZag(single_passing_xml, asc_zigzag_config_file, TOKEN)
@@ -104,7 +115,7 @@ class TestRequirementsLinkFacade(object):
 
         # After think link we should have much more information about linked resource
         assert ['ASC-123', 'ASC-456'] == log.jira_issues
-        assert [id, id] == log.qtest_requirements
+        assert [id, other_id] == log.qtest_requirements
         assert id == log.qtest_testcase_id
 
     def test_link_test_case_not_created_yet(self, single_passing_xml, asc_zigzag_config_file, mocker):
@@ -123,10 +134,10 @@ class TestRequirementsLinkFacade(object):
         mock_field_resp.label = 'Failure Output'
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.SearchApi.search', return_value=response_body)
-        mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response_body)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
 
         # Setup
         zz = ZigZag(single_passing_xml, asc_zigzag_config_file, TOKEN)
@@ -141,3 +152,154 @@ class TestRequirementsLinkFacade(object):
         assert ['ASC-123', 'ASC-456'] == log.jira_issues
         assert [] == log.qtest_requirements
         assert log.qtest_testcase_id is None
+        assert not mock_link.called
+
+
+class TestPlanAndExecute(object):
+    """Tests for the plan() and execute() functions"""
+
+    @staticmethod
+    def _setup(flat_all_passing_xml, asc_zigzag_config_file, mocker):
+        """Create a ZigZag whose test logs share requirements and resolve to known test cases
+
+        Returns:
+            ZigZag
+        """
+
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        mocker.patch.object(SearchFacade, 'lookup_testcase_ids', return_value={'uuid-1': 101, 'uuid-2': 102})
+        mocker.patch.object(SearchFacade, 'lookup_requirements', return_value={'ASC-1': [1], 'ASC-2': [2, 3]})
+        mocker.patch('swagger_client.ObjectlinkApi.find', return_value=[])
+
+        zz = ZigZag(flat_all_passing_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+        zz.qtest_project_id = PROJECT_ID
+        logs = zz.test_logs
+        # the first two logs are the same test case, the third is not created yet and the fourth has no requirement
+        for log, automation_content, jira_ids in zip(logs, ['uuid-1', 'uuid-1', 'uuid-3', 'uuid-2', 'uuid-2'],
+                                                     [['ASC-1'], ['ASC-1', 'ASC-2'], ['ASC-1'], ['ASC-9'], ['ASC-2']]):
+            log._automation_content = automation_content
+            log._jira_issues = jira_ids
+
+        return zz
+
+    def test_plan(self, flat_all_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that the plan links each requirement once to the unique test cases that were found"""
+
+        # Mock
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+
+        # Setup
+        zz = self._setup(flat_all_passing_xml, asc_zigzag_config_file, mocker)
+        plan = RequirementsLinkFacade(zz).plan()
+
+        # Test
+        assert {1: [101], 2: [101, 102], 3: [101, 102]} == plan
+        assert not mock_link.called
+
+    def test_execute(self, flat_all_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that every link in the plan is sent"""
+
+        # Mock
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+
+        # Setup
+        zz = self._setup(flat_all_passing_xml, asc_zigzag_config_file, mocker)
+        result = RequirementsLinkFacade(zz).link()
+
+        # Test
+        assert {1: [101], 2: [101, 102], 3: [101, 102]} == result
+        assert 3 == mock_link.call_count
+        mock_link.assert_any_call(PROJECT_ID, 'requirements', 'test-cases', [101, 102], 2)
+
+    def test_partial_failure(self, flat_all_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that a failed link does not stop the other links and is reported"""
+
+        # Mock
+        def _link_artifacts(project_id, object_type, type, body, object_id):
+            if object_id == 2:
+                raise ApiException(status=500, reason='Internal Server Error')
+
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', side_effect=_link_artifacts)
+
+        # Setup
+        zz = self._setup(flat_all_passing_xml, asc_zigzag_config_file, mocker)
+        rlf = RequirementsLinkFacade(zz)
+
+        # Test
+        assert [2] == list(rlf.execute(rlf.plan()))
+        assert 3 == mock_link.call_count
+        with pytest.raises(RuntimeError, match='Failed to link 1 of 3 requirements!\nRequirement ID: 2\n'):
+            rlf.link()
+
+
+class TestDiff(object):
+    """Tests for the diff() function"""
+
+    @staticmethod
+    def _linked(requirement_id, pids):
+        """Build a qTest linked artifact container
+
+        Returns:
+            swagger_client.LinkedArtifactContainer
+        """
+
+        objects = [swagger_client.LinkedArtifact(id=int(pid.split('-')[1]), pid=pid) for pid in pids]
+        return swagger_client.LinkedArtifactContainer(id=requirement_id, objects=objects)
+
+    def test_existing_links_skipped(self, flat_all_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that only the links missing from qTest are sent"""
+
+        # Mock
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+
+        # Setup
+        zz = TestPlanAndExecute._setup(flat_all_passing_xml, asc_zigzag_config_file, mocker)
+        mock_find = mocker.patch('swagger_client.ObjectlinkApi.find',
+                                 return_value=[self._linked(1, ['TC-101']),
+                                               self._linked(2, ['TC-101', 'DF-102']),
+                                               self._linked(3, [])])
+        result = RequirementsLinkFacade(zz).link()
+
+        # Test
+        assert {2: [102], 3: [101, 102]} == result
+        mock_find.assert_called_once_with(PROJECT_ID, 'requirements', ids=[1, 2, 3])
+        assert 2 == mock_link.call_count
+
+    def test_not_incremental(self, flat_all_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that every link is sent when linking is not incremental"""
+
+        # Mock
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+
+        # Setup
+        zz = TestPlanAndExecute._setup(flat_all_passing_xml, asc_zigzag_config_file, mocker)
+        mock_find = mocker.patch('swagger_client.ObjectlinkApi.find')
+        RequirementsLinkFacade(zz).link(incremental=False)
+
+        # Test
+        assert not mock_find.called
+        assert 3 == mock_link.call_count
+
+    def test_link_cache(self, flat_all_passing_xml, asc_zigzag_config_file, mocker, tmpdir):
+        """Verify that links sent or fetched by a previous run are not fetched again"""
+
+        # Mock
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+
+        # Setup
+        zz = TestPlanAndExecute._setup(flat_all_passing_xml, asc_zigzag_config_file, mocker)
+        zz._persistent_cache = PersistentCache(tmpdir.join('zigzag.sqlite3').strpath)
+        mock_find = mocker.patch('swagger_client.ObjectlinkApi.find', return_value=[self._linked(1, ['TC-101'])])
+        RequirementsLinkFacade(zz).link()
+        first_run_links = mock_link.call_count
+        result = RequirementsLinkFacade(zz).link()
+
+        # Test
+        assert 2 == first_run_links
+        assert {} == result
+        assert 1 == mock_find.call_count
+        assert 2 == mock_link.call_count
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import re
+import json
+import time
+import pytest
+import requests
+import swagger_client
+from zigzag.zigzag import ZigZag
+from zigzag.search_facade import SearchFacade
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+TOKEN = 'VALID_TOKEN'
+TEST_COUNT = 120
+
+
+# ======================================================================================================================
+# Fixtures
+# ======================================================================================================================
+@pytest.fixture(scope='session')
+def unique_automation_content_xml(tmpdir_factory, default_global_properties, default_testcase_elements):
+    """JUnitXML sample representing many passing test cases that each have their own automation content."""
+
+    filename = tmpdir_factory.mktemp('data').join('unique_automation_content.xml').strpath
+    testcase = \
+        """
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+            name="test_pass{index}[ansible://localhost]" time="0.00372695922852">
+                <properties>
+                    <property name="jira" value="ASC-123"/>
+                    <property name="test_id" value="uuid-{index}"/>
+                    <property name="test_step" value="false"/>
+                    <property name="start_time" value="2018-04-10T21:38:18Z"/>
+                    <property name="end_time" value="2018-04-10T21:38:19Z"/>
+                </properties>
+                {testcase_elements}
+            </testcase>
+        """
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+        <testsuite errors="0" failures="0" name="pytest" skips="0" tests="{count}" time="1.664">
+            {global_properties}
+            {testcases}
+        </testsuite>
+        """.format(count=TEST_COUNT,
+                   global_properties=default_global_properties,
+                   testcases=''.join(testcase.format(index=i, testcase_elements=default_testcase_elements)
+                                     for i in range(TEST_COUNT)))
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
+
+
+@pytest.fixture
+def mock_search(mocker):
+    """A mock patcher for the qTest search endpoint that knows about a given set of test cases."""
+
+    def _factory(testcase_ids):
+        def _post(endpoint, data, headers):
+            page_size, page = [int(v) for v in re.search(r'pageSize=(\d+)&page=(\d+)', endpoint).groups()]
+            query = json.loads(data)['query']
+            items = [{'id': testcase_ids[automation_content],
+                      'properties': [{'field_name': 'Automation Content', 'field_value': automation_content}]}
+                     for automation_content in re.findall(r"'Automation Content' = '([^']+)'", query)
+                     if automation_content in testcase_ids]
+            response = mocker.Mock(spec=requests.Response)
+            response.text = json.dumps({'page': page,
+                                        'page_size': page_size,
+                                        'total': len(items),
+                                        'items': items[(page - 1) * page_size:page * page_size]})
+            return response
+
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+
+        return mocker.patch('requests.Session.post', side_effect=_post)
+
+    return _factory
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestLookupTestcaseIds(object):
+    """Tests for the lookup_testcase_ids() function"""
+
+    def test_happy_path(self, unique_automation_content_xml, simple_json_config, mock_search):
+        """Verify that every test log gets its testcase id from a few batched searches"""
+
+        # Mock
+        testcase_ids = {'uuid-{}'.format(i): 1000 + i for i in range(TEST_COUNT)}
+        mock_post = mock_search(testcase_ids)
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN)
+        zz.parse()
+        result = zz.search_facade.lookup_testcase_ids()
+
+        # Test
+        assert testcase_ids == result
+        for log in zz.test_logs:
+            assert testcase_ids[log.automation_content] == log.qtest_testcase_id
+        assert 3 == mock_post.call_count     # 120 test logs in batches of 50
+
+    def test_pagination(self, unique_automation_content_xml, simple_json_config, mock_search, mocker):
+        """Verify that every page of the search results is read"""
+
+        # Mock
+        testcase_ids = {'uuid-{}'.format(i): 1000 + i for i in range(TEST_COUNT)}
+        mock_post = mock_search(testcase_ids)
+        mocker.patch.object(SearchFacade, '_PAGE_SIZE', 20)
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN)
+        zz.parse()
+        result = zz.search_facade.lookup_testcase_ids()
+
+        # Test
+        assert testcase_ids == result
+        assert 7 == mock_post.call_count     # (3 + 3 + 1) pages for batches of 50, 50 and 20
+
+    def test_concurrent_searches(self, unique_automation_content_xml, simple_json_config, mock_search):
+        """Verify that the batched searches are sent concurrently"""
+
+        # Mock
+        testcase_ids = {'uuid-{}'.format(i): 1000 + i for i in range(TEST_COUNT)}
+        mock_post = mock_search(testcase_ids)
+        post = mock_post.side_effect
+
+        def _slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            return post(*args, **kwargs)
+
+        mock_post.side_effect = _slow_post
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN, max_concurrency=3)
+        zz.parse()
+        start = time.time()
+        result = zz.search_facade.lookup_testcase_ids()
+
+        # Test
+        assert testcase_ids == result
+        assert 3 == mock_post.call_count
+        assert time.time() - start < 0.3    # latency x depth instead of latency x count
+
+    def test_not_created_yet(self, unique_automation_content_xml, simple_json_config, mock_search):
+        """Verify that test logs without a testcase in qTest are resolved to None without searching again"""
+
+        # Mock
+        testcase_ids = {'uuid-{}'.format(i): 1000 + i for i in range(0, TEST_COUNT, 2)}
+        mock_post = mock_search(testcase_ids)
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN)
+        zz.parse()
+        zz.search_facade.lookup_testcase_ids()
+
+        # Test
+        for log in zz.test_logs:
+            assert testcase_ids.get(log.automation_content) == log.qtest_testcase_id
+        assert 3 == mock_post.call_count
+
+    def test_api_error(self, unique_automation_content_xml, simple_json_config, mock_search, mocker):
+        """Verify that an error from the qTest API is reported"""
+
+        # Mock
+        mock_search({})
+        error_response = mocker.Mock(spec=requests.Response)
+        error_response.status_code = 500
+        error_response.reason = 'Internal Server Error'
+        mocker.patch('requests.Session.post', side_effect=requests.exceptions.HTTPError(response=error_response))
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN)
+        zz.parse()
+
+        # Test
+        with pytest.raises(RuntimeError, match='The qTest API reported an error'):
+            zz.search_facade.lookup_testcase_ids()
+
+    def test_connection_error(self, unique_automation_content_xml, simple_json_config, mock_search, mocker):
+        """Verify that a search that never got a response is reported as a RuntimeError"""
+
+        # Mock
+        mock_search({})
+        mocker.patch('requests.Session.post', side_effect=requests.exceptions.ConnectionError('Connection refused'))
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN)
+        zz.parse()
+
+        # Test
+        with pytest.raises(RuntimeError, match='Failed to reach the qTest API!\nConnection refused'):
+            zz.search_facade.lookup_testcase_ids()
+
+    def test_persistent_cache(self, unique_automation_content_xml, simple_json_config, mock_search, tmpdir):
+        """Verify that testcase ids found by a previous run are not searched for again"""
+
+        # Mock
+        testcase_ids = {'uuid-{}'.format(i): 1000 + i for i in range(0, TEST_COUNT, 2)}
+        mock_post = mock_search(testcase_ids)
+        cache_path = tmpdir.join('zigzag.sqlite3').strpath
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN, cache_path=cache_path)
+        zz.parse()
+        zz.search_facade.lookup_testcase_ids()
+        mock_post.reset_mock()
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN, cache_path=cache_path)
+        zz.parse()
+        result = zz.search_facade.lookup_testcase_ids()
+
+        # Test
+        assert testcase_ids == result
+        assert 2 == mock_post.call_count     # only the 60 test cases that have not been created yet
+        queried = ' '.join(json.loads(call[1]['data'])['query'] for call in mock_post.call_args_list)
+        assert 'uuid-0' not in re.findall(r"'([^']+)'", queried)
+
+
+class TestLookupRequirements(object):
+    """Tests for the lookup_requirements() function"""
+
+    def test_shared_jira_ids(self, unique_automation_content_xml, simple_json_config, mocker):
+        """Verify that a Jira id shared by every test log is searched for once and matched exactly"""
+
+        # Mock
+        response = {'page': 1,
+                    'page_size': 100,
+                    'total': 4,
+                    'items': [{'id': 1, 'name': 'ASC-123 Requirement'},
+                              {'id': 2, 'name': 'ASC-1234 Similar requirement'},
+                              {'id': 3, 'name': 'ASC-123 Sub-requirement'},
+                              {'id': 4, 'name': 'Unrelated requirement'}]}
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        mock_post_response = mocker.Mock(spec=requests.Response)
+        mock_post_response.text = json.dumps(response)
+        mock_post = mocker.patch('requests.Session.post', return_value=mock_post_response)
+
+        # Setup
+        zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN)
+        zz.parse()
+        result = zz.search_facade.lookup_requirements()
+
+        # Test
+        assert {'ASC-123': [1, 3]} == result
+        for log in zz.test_logs:
+            assert [1, 3] == log.qtest_requirements
+        assert 1 == mock_post.call_count
+        assert "'name' ~ 'ASC-123'" == json.loads(mock_post.call_args[1]['data'])['query']
+
+    def test_persistent_cache(self, unique_automation_content_xml, simple_json_config, mocker, tmpdir):
+        """Verify that found and missing requirements are cached with their own TTL"""
+
+        # Mock
+        response = {'page': 1,
+                    'page_size': 100,
+                    'total': 1,
+                    'items': [{'id': 1, 'name': 'ASC-123 Requirement'}]}
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        mock_post_response = mocker.Mock(spec=requests.Response)
+        mock_post_response.text = json.dumps(response)
+        mock_post = mocker.patch('requests.Session.post', return_value=mock_post_response)
+        mock_time = mocker.patch('zigzag.persistent_cache.time')
+        mock_time.time.return_value = 0
+        cache_path = tmpdir.join('zigzag.sqlite3').strpath
+
+        # Setup
+        def _lookup_requirements(jira_ids):
+            zz = ZigZag(unique_automation_content_xml, simple_json_config, TOKEN,
+                        cache_path=cache_path, cache_ttl=1000, cache_negative_ttl=10)
+            zz.parse()
+            for log in zz.test_logs:
+                log._jira_issues = jira_ids
+            return zz.search_facade.lookup_requirements()
+
+        # Test
+        assert {'ASC-123': [1]} == _lookup_requirements(['ASC-123', 'ASC-999'])
+        assert 1 == mock_post.call_count
+
+        mock_time.time.return_value = 5     # both lookups are cached
+        assert {'ASC-123': [1]} == _lookup_requirements(['ASC-123', 'ASC-999'])
+        assert 1 == mock_post.call_count
+
+        mock_time.time.return_value = 50    # only the missing requirement expired
+        assert {'ASC-123': [1]} == _lookup_requirements(['ASC-123', 'ASC-999'])
+        assert 2 == mock_post.call_count
+        assert "'name' ~ 'ASC-999'" == json.loads(mock_post.call_args[1]['data'])['query']
@@ -35,7 +35,7 @@ class TestFindCustomFieldByLabel(object):
         response = {'items': [{'name': 'insert name here', 'id': 12345}], 'total': 1}
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
 
         # Setup
         zz = ZigZag(single_fail_xml, TOKEN, PROJECT_ID, TEST_CYCLE)
@@ -54,7 +54,7 @@ class TestFindCustomFieldByLabel(object):
         response = {'items': [{'name': 'insert name here', 'id': 12345}], 'total': 1}
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
 
         # Setup
         zz = ZigZag(single_fail_xml, TOKEN, PROJECT_ID, TEST_CYCLE)
@@ -62,3 +62,27 @@ class TestFindCustomFieldByLabel(object):
 
         result = uf.find_custom_field_id_by_label('Failure Output', 'test-runs')
         assert result is None
+
+    def test_fields_fetched_once(self, single_fail_xml, mocker):
+        """Verify that the fields of an object type are only fetched once no matter how many labels are found"""
+        # Mock
+        labels = ['Failure Output', 'Failure Link', 'Test SHA']
+        mock_field_resps = []
+        for field_id, label in enumerate(labels):
+            mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+            mock_field_resp.id = field_id
+            mock_field_resp.label = label
+            mock_field_resps.append(mock_field_resp)
+        mock_get_fields = mocker.patch('swagger_client.FieldApi.get_fields', return_value=mock_field_resps)
+
+        # Setup
+        zz = ZigZag(single_fail_xml, TOKEN, PROJECT_ID, TEST_CYCLE)
+        uf = UtilityFacade(zz)
+
+        # Test
+        for field_id, label in enumerate(labels):
+            assert uf.find_custom_field_id_by_label(label, 'test-runs') == field_id
+        assert uf.find_custom_field_id_by_label('foo', 'test-runs') is None
+        assert mock_get_fields.call_count == 1
+        uf.find_custom_field_id_by_label('Failure Output', 'test-cases')
+        assert mock_get_fields.call_count == 2
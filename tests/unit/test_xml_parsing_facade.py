@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+import pytest
+from lxml import etree
+from zigzag.zigzag import ZigZag
+from zigzag.xml_parsing_facade import XmlParsingFacade
+from zigzag.resources import open_resource
+
+# ======================================================================================================================
+# Globals
+# ======================================================================================================================
+TOKEN = 'VALID_TOKEN'
+
+
+# ======================================================================================================================
+# Fixtures
+# ======================================================================================================================
+@pytest.fixture(autouse=True)
+def reset_xmlschema():
+    """Make sure every test starts and ends with the XSD shipped with zigzag."""
+
+    XmlParsingFacade.set_xsd(None)
+    yield
+    XmlParsingFacade.set_xsd(None)
+
+
+@pytest.fixture(scope='module')
+def permissive_xsd(tmpdir_factory):
+    """A XSD that accepts any 'testsuite' document."""
+
+    filename = tmpdir_factory.mktemp('data').join('permissive.xsd').strpath
+    xsd = \
+        """<?xml version="1.0" encoding="UTF-8" ?>
+        <xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+            <xs:element name="testsuite">
+                <xs:complexType>
+                    <xs:sequence>
+                        <xs:any processContents="skip" minOccurs="0" maxOccurs="unbounded"/>
+                    </xs:sequence>
+                    <xs:anyAttribute processContents="skip"/>
+                </xs:complexType>
+            </xs:element>
+        </xs:schema>
+        """
+
+    with open(filename, 'w') as f:
+        f.write(xsd)
+
+    return filename
+
+
+# ======================================================================================================================
+# Test Suites
+# ======================================================================================================================
+class TestXmlSchemaCache(object):
+    """Tests for the process wide compiled XML schema"""
+
+    def test_compiled_once(self, single_passing_xml, schema_violation_xml, simple_json_config, mocker):
+        """Verify that the XSD is compiled on first use and shared by every ZigZag instance"""
+
+        # Mock
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[])
+        xmlschema_spy = mocker.spy(etree, 'XMLSchema')
+
+        # Setup
+        for stream in (False, True, False):
+            ZigZag(single_passing_xml, simple_json_config, TOKEN, stream=stream).parse()
+        with pytest.raises(RuntimeError, match='does not conform to schema'):
+            ZigZag(schema_violation_xml, simple_json_config, TOKEN).parse()
+
+        # Test
+        assert 1 == xmlschema_spy.call_count
+        assert XmlParsingFacade.get_xmlschema() is XmlParsingFacade.get_xmlschema()
+
+    def test_set_xsd_path(self, schema_violation_xml, simple_json_config, permissive_xsd, mocker):
+        """Verify that the XSD can be replaced by a path to another XSD"""
+
+        # Mock
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[])
+
+        # Setup
+        XmlParsingFacade.set_xsd(permissive_xsd)
+        zz = ZigZag(schema_violation_xml, simple_json_config, TOKEN)
+        zz.parse()
+
+        # Test
+        assert len(zz.test_logs)
+
+    def test_set_xsd_compiled(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that an already compiled XML schema is pinned without being recompiled"""
+
+        # Mock
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[])
+        xmlschema = etree.XMLSchema(etree.parse(open_resource('data/junit.xsd')))
+
+        # Setup
+        XmlParsingFacade.set_xsd(xmlschema)
+        xmlschema_spy = mocker.spy(etree, 'XMLSchema')
+        ZigZag(single_passing_xml, simple_json_config, TOKEN).parse()
+
+        # Test
+        assert xmlschema is XmlParsingFacade.get_xmlschema()
+        assert 0 == xmlschema_spy.call_count
+
+    def test_set_xsd_invalid(self, single_passing_xml):
+        """Verify that a XSD that can not be compiled raises an exception"""
+
+        # Test
+        with pytest.raises(RuntimeError, match='Failed to compile the XSD'):
+            XmlParsingFacade.set_xsd(single_passing_xml)
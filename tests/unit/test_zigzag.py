@@ -7,7 +7,10 @@ import re
 import pytest
 import swagger_client
 from hashlib import md5
+import zigzag.zigzag
+import zigzag.qtest_engine
 from zigzag.zigzag import ZigZag
+from zigzag.queue_job_facade import QueueJobTimeoutError
 from swagger_client.rest import ApiException
 import requests
 import json
@@ -46,7 +49,7 @@ class TestZigZag(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -78,7 +81,7 @@ class TestLoadingInputJunitXMLFile(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -224,6 +227,103 @@ class TestLoadingInputJunitXMLFile(object):
             assert error_msg_exp in str(e)
 
 
+class TestStreamingInputJunitXMLFile(object):
+    """Test cases for the incremental loading of a JUnitXML file"""
+
+    def test_stream_happy_path(self, flat_mix_status_xml, simple_json_config, mocker):
+        """Verify that streaming a JUnitXML file produces the same test logs as loading the whole file"""
+
+        # Mock
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+
+        # Setup
+        zz = ZigZag(flat_mix_status_xml, simple_json_config, TOKEN)
+        zz.parse()
+        zz_stream = ZigZag(flat_mix_status_xml, simple_json_config, TOKEN, stream=True)
+        zz_stream.parse()
+
+        # Test
+        assert zz.junit_xml.attrib == zz_stream.junit_xml.attrib
+        assert zz.testsuite_props == zz_stream.testsuite_props
+        assert [(log.name, log.status) for log in zz.test_logs] == \
+               [(log.name, log.status) for log in zz_stream.test_logs]
+        assert zz_stream.junit_xml.find('testcase') is None  # finished testcases are not kept in the tree
+
+    def test_stream_serialized_junit_xml(self, single_passing_xml, simple_json_config, mocker):
+        """Verify that the serialized JUnitXML of a streamed file is read from disk"""
+
+        # Mock
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+
+        # Setup
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN, stream=True)
+        zz.parse()
+
+        # Expectations
+        with open(single_passing_xml, 'rb') as f:
+            serialized_junit_xml_exp = f.read()
+
+        # Test
+        assert serialized_junit_xml_exp == zz.serialized_junit_xml
+
+    def test_stream_exceeds_max_file_size(self, flat_all_passing_xml, simple_json_config, mocker):
+        """Verify that XML files that exceed the max file size are accepted when streaming"""
+
+        # Mock
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        file_size = 52428801
+
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        mocker.patch('os.path.getsize', return_value=file_size)
+
+        # Setup
+        zz = ZigZag(flat_all_passing_xml, simple_json_config, TOKEN, stream=True)
+        zz.parse()
+
+        # Test
+        assert len(zz.test_logs)
+
+    def test_stream_invalid_file_path(self, simple_json_config):
+        """Verify that an invalid file path raises an exception when streaming"""
+
+        # Test
+        with pytest.raises(RuntimeError, match='Invalid path'):
+            zz = ZigZag('/path/does/not/exist', simple_json_config, TOKEN, stream=True)
+            zz.parse()
+
+    def test_stream_invalid_xml_content(self, bad_xml, simple_json_config):
+        """Verify that invalid XML file content raises an exception when streaming"""
+
+        # Test
+        with pytest.raises(RuntimeError):
+            zz = ZigZag(bad_xml, simple_json_config, TOKEN, stream=True)
+            zz.parse()
+
+    def test_stream_missing_junit_xml_root(self, bad_junit_root, simple_json_config):
+        """Verify that XML files missing the expected JUnitXML root element raises an exception when streaming"""
+
+        # Test
+        with pytest.raises(RuntimeError, match="root element"):
+            zz = ZigZag(bad_junit_root, simple_json_config, TOKEN, stream=True)
+            zz.parse()
+
+    def test_stream_schema_violation(self, schema_violation_xml, simple_json_config):
+        """Verify that XML files that violate the schema raise an exception when streaming"""
+
+        # Test
+        with pytest.raises(RuntimeError, match='does not conform to schema'):
+            zz = ZigZag(schema_violation_xml, simple_json_config, TOKEN, stream=True)
+            zz.parse()
+
+
 # noinspection PyUnresolvedReferences
 class TestParseXMLtoTestLogs(object):
     """Test cases for zigzags parsing of raw junit.xml into TestLog objects
@@ -240,11 +340,13 @@ class TestParseXMLtoTestLogs(object):
         mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
         mock_field_resp.id = object_id
         mock_field_resp.label = 'Failure Output'
-        response = {'items': [{'name': 'insert name here', 'id': object_id}], 'total': 1}
+        properties = [{'field_name': 'Automation Content', 'field_value': '1'}]
+        response = {'items': [{'name': 'ASC-123 insert name here', 'id': object_id, 'properties': properties},
+                              {'name': 'ASC-456 insert name here', 'id': object_id}], 'total': 2}
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -274,11 +376,13 @@ class TestParseXMLtoTestLogs(object):
         mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
         mock_field_resp.id = object_id
         mock_field_resp.label = 'Failure Output'
-        response = {'items': [{'name': 'insert name here', 'id': object_id}], 'total': 1}
+        properties = [{'field_name': 'Automation Content', 'field_value': '1'}]
+        response = {'items': [{'name': 'ASC-123 insert name here', 'id': object_id, 'properties': properties},
+                              {'name': 'ASC-456 insert name here', 'id': object_id}], 'total': 2}
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -308,11 +412,13 @@ class TestParseXMLtoTestLogs(object):
         mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
         mock_field_resp.id = object_id
         mock_field_resp.label = 'Failure Output'
-        response = {'items': [{'name': 'insert name here', 'id': object_id}], 'total': 1}
+        properties = [{'field_name': 'Automation Content', 'field_value': '1'}]
+        response = {'items': [{'name': 'ASC-123 insert name here', 'id': object_id, 'properties': properties},
+                              {'name': 'ASC-456 insert name here', 'id': object_id}], 'total': 2}
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -343,11 +449,13 @@ class TestParseXMLtoTestLogs(object):
         mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
         mock_field_resp.id = object_id
         mock_field_resp.label = 'Failure Output'
-        response = {'items': [{'name': 'insert name here', 'id': object_id}], 'total': 1}
+        properties = [{'field_name': 'Automation Content', 'field_value': '1'}]
+        response = {'items': [{'name': 'ASC-123 insert name here', 'id': object_id, 'properties': properties},
+                              {'name': 'ASC-456 insert name here', 'id': object_id}], 'total': 2}
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -381,7 +489,7 @@ class TestParseXMLtoTestLogs(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -396,8 +504,8 @@ class TestParseXMLtoTestLogs(object):
             assert 'PASSED' == log.status
             assert re.match(r'test_pass\d', log.name)
 
-    def test_junit_xml_attachment(self, single_passing_xml, simple_json_config, mocker):
-        """Verify that an xml file is attached to the qTest testlog
+    def test_junit_xml_attachment(self, single_passing_xml, per_log_attachment_json_config, mocker):
+        """Verify that an xml file is attached to the qTest testlog when configured to attach it to every test log
         """
 
         object_id = 12345
@@ -410,12 +518,12 @@ class TestParseXMLtoTestLogs(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
         # Setup
-        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        zz = ZigZag(single_passing_xml, per_log_attachment_json_config, TOKEN)
         zz.parse()
         # noinspection PyUnresolvedReferences
         test_log_dict = zz.test_logs[0].qtest_test_log.to_dict()
@@ -445,7 +553,7 @@ class TestParseXMLtoTestLogs(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -483,7 +591,7 @@ class TestParseXMLtoTestLogs(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
         # Setup
@@ -520,7 +628,7 @@ class TestGenerateAutoRequest(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
         mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_get_tc_resp])
@@ -544,6 +652,83 @@ class TestGenerateAutoRequest(object):
                 observed = auto_req_dict['test_logs'][x][key]
                 assert expected == observed
 
+    # noinspection PyProtectedMember
+    def test_junit_xml_attached_once(self, flat_mix_status_xml, asc_zigzag_config_file, mocker):
+        """Verify that the JUnitXML file is attached to a single test log and referenced by every test log"""
+
+        # Mock
+        mock_get_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+        mock_create_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+        mock_get_tc_resp.to_dict.return_value = {'name': 'queens', 'pid': 'CL-2'}
+        mock_create_tc_resp.to_dict.return_value = {'name': 'queens', 'pid': 'CL-1'}
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        response = {'items': [{'name': 'insert name here', 'id': 12345}], 'total': 1}
+        mock_post_response = mocker.Mock(spec=requests.Response)
+        mock_post_response.text = json.dumps(response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_get_tc_resp])
+        mocker.patch('swagger_client.TestcycleApi.create_cycle', return_value=mock_create_tc_resp)
+        b64encode_spy = mocker.spy(zigzag.zigzag, 'b64encode')
+
+        # Setup
+        zz = ZigZag(flat_mix_status_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+        auto_req_dict = zz._generate_auto_request().to_dict()
+        xml_attachments = [(log['name'], attachment['name'])
+                           for log in auto_req_dict['test_logs']
+                           for attachment in log['attachments']
+                           if attachment['content_type'] == 'application/xml']
+
+        # Test
+        assert 'run' == zz.junit_xml_attachment_mode
+        assert 1 == b64encode_spy.call_count
+        assert 1 == len(xml_attachments)
+        assert auto_req_dict['test_logs'][0]['name'] == xml_attachments[0][0]
+        for log in auto_req_dict['test_logs']:
+            assert xml_attachments[0][0] in log['note']
+            assert xml_attachments[0][1] in log['note']
+
+    # noinspection PyProtectedMember
+    def test_junit_xml_note_appended(self, flat_mix_status_xml, asc_zigzag_config_file):
+        """Verify that the reference to the JUnitXML file is added to the existing note of a test log"""
+
+        # Setup
+        zz = ZigZag(flat_mix_status_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+        logs = [swagger_client.AutomationTestLogResource(name='first', note='Existing note', attachments=[]),
+                swagger_client.AutomationTestLogResource(name='second', attachments=[])]
+        zz._attach_junit_xml_to_run(logs)
+
+        # Test
+        assert logs[0].note.startswith('Existing note\n')
+        assert 'first' in logs[0].note
+        assert 'Existing note' not in logs[1].note
+        assert 'first' in logs[1].note
+
+    # noinspection PyProtectedMember
+    def test_large_streamed_junit_xml_not_attached(self, flat_mix_status_xml, asc_zigzag_config_file, mocker):
+        """Verify that a JUnitXML file larger than the cap is not attached when it is streamed"""
+
+        # Mock
+        mocker.patch.object(ZigZag, '_MAX_STREAMED_ATTACHMENT_SIZE', 10)
+
+        # Setup
+        zz_stream = ZigZag(flat_mix_status_xml, asc_zigzag_config_file, TOKEN, stream=True)
+        zz = ZigZag(flat_mix_status_xml, asc_zigzag_config_file, TOKEN)
+        zz_stream.parse()
+        zz.parse()
+        logs = [swagger_client.AutomationTestLogResource(name='first', attachments=[])]
+        zz_stream._attach_junit_xml_to_run(logs)
+
+        # Test
+        assert zz_stream.qtest_junit_xml_attachment is None
+        assert not logs[0].attachments
+        assert logs[0].note is None
+        assert zz.qtest_junit_xml_attachment is not None
+
 
 class TestUploadTestResults(object):
     """Test cases for the 'upload_test_results' function"""
@@ -569,7 +754,7 @@ class TestUploadTestResults(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', return_value=mock_queue_resp)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
@@ -582,7 +767,7 @@ class TestUploadTestResults(object):
 
         # Test
         response = zz.upload_test_results()
-        assert int(job_id) == response
+        assert [int(job_id)] == response
 
     def test_api_exception(self, single_passing_xml, simple_json_config, mocker):
         """Verify that the function fails gracefully if the API endpoint reports an API exception"""
@@ -595,7 +780,7 @@ class TestUploadTestResults(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0',
                      side_effect=ApiException('Super duper failure!'))
@@ -620,7 +805,7 @@ class TestUploadTestResults(object):
         mock_link_response = mocker.Mock(spec=swagger_client.LinkedArtifactContainer)
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
         mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
         mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', return_value=[mock_link_response])
 
@@ -631,3 +816,190 @@ class TestUploadTestResults(object):
         # Test
         with pytest.raises(RuntimeError):
             zz.upload_test_results()
+
+
+class TestBatchedUpload(object):
+    """Test cases for uploading test results in batches"""
+
+    @staticmethod
+    def _mock_qtest(mocker, submit_side_effect):
+        """Mock the qTest API with a custom 'submit_automation_test_logs_0' side effect"""
+
+        mock_get_tc_resp = mocker.Mock(spec=swagger_client.TestCycleResource)
+        mock_get_tc_resp.to_dict.return_value = {'name': 'pike', 'pid': 'CL-1'}
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        response = {'items': [], 'total': 0}
+        mock_post_response = mocker.Mock(spec=requests.Response)
+        mock_post_response.text = json.dumps(response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        mocker.patch('swagger_client.TestcycleApi.get_test_cycles', return_value=[mock_get_tc_resp])
+        mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+
+        return mocker.patch('swagger_client.TestlogApi.submit_automation_test_logs_0', side_effect=submit_side_effect)
+
+    def test_batch_size(self, flat_all_passing_xml, simple_json_config, mocker):
+        """Verify that the test logs are split into batches by count and every job ID is returned"""
+
+        # Mock
+        def _submit(project_id, body, type):
+            return mocker.Mock(state='IN_WAITING', id=len(body.test_logs))
+
+        mock_submit = self._mock_qtest(mocker, _submit)
+
+        # Setup
+        zz = ZigZag(flat_all_passing_xml, simple_json_config, TOKEN)
+        zz.parse()
+        job_ids = zz.upload_test_results(batch_size=2)
+
+        # Test
+        assert [2, 2, 1] == job_ids
+        assert 3 == mock_submit.call_count
+        execution_dates = set(call[1]['body'].execution_date for call in mock_submit.call_args_list)
+        assert 1 == len(execution_dates)
+
+    def test_max_batch_bytes(self, flat_all_passing_xml, simple_json_config, mocker):
+        """Verify that the test logs are split into batches by serialized size"""
+
+        # Mock
+        def _submit(project_id, body, type):
+            return mocker.Mock(state='IN_WAITING', id=len(body.test_logs))
+
+        mock_submit = self._mock_qtest(mocker, _submit)
+
+        # Setup
+        zz = ZigZag(flat_all_passing_xml, simple_json_config, TOKEN)
+        zz.parse()
+        job_ids = zz.upload_test_results(max_batch_bytes=1)
+
+        # Test
+        assert [1, 1, 1, 1, 1] == job_ids
+        assert 5 == mock_submit.call_count
+
+    def test_max_workers(self, flat_all_passing_xml, simple_json_config, mocker):
+        """Verify that the number of concurrent submissions is bounded"""
+
+        # Mock
+        self._mock_qtest(mocker, lambda project_id, body, type: mocker.Mock(state='IN_WAITING', id=1))
+        thread_pool_spy = mocker.spy(zigzag.qtest_engine, 'ThreadPool')
+
+        # Setup
+        zz = ZigZag(flat_all_passing_xml, simple_json_config, TOKEN, max_concurrency=1)
+        zz.parse()
+        zz.upload_test_results(batch_size=1, max_workers=2)
+
+        # Test
+        thread_pool_spy.assert_called_once_with(2)
+
+    def test_partial_failure(self, flat_all_passing_xml, simple_json_config, mocker):
+        """Verify that a failed batch does not stop the other batches and that every job ID is reported"""
+
+        # Mock
+        def _submit(project_id, body, type):
+            if body.test_logs[0].name == 'test_pass3':
+                raise ApiException('Super duper failure!')
+            return mocker.Mock(state='IN_WAITING', id=int(body.test_logs[0].name[-1]))
+
+        mock_submit = self._mock_qtest(mocker, _submit)
+
+        # Setup
+        zz = ZigZag(flat_all_passing_xml, simple_json_config, TOKEN)
+        zz.parse()
+
+        # Test
+        with pytest.raises(RuntimeError, match='Failed to upload 1 of 5 batches') as e:
+            zz.upload_test_results(batch_size=1)
+        assert 'Submitted Job IDs: 1, 2, 4, 5' in str(e.value)
+        assert 5 == mock_submit.call_count
+
+
+class TestLinkRequirements(object):
+    """Test cases for linking requirements once the queue jobs finished"""
+
+    def test_link_after_jobs_finished(self, single_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that the requirements are linked only after every queue job finished"""
+
+        # Mock
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        response = {'items': [{'id': 8675309,
+                               'name': 'ASC-123 This is the name',
+                               'properties': [{'field_name': 'Automation Content', 'field_value': '1'}]}],
+                    'total': 1}
+        mock_post_response = mocker.Mock(spec=requests.Response)
+        mock_post_response.text = json.dumps(response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        calls = mocker.Mock()
+        calls.track.side_effect = [mocker.Mock(state='IN_PROCESSING'), mocker.Mock(state='SUCCESS')]
+        mocker.patch('swagger_client.TestlogApi.track', calls.track)
+        calls.find.return_value = []
+        mocker.patch('swagger_client.ObjectlinkApi.find', calls.find)
+        mocker.patch('swagger_client.ObjectlinkApi.link_artifacts', calls.link_artifacts)
+        mocker.patch('zigzag.queue_job_facade.time').time.return_value = 0
+
+        # Setup
+        zz = ZigZag(single_passing_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+        zz.qtest_project_id = 12345
+        states = zz.link_requirements([1])
+
+        # Test
+        assert {1: 'SUCCESS'} == states
+        assert ['track', 'track', 'find', 'link_artifacts'] == [name for name, args, kwargs in calls.mock_calls]
+        calls.link_artifacts.assert_called_once_with(12345, 'requirements', 'test-cases', [8675309], 8675309)
+
+    def test_failed_job(self, single_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that the test cases of the jobs that succeeded are linked even though another job failed"""
+
+        # Mock
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        response = {'items': [{'id': 8675309,
+                               'name': 'ASC-123 This is the name',
+                               'properties': [{'field_name': 'Automation Content', 'field_value': '1'}]}],
+                    'total': 1}
+        mock_post_response = mocker.Mock(spec=requests.Response)
+        mock_post_response.text = json.dumps(response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        states = {1: mocker.Mock(state='SUCCESS'), 2: mocker.Mock(state='FAILED', content='Nope')}
+        mocker.patch('swagger_client.TestlogApi.track', side_effect=lambda job_id: states[job_id])
+        mocker.patch('swagger_client.ObjectlinkApi.find', return_value=[])
+        mock_link = mocker.patch('swagger_client.ObjectlinkApi.link_artifacts')
+
+        # Setup
+        zz = ZigZag(single_passing_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+        zz.qtest_project_id = 12345
+
+        # Test
+        with pytest.raises(RuntimeError, match='Failed to process 1 of 2 jobs'):
+            zz.link_requirements([1, 2])
+        mock_link.assert_called_once_with(12345, 'requirements', 'test-cases', [8675309], 8675309)
+
+    def test_queue_timeout(self, single_passing_xml, asc_zigzag_config_file, mocker):
+        """Verify that the finished jobs are linked and the timeout is reported when the queue is slow"""
+
+        # Mock
+        mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
+        mock_field_resp.id = 12345
+        mock_field_resp.label = 'Failure Output'
+        mock_post_response = mocker.Mock(spec=requests.Response)
+        mock_post_response.text = json.dumps({'items': [], 'total': 0})
+        mock_post = mocker.patch('requests.Session.post', return_value=mock_post_response)
+        mocker.patch('swagger_client.FieldApi.get_fields', return_value=[mock_field_resp])
+        mocker.patch('swagger_client.TestlogApi.track', return_value=mocker.Mock(state='IN_PROCESSING'))
+
+        # Setup
+        zz = ZigZag(single_passing_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+
+        # Test
+        with pytest.raises(QueueJobTimeoutError, match='Timed out after 0 seconds waiting for Job IDs: 1'):
+            zz.link_requirements([1], timeout=0)
+        assert mock_post.called
@@ -58,6 +58,52 @@ def config_with_zz_variable(tmpdir_factory):
     return config_path
 
 
+@pytest.fixture(scope='session')
+def config_with_invalid_template(tmpdir_factory):
+    """config with one value that is not a valid jinja template"""
+    config = \
+        """
+        {
+            "zigzag": {
+                "test_cycle": "pike",
+                "project_id": "12345",
+                "module_hierarchy": ["one", "two", "{{ zz_testcase_class"],
+                "path_to_test_exec_dir": null
+            }
+        }
+        """  # noqa
+
+    config_path = tmpdir_factory.mktemp('data').join('./conf.json').strpath
+
+    with open(str(config_path), 'w') as f:
+        f.write(config)
+
+    return config_path
+
+
+@pytest.fixture(scope='session')
+def config_with_null_value(tmpdir_factory):
+    """config with one value set to null"""
+    config = \
+        """
+        {
+            "zigzag": {
+                "test_cycle": "pike",
+                "project_id": "12345",
+                "module_hierarchy": ["one","two","three"],
+                "path_to_test_exec_dir": null
+            }
+        }
+        """  # noqa
+
+    config_path = tmpdir_factory.mktemp('data').join('./conf.json').strpath
+
+    with open(str(config_path), 'w') as f:
+        f.write(config)
+
+    return config_path
+
+
 @pytest.fixture(scope='session')
 def config_missing_zigzag_key(tmpdir_factory):
     """config missing zigzag key"""
@@ -226,3 +272,56 @@ class TestZigZagConfig(object):
 
         with pytest.raises(ZigZagConfigError, match=expected_message):
             config.get_config('module_hierarchy')
+
+    def test_rendered_once_per_testcase_class(self, config_with_zz_variable, mocker):
+        """Test that a config is only rendered once for every distinct 'zz_testcase_class' and global configs are
+        only rendered once"""
+
+        # Mock
+        zz_test_logs = []
+        for classname in ['tests.test_one', 'tests.test_two', 'tests.test_one', 'tests.test_two', 'tests.test_one']:
+            zz_test_log = mocker.MagicMock()
+            zz_test_log.classname = classname
+            zz_test_logs.append(zz_test_log)
+        render_spy = mocker.spy(ZigZagConfig, '_render')
+
+        # Setup
+        config = ZigZagConfig(config_with_zz_variable, {})
+
+        # Test
+        for zz_test_log in zz_test_logs:
+            assert ['one', 'two', zz_test_log.classname] == config.get_config('module_hierarchy', zz_test_log)
+            assert 'foo/bar/tests' == config.get_config('path_to_test_exec_dir', zz_test_log)
+            assert 'pike' == config.get_config('test_cycle')
+        assert 4 == render_spy.call_count
+
+    def test_memoized_value_not_shared(self, config_with_zz_variable, mocker):
+        """Test that changing a returned list does not change the memoized value"""
+
+        # Mock
+        zz_test_log = mocker.MagicMock()
+        zz_test_log.classname = 'this.is.the.classname'
+
+        # Setup
+        config = ZigZagConfig(config_with_zz_variable, {})
+        config.get_config('module_hierarchy', zz_test_log).append('four')
+
+        # Test
+        assert ['one', 'two', zz_test_log.classname] == config.get_config('module_hierarchy', zz_test_log)
+
+    def test_invalid_template(self, config_with_invalid_template):
+        """Test that a config with an invalid template raises an error when the config is loaded"""
+
+        expected_message = 'contains an invalid template'
+
+        with pytest.raises(ZigZagConfigError, match=expected_message):
+            ZigZagConfig(config_with_invalid_template, {})
+
+    def test_null_value(self, config_with_null_value):
+        """Test a config where the value is null"""
+
+        config = ZigZagConfig(config_with_null_value, {})
+        expected_message = "The config setting 'path_to_test_exec_dir' was not found in the config file"
+
+        with pytest.raises(ZigZagConfigError, match=expected_message):
+            config.get_config('path_to_test_exec_dir')
@@ -3,6 +3,7 @@
 # ======================================================================================================================
 # Imports
 # ======================================================================================================================
+import re
 import json
 import pytest
 import requests
@@ -30,7 +31,8 @@ DEFAULT_SEARCH_RESPONSE = {
     "items": [
         {
             "id": 5678,
-            "name": "PRO-18405 Fake!"
+            "name": "PRO-18405 Fake!",
+            "properties": [{"field_name": "Automation Content", "field_value": "1"}]
         }
     ]
 }
@@ -47,7 +49,7 @@ def mock_zigzag(mocker):
         search_response = DEFAULT_SEARCH_RESPONSE if not search_response else search_response
         mock_post_response = mocker.Mock(spec=requests.Response)
         mock_post_response.text = json.dumps(search_response)
-        mocker.patch('requests.post', return_value=mock_post_response)
+        mocker.patch('requests.Session.post', return_value=mock_post_response)
 
         mock_field_resp = mocker.Mock(spec=swagger_client.FieldResource)
         mock_field_resp.id = 12345
@@ -792,6 +794,49 @@ def multiple_tests_with_and_without_steps_xml(tmpdir_factory, default_global_pro
     return filename
 
 
+@pytest.fixture(scope='module')
+def nested_suite_with_unmarked_test_xml(tmpdir_factory, default_global_properties, default_testcase_elements):
+    """JUnitXML sample representing a nested test suite and a test case that does not implement test steps."""
+
+    filename = tmpdir_factory.mktemp('data').join('nested_suite_with_unmarked_test.xml').strpath
+    junit_xml = \
+        """<?xml version="1.0" encoding="utf-8"?>
+            <testsuite errors="0" failures="0" name="pytest" skips="0" tests="3" time="1.664">
+            {global_properties}
+            <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+            name="test_unmarked[ansible://localhost]" time="0.00372695922852">
+                <properties>
+                    <property name="test_id" value="1"/>
+                </properties>
+                {testcase_elements}
+            </testcase>
+            <testsuite errors="0" failures="0" name="nested" skips="0" tests="2" time="1.664">
+                <testcase classname="tests.test_default.TestCaseWithSteps" file="tests/test_default.py" line="8"
+                name="test_step[ansible://localhost]" time="0.00372695922852">
+                    <properties>
+                        <property name="test_id" value="2"/>
+                        <property name="test_step" value="true"/>
+                    </properties>
+                    {testcase_elements}
+                </testcase>
+                <testcase classname="tests.test_default" file="tests/test_default.py" line="8"
+                name="test_case_without_steps[ansible://localhost]" time="0.00372695922852">
+                    <properties>
+                        <property name="test_id" value="3"/>
+                        <property name="test_step" value="false"/>
+                    </properties>
+                    {testcase_elements}
+                </testcase>
+            </testsuite>
+        </testsuite>
+        """.format(global_properties=default_global_properties, testcase_elements=default_testcase_elements)
+
+    with open(filename, 'w') as f:
+        f.write(junit_xml)
+
+    return filename
+
+
 # ======================================================================================================================
 # Test Suites
 # ======================================================================================================================
@@ -817,7 +862,7 @@ class TestZigZagTestLog(object):
         assert tl.qtest_testcase_id == qtest_id_exp
 
     def test_lookup_ids(self, single_passing_xml, simple_json_config, mock_zigzag):
-        """Test for _lookup_ids happy path"""
+        """Test for qtest_testcase_id happy path"""
 
         # Setup
         mock_zigzag()
@@ -832,7 +877,7 @@ class TestZigZagTestLog(object):
         assert tl.qtest_testcase_id == qtest_id_exp
 
     def test_lookup_ids_not_found(self, single_passing_xml, simple_json_config, mock_zigzag):
-        """Test for _lookup_ids
+        """Test for qtest_testcase_id
         Ask for a test ID that does not exist yet
         """
 
@@ -852,6 +897,23 @@ class TestZigZagTestLog(object):
         tl = ZigZagTestLogs(zz)[0]   # Create a new TestLog object through the ZigZagTestLogs public class
         assert tl.qtest_testcase_id is None
 
+    def test_lookup_ids_cached(self, single_passing_xml, simple_json_config, mock_zigzag, tmpdir):
+        """Test for qtest_testcase_id
+        A testcase id in the persistent cache is used without searching through the search facade
+        """
+
+        # Setup
+        mocker = mock_zigzag()
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN, cache_path=tmpdir.join('zigzag.sqlite3').strpath)
+        zz.parse()
+        zz.persistent_cache.set_many('test-cases', {(str(zz.qtest_project_id), '1'): 4321})
+        mock_post = mocker.patch('requests.Session.post')
+
+        # Test
+        tl = ZigZagTestLogs(zz)[0]   # Create a new TestLog object through the ZigZagTestLogs public class
+        assert tl.qtest_testcase_id == 4321
+        assert not mock_post.called
+
     def test_lookup_test_execution_parameters_not_found(self, single_passing_xml, simple_json_config, mock_zigzag):
         """Test for _lookup_ids
         Ask for a test ID that does not exist yet
@@ -895,7 +957,7 @@ class TestZigZagTestLog(object):
         assert tl.test_execution_parameters == ['_testinfra_host0']
 
     def test_lookup_requirements_not_found(self, single_passing_xml, simple_json_config, mock_zigzag):
-        """Test for _lookup_requirements
+        """Test for qtest_requirements
         Ask for a requirements that have not been imported from jira yet
         """
 
@@ -917,12 +979,40 @@ class TestZigZagTestLog(object):
         assert not len(tl.qtest_requirements)
 
     def test_lookup_requirements(self, single_passing_xml, simple_json_config, mock_zigzag):
-        """Test for _lookup_requirements
+        """Test for qtest_requirements
         Ask for two requirements that correspond to jira ids
         """
 
         # Expectations
-        qtest_id_exp = 123456789
+        qtest_ids_exp = {'ASC-123': 123456789, 'ASC-456': 987654321}
+
+        # Setup
+        def _post(endpoint, data, headers):
+            jira_ids = re.findall(r"'name' ~ '([^']+)'", json.loads(data)['query'])
+            response = mocker.Mock(spec=requests.Response)
+            response.text = json.dumps({"links": [],
+                                        "page": 1,
+                                        "page_size": 100,
+                                        "total": len(jira_ids),
+                                        "items": [{"id": qtest_ids_exp[jira_id], "name": "{} Fake!".format(jira_id)}
+                                                  for jira_id in jira_ids]})
+            return response
+
+        mocker = mock_zigzag()
+        mocker.patch('requests.Session.post', side_effect=_post)
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        zz.parse()
+
+        # Test
+        tl = ZigZagTestLogs(zz)[0]   # Create a new TestLog object through the ZigZagTestLogs public class
+        assert isinstance(tl.qtest_requirements, list)
+        # there should be two requirements since xml has two jira marks
+        assert tl.qtest_requirements == [qtest_ids_exp['ASC-123'], qtest_ids_exp['ASC-456']]
+
+    def test_lookup_requirements_inexact(self, single_passing_xml, simple_json_config, mock_zigzag, tmpdir):
+        """Test for qtest_requirements
+        A single requirement found for a jira id that only starts with the jira id is neither used nor cached
+        """
 
         # Setup
         search_response = {
@@ -932,24 +1022,41 @@ class TestZigZagTestLog(object):
             "total": 1,
             "items": [
                 {
-                    "id": qtest_id_exp,
-                    "name": "PRO-18405 Fake!"
+                    "id": 123456789,
+                    "name": "ASC-1234 Similar requirement"
                 }
             ]
         }
         mock_zigzag(search_response)
-        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN, cache_path=tmpdir.join('zigzag.sqlite3').strpath)
         zz.parse()
 
         # Test
         tl = ZigZagTestLogs(zz)[0]   # Create a new TestLog object through the ZigZagTestLogs public class
-        assert isinstance(tl.qtest_requirements, list)
-        # there should be two requirements since xml has two jira marks
-        assert tl.qtest_requirements == [qtest_id_exp, qtest_id_exp]
+        assert [] == tl.qtest_requirements
+        project_id = str(zz.qtest_project_id)
+        cached = zz.persistent_cache.get_many('requirements', [(project_id, 'ASC-123'), (project_id, 'ASC-456')])
+        assert {(project_id, 'ASC-123'): [], (project_id, 'ASC-456'): []} == cached
+
+    def test_lookup_requirements_connection_error(self, single_passing_xml, simple_json_config, mock_zigzag):
+        """Test for qtest_requirements
+        A search that never got a response is reported as a RuntimeError
+        """
+
+        # Setup
+        mocker = mock_zigzag()
+        mocker.patch('requests.Session.post', side_effect=requests.exceptions.ConnectionError('Connection refused'))
+        zz = ZigZag(single_passing_xml, simple_json_config, TOKEN)
+        zz.parse()
+        tl = ZigZagTestLogs(zz)[0]   # Create a new TestLog object through the ZigZagTestLogs public class
+
+        # Test
+        with pytest.raises(RuntimeError, match='Failed to reach the qTest API!\nConnection refused'):
+            tl.qtest_requirements
 
     def test_successful_test_case_attachments(self, single_passing_xml, simple_json_config, mock_zigzag):
         """Test to ensure that test artifacts are being correctly attached
-        Ensure that there is only one attachment (junit.xml) in the passing case.
+        Ensure that there are no attachments in the passing case since the junit.xml is attached once per run.
         """
 
         # Setup
@@ -962,11 +1069,9 @@ class TestZigZagTestLog(object):
         assert tl.stderr == 'stderr'
         assert tl.stdout == 'stdout'
 
-        # there should be a list of two attachments: the junit xml
-        # file and a text log
+        # the junit xml file is attached once per run so nothing is attached to a passing test log
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 1
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 0
 
     def test_status_pass(self, single_passing_xml, mocker):
         """Verify the status property when we expect a pass"""
@@ -1270,6 +1375,53 @@ class TestZigZagTestLogs(object):
         assert tls[0].module_hierarchy[-1] == 'tests.test_default'  # updated to just be the test classname
         assert tls[1].qtest_test_log.test_step_logs is None
 
+    def test_nested_suite_with_unmarked_test(self,
+                                             nested_suite_with_unmarked_test_xml,
+                                             asc_zigzag_config_file,
+                                             mock_zigzag):
+        """Verify that test cases in nested suites are found and test cases without a test_step property are ignored."""
+
+        # Setup
+        mock_zigzag()
+        zz = ZigZag(nested_suite_with_unmarked_test_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+        zz_stream = ZigZag(nested_suite_with_unmarked_test_xml, asc_zigzag_config_file, TOKEN, stream=True)
+        zz_stream.parse()
+
+        # Test
+        for tls in (zz.test_logs, zz_stream.test_logs):
+            assert [(tl.name, tl.automation_content) for tl in tls] == [('TestCaseWithSteps', '2'),
+                                                                        ('test_case_without_steps', '3')]
+
+    def test_incremental_test_logs(self,
+                                   multiple_tests_with_and_without_steps_xml,
+                                   asc_zigzag_config_file,
+                                   mock_zigzag):
+        """Verify that test logs built incrementally from an iterable of testcases match the ones found in the tree."""
+
+        # Setup
+        mock_zigzag()
+        zz = ZigZag(multiple_tests_with_and_without_steps_xml, asc_zigzag_config_file, TOKEN)
+        zz.parse()
+
+        # Test
+        tls = ZigZagTestLogs(zz, iter(zz.junit_xml.findall('testcase')))
+
+        assert [(tl.name, tl.status) for tl in tls] == [('TestCaseWithSteps', 'PASSED'),
+                                                        ('test_case_without_steps', 'PASSED')]
+        assert tls[1].qtest_test_log.test_step_logs is None
+
+    def test_incremental_test_logs_without_test_step(self, test_without_test_step, simple_json_config, mocker):
+        """Verify that an error is raised when none of the incrementally parsed testcases implement test_step"""
+
+        # Setup
+        junit_xml = etree.parse(test_without_test_step).getroot()
+        zz = mocker.MagicMock()
+
+        # Test
+        with pytest.raises(ZigZagTestLogError, match='Test found without test_step property'):
+            ZigZagTestLogs(zz, iter(junit_xml.findall('testcase')))
+
 
 # noinspection PyProtectedMember
 class TestFailedTestCases(object):
@@ -1291,13 +1443,11 @@ class TestFailedTestCases(object):
         assert tl.stderr == 'stderr'
         assert tl.stdout == 'stdout'
 
-        # there should be a list of two attachments: the junit xml
-        # file and a text log
+        # the junit xml file is attached once per run so only the text logs are attached
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 4
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 3
 
-        for test_log_attachment in tl.qtest_test_log.attachments[1:]:
+        for test_log_attachment in tl.qtest_test_log.attachments:
             assert test_log_attachment.content_type == 'text/plain'
 
     def test_failed_test_case_attachments_no_sys_capture(self,
@@ -1318,12 +1468,10 @@ class TestFailedTestCases(object):
         assert not tl.stderr
         assert not tl.stdout
 
-        # there should be a list of two attachments: the junit xml
-        # file and a text log
+        # the junit xml file is attached once per run so only the text logs are attached
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 2
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
-        assert tl.qtest_test_log.attachments[1].content_type == 'text/plain'
+        assert len(tl.qtest_test_log.attachments) == 1
+        assert tl.qtest_test_log.attachments[0].content_type == 'text/plain'
 
     def test_failed_test_case_attachments_duplicate_sys_capture(self,
                                                                 single_failing_duplicate_sys_capture_xml,
@@ -1344,13 +1492,11 @@ class TestFailedTestCases(object):
         assert tl.stderr == 'stderr'
         assert tl.stdout == 'stdout'
 
-        # there should be a list of two attachments: the junit xml
-        # file and a text log
+        # the junit xml file is attached once per run so only the text logs are attached
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 4
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 3
 
-        for test_log_attachment in tl.qtest_test_log.attachments[1:]:
+        for test_log_attachment in tl.qtest_test_log.attachments:
             assert test_log_attachment.content_type == 'text/plain'
 
     def test_failed_test_case_attachments_missing_sys_err(self,
@@ -1371,13 +1517,11 @@ class TestFailedTestCases(object):
         assert not tl.stderr
         assert tl.stdout == 'stdout'
 
-        # there should be a list of two attachments: the junit xml
-        # file and a text log
+        # the junit xml file is attached once per run so only the text logs are attached
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 3
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 2
 
-        for test_log_attachment in tl.qtest_test_log.attachments[1:]:
+        for test_log_attachment in tl.qtest_test_log.attachments:
             assert test_log_attachment.content_type == 'text/plain'
 
     def test_failed_test_case_attachments_missing_sys_out(self,
@@ -1398,13 +1542,11 @@ class TestFailedTestCases(object):
         assert tl.stderr == 'stderr'
         assert not tl.stdout
 
-        # there should be a list of two attachments: the junit xml
-        # file and a text log
+        # the junit xml file is attached once per run so only the text logs are attached
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 3
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 2
 
-        for test_log_attachment in tl.qtest_test_log.attachments[1:]:
+        for test_log_attachment in tl.qtest_test_log.attachments:
             assert test_log_attachment.content_type == 'text/plain'
 
     def test_failed_test_step_attachments(self,
@@ -1423,12 +1565,11 @@ class TestFailedTestCases(object):
         assert tl.stderr == 'stderr'
         assert tl.stdout == 'stdout'
 
-        # The test log should have the junit xml file, failure, stderr and stdout text logs attached.
+        # The test log should have the failure, stderr and stdout text logs attached.
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 4
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 3
 
-        for test_log_attachment in tl.qtest_test_log.attachments[1:]:
+        for test_log_attachment in tl.qtest_test_log.attachments:
             assert test_log_attachment.content_type == 'text/plain'
 
         # The failing step should have a failure log, stderr and stdout text logs attached.
@@ -1454,11 +1595,10 @@ class TestFailedTestCases(object):
         assert not tl.stderr
         assert not tl.stdout
 
-        # The test log should have the junit xml file and failure text log attached.
+        # The test log should have the failure text log attached.
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 2
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
-        assert tl.qtest_test_log.attachments[1].content_type == 'text/plain'
+        assert len(tl.qtest_test_log.attachments) == 1
+        assert tl.qtest_test_log.attachments[0].content_type == 'text/plain'
 
         # The failing step should have a failure text log attached.
         failing_step = tl.qtest_test_log.test_step_logs[1]      # Failing step at known location.
@@ -1480,15 +1620,14 @@ class TestFailedTestCases(object):
         assert not tl.stderr
         assert tl.stdout == 'stdout'
 
-        # The test log should have the junit xml file, failure and stdout text logs attached.
+        # The test log should have the failure and stdout text logs attached.
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 3
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 2
 
-        for test_log_attachment in tl.qtest_test_log.attachments[1:]:
+        for test_log_attachment in tl.qtest_test_log.attachments:
             assert test_log_attachment.content_type == 'text/plain'
 
-        # The failing test log should have the junit xml file, failure and stdout text logs attached.
+        # The failing step should have the failure and stdout text logs attached.
         failing_step = tl.qtest_test_log.test_step_logs[1]      # Failing step at known location.
         assert len(failing_step.attachments) == 2
 
@@ -1511,15 +1650,14 @@ class TestFailedTestCases(object):
         assert tl.stderr == 'stderr'
         assert not tl.stdout
 
-        # The test log should have the junit xml file, failure and stderr text logs attached.
+        # The test log should have the failure and stderr text logs attached.
         assert isinstance(tl.qtest_test_log.attachments, list)
-        assert len(tl.qtest_test_log.attachments) == 3
-        assert tl.qtest_test_log.attachments[0].content_type == 'application/xml'
+        assert len(tl.qtest_test_log.attachments) == 2
 
-        for test_log_attachment in tl.qtest_test_log.attachments[1:]:
+        for test_log_attachment in tl.qtest_test_log.attachments:
             assert test_log_attachment.content_type == 'text/plain'
 
-            # The failing test log should have the junit xml file, failure and stderr text logs attached.
+            # The failing step should have the failure and stderr text logs attached.
         failing_step = tl.qtest_test_log.test_step_logs[1]      # Failing step at known location.
         assert len(failing_step.attachments) == 2
 
@@ -8,7 +8,6 @@ from __future__ import absolute_import
 import os
 import sys
 import click
-from zigzag.zigzag import ZigZag
 from zigzag.zigzag_error import ZigZagError
 
 
@@ -20,9 +19,99 @@ from zigzag.zigzag_error import ZigZagError
               is_flag=True,
               default=False,
               help='Pretty print XML on schema violations to stdout')
+@click.option('--stream', '-s',
+              is_flag=True,
+              default=False,
+              help='Parse the JUnitXML file incrementally to support files larger than 50 MB')
+@click.option('--pool-size',
+              type=click.IntRange(min=1),
+              default=10,
+              help='The maximum number of connections to keep open to the qTest API')
+@click.option('--batch-size',
+              type=click.IntRange(min=1),
+              default=1000,
+              help='The maximum number of test logs submitted to qTest in a single request')
+@click.option('--batch-bytes',
+              type=click.IntRange(min=1),
+              default=20971520,
+              help='The maximum size in bytes of the test logs submitted to qTest in a single request')
+@click.option('--workers',
+              type=click.IntRange(min=1),
+              default=4,
+              help='The maximum number of requests sent to qTest at the same time')
+@click.option('--rate-limit',
+              type=click.FloatRange(min=0),
+              default=None,
+              help='The maximum number of requests per second sent to qTest (Unlimited by default)')
+@click.option('--wait', '-w',
+              is_flag=True,
+              default=False,
+              help='Wait for qTest to finish processing the uploaded test logs')
+@click.option('--link/--no-link',
+              default=True,
+              help='Link the requirements (Jira tickets) to the test cases once qTest finished processing the '
+                   'uploaded test logs. A run with --link (the default) blocks until the queue jobs finish or '
+                   '--wait-timeout passes (10 minutes by default). Use --no-link to return right after the upload')
+@click.option('--relink',
+              is_flag=True,
+              default=False,
+              help='Send every requirement link even if it already exists in qTest')
+@click.option('--wait-timeout',
+              type=click.FloatRange(min=0),
+              default=600,
+              help='The number of seconds to wait for qTest to finish processing the uploaded test logs with --wait '
+                   'or --link')
+@click.option('--cache-path',
+              envvar='ZIGZAG_CACHE_PATH',
+              type=click.Path(dir_okay=False),
+              default=None,
+              help='The path to a cache of qTest lookups shared between runs (Disabled by default)')
+@click.option('--cache-ttl',
+              type=click.FloatRange(min=0),
+              default=604800,
+              help='The number of seconds a cached qTest lookup stays valid')
+@click.option('--cache-negative-ttl',
+              type=click.FloatRange(min=0),
+              default=3600,
+              help='The number of seconds a cached qTest lookup that found nothing stays valid')
+@click.option('--cache-size',
+              type=click.IntRange(min=1),
+              default=100000,
+              help='The maximum number of cached qTest lookups')
+@click.option('--qtest-url',
+              envvar='QTEST_URL',
+              default=None,
+              help='The URL of the qTest instance (Defaults to https://apitryout.qtestnet.com)')
+@click.option('--profile',
+              type=click.Choice(['text', 'json']),
+              default=None,
+              help='Report the wall time, CPU time and call count of every phase of the run')
+@click.option('--profile-output',
+              type=click.Path(dir_okay=False, writable=True),
+              default=None,
+              help='The path to write the profile report to (Printed to stdout by default)')
 @click.argument('zigzag_config_file', type=click.Path(exists=True))
 @click.argument('junit_input_file', type=click.Path(exists=True))
-def main(zigzag_config_file, junit_input_file, pprint_on_fail):
+def main(zigzag_config_file,
+         junit_input_file,
+         pprint_on_fail,
+         stream,
+         pool_size,
+         batch_size,
+         batch_bytes,
+         workers,
+         rate_limit,
+         wait,
+         link,
+         relink,
+         wait_timeout,
+         cache_path,
+         cache_ttl,
+         cache_negative_ttl,
+         cache_size,
+         qtest_url,
+         profile,
+         profile_output):
     """Upload JUnitXML results to qTest manager.
 
     \b
@@ -32,30 +121,106 @@ def main(zigzag_config_file, junit_input_file, pprint_on_fail):
     \b
     Required Environment Variables:
         QTEST_API_TOKEN         The qTest API token to use for authorization
+    \b
+    Optional Environment Variables:
+        ZIGZAG_CACHE_PATH       The path to a cache of qTest lookups shared between runs
+        QTEST_URL               The URL of the qTest instance
     """
 
     api_token_env_var = 'QTEST_API_TOKEN'
+    zz = None
 
     try:
         if not os.environ.get(api_token_env_var):
             raise RuntimeError('The "{}" environment variable is not defined! '
                                'See help for more details.'.format(api_token_env_var))
 
+        # the heavy dependencies of zigzag are only imported once there is something to upload
+        from zigzag.zigzag import ZigZag
+        from zigzag.queue_job_facade import QueueJobTimeoutError
+
         zz = ZigZag(junit_input_file,
                     zigzag_config_file,
                     os.environ[api_token_env_var],
-                    pprint_on_fail)
+                    pprint_on_fail,
+                    stream,
+                    pool_size,
+                    cache_path,
+                    cache_ttl,
+                    cache_size,
+                    cache_negative_ttl,
+                    workers,
+                    rate_limit,
+                    qtest_url)
         zz.parse()
 
-        job_id = zz.upload_test_results()
+        job_ids = zz.upload_test_results(batch_size, batch_bytes, workers)
+
+        for job_id in job_ids:
+            click.echo(click.style("\nQueue Job ID: {}".format(str(job_id))))
 
-        click.echo(click.style("\nQueue Job ID: {}".format(str(job_id))))
+        try:
+            if link:
+                states = zz.link_requirements(job_ids, wait_timeout, workers, not relink)
+            elif wait:
+                states = zz.wait_for_jobs(job_ids, wait_timeout, workers)
+        except QueueJobTimeoutError as e:
+            _echo_poll_errors(zz)
+            # the test logs were uploaded, qTest is only slow to process them
+            click.echo(click.style(str(e), fg='yellow'))
+            if wait:
+                click.echo(click.style("\nTimed out!", fg='yellow'))
+                sys.exit(1)
+            click.echo(click.style("\nUploaded! The requirements of the unfinished jobs were not linked.",
+                                   fg='yellow'))
+            return
+
+        _echo_poll_errors(zz)
+        if wait:
+            for job_id in job_ids:
+                click.echo(click.style("\nQueue Job ID: {} State: {}".format(str(job_id), states[job_id])))
         click.echo(click.style("\nSuccess!", fg='green'))
     except(RuntimeError, ZigZagError) as e:
+        _echo_poll_errors(zz)
         click.echo(click.style(str(e), fg='red'))
         click.echo(click.style("\nFailed!", fg='red'))
 
         sys.exit(1)
+    finally:
+        # the phases that ran are reported even if the run failed
+        if profile and zz is not None:
+            _write_profile(zz.profiler, profile, profile_output)
+
+
+def _echo_poll_errors(zz):
+    """Print the polls of the queue jobs that failed and were tried again
+
+    Args:
+        zz (ZigZag): The mediator of the run or None if it was not created.
+    """
+
+    if zz is None:
+        return
+    for error in zz.queue_job_facade.poll_errors:
+        click.echo(click.style(error, fg='yellow'))
+
+
+def _write_profile(profiler, report_format, output_path=None):
+    """Write the profile report of a run
+
+    Args:
+        profiler (Profiler): The profiler that measured the run.
+        report_format (str): The format of the report. ('text' or 'json')
+        output_path (str): The path of the file to write the report to or None to print it.
+    """
+
+    report = profiler.format_json() if report_format == 'json' else profiler.format_text()
+
+    if output_path:
+        with open(output_path, 'w') as f:
+            f.write(report + '\n')
+    else:
+        click.echo("\n{}".format(report))
 
 
 if __name__ == "__main__":
@@ -53,6 +53,9 @@ class ModuleHierarchyFacade(object):
         """Search for a test cycle at the root of the qTest Test Execution with a matching name. (Case insensitive) If a
         matching test cycle name is not found then a test cycle will be created with the given name.
 
+        The PID of the test cycle is cached in the persistent cache of the mediator. A cached test cycle is checked with
+        a single request and the test cycles at the root are only listed when the cache misses or is stale.
+
         Args:
             test_cycle_name (str): The test cycle name (e.g. queens) to search for in an case insensitive fashion.
 
@@ -65,31 +68,60 @@ class ModuleHierarchyFacade(object):
 
         auto_api = swagger_client.TestcycleApi()
         project_id = self._mediator.qtest_project_id
-        test_cycle_pid = None
+        cache = self._mediator.persistent_cache
+        cache_key = (str(project_id), test_cycle_name.lower())
+
+        cached = cache.get_many('test-cycles', [cache_key]).get(cache_key)
+        if cached and self._is_cached_test_cycle_valid(auto_api, cached, test_cycle_name):
+            return cached['pid']
 
         try:
-            test_cycles = {tc.to_dict()['name']: tc.to_dict()['pid'] for tc in auto_api.get_test_cycles(project_id)}
-
-            if test_cycle_name.lower() not in [tcn.lower() for tcn in test_cycles.keys()]:
-                test_cycle_pid = auto_api.create_cycle(
-                    project_id=project_id,
-                    parent_id=0,
-                    parent_type='root',
-                    body=swagger_client.TestCycleResource(
-                        name=test_cycle_name)).to_dict()['pid']
+            # only the test cycles directly under the root can match so the rest of the project is not listed
+            with self._mediator.profiler.span('qtest.test_cycles'):
+                test_cycles = [tc.to_dict()
+                               for tc in auto_api.get_test_cycles(project_id, parent_id=0, parent_type='root')]
+            matches = [tc for tc in test_cycles if tc['name'].lower() == test_cycle_name.lower()]
+            exact_matches = [tc for tc in matches if tc['name'] == test_cycle_name]
+
+            if not matches:
+                with self._mediator.profiler.span('qtest.test_cycles'):
+                    test_cycle = auto_api.create_cycle(
+                        project_id=project_id,
+                        parent_id=0,
+                        parent_type='root',
+                        body=swagger_client.TestCycleResource(
+                            name=test_cycle_name)).to_dict()
             else:
-                try:
-                    test_cycle_pid = test_cycles[test_cycle_name]
-                except KeyError:
-                    for key in list(test_cycles.keys()):
-                        if key.lower() == test_cycle_name.lower():
-                            # this will take the last match found
-                            # once we can warn we should warn the user that we found duplicate cycles
-                            test_cycle_pid = test_cycles[key]
+                # this will take the last match found
+                # once we can warn we should warn the user that we found duplicate cycles
+                test_cycle = (exact_matches or matches)[-1]
         except ApiException as e:
             raise RuntimeError("The qTest API reported an error!\n"
                                "Status code: {}\n"
                                "Reason: {}\n"
                                "Message: {}".format(e.status, e.reason, e.body))
 
-        return test_cycle_pid
+        if test_cycle.get('id') is not None:
+            cache.set_many('test-cycles', {cache_key: {'id': test_cycle['id'], 'pid': test_cycle['pid']}})
+
+        return test_cycle['pid']
+
+    def _is_cached_test_cycle_valid(self, auto_api, cached, test_cycle_name):
+        """Check that a cached test cycle still exists in qTest with the same PID and name
+
+        Args:
+            auto_api (swagger_client.TestcycleApi): The qTest test cycle API.
+            cached (dict): The cached 'id' and 'pid' of the test cycle.
+            test_cycle_name (str): The test cycle name to match in an case insensitive fashion.
+
+        Returns:
+            bool: True if the cached test cycle can be used
+        """
+
+        try:
+            with self._mediator.profiler.span('qtest.test_cycles'):
+                test_cycle = auto_api.get_test_cycle(self._mediator.qtest_project_id, cached['id']).to_dict()
+        except ApiException:
+            return False  # the test cycle was deleted or can not be read so it is discovered again
+
+        return test_cycle['pid'] == cached['pid'] and test_cycle['name'].lower() == test_cycle_name.lower()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import os
+import json
+import time
+import sqlite3
+
+
+class PersistentCache(object):
+
+    _SCHEMA = """CREATE TABLE IF NOT EXISTS cache (
+                     namespace TEXT NOT NULL,
+                     key TEXT NOT NULL,
+                     value TEXT NOT NULL,
+                     expires REAL NOT NULL,
+                     accessed REAL NOT NULL,
+                     PRIMARY KEY (namespace, key)
+                 )"""
+    _SQL_VARIABLE_LIMIT = 500  # stay well below the default SQLITE_MAX_VARIABLE_NUMBER of 999
+
+    def __init__(self, path=None, ttl=604800, max_entries=100000, negative_ttl=3600):
+        """A cache of qTest lookups that persists between runs and is shared by every process on a machine
+        The cache is a SQLite database so that concurrent zigzag processes can read and write it safely. Entries expire
+        after their TTL and the least recently used entries are evicted once the cache holds more than 'max_entries'.
+
+        Args:
+            path (str): The path to the SQLite database file. The cache is disabled if this is None.
+            ttl (float): The default number of seconds an entry stays valid.
+            max_entries (int): The maximum number of entries to keep.
+            negative_ttl (float): The number of seconds an entry recording that nothing was found stays valid.
+        """
+
+        self._path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._negative_ttl = negative_ttl
+
+        if self._path is not None:
+            directory = os.path.dirname(os.path.abspath(self._path))
+            try:
+                os.makedirs(directory)
+            except OSError:  # the directory already exists or was created by another process
+                if not os.path.isdir(directory):
+                    raise
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(self._SCHEMA)
+            finally:
+                connection.close()
+
+    @property
+    def path(self):
+        """Gets the path to the SQLite database file
+
+        Returns:
+            str: The path or None if the cache is disabled
+        """
+
+        return self._path
+
+    @property
+    def enabled(self):
+        """Gets whether the cache persists anything
+
+        Returns:
+            bool
+        """
+
+        return self._path is not None
+
+    @property
+    def negative_ttl(self):
+        """Gets the number of seconds an entry recording that nothing was found stays valid
+        Lookups that found nothing are expected to find something soon so they expire sooner than other entries.
+
+        Returns:
+            float
+        """
+
+        return self._negative_ttl
+
+    def get_many(self, namespace, keys):
+        """Gets the entries of the keys that are cached and have not expired
+
+        Args:
+            namespace (str): The kind of lookup the entries belong to.
+            keys (list(tuple)): The keys to get.
+
+        Returns:
+            dict(tuple: object): The cached value of each key that was found. (A cached value may be None)
+        """
+
+        if not self.enabled or not keys:
+            return {}
+
+        now = time.time()
+        encoded_keys = {self._encode_key(key): key for key in keys}
+        found = {}
+        connection = self._connect()
+        try:
+            with connection:
+                encoded = list(encoded_keys)
+                for i in range(0, len(encoded), self._SQL_VARIABLE_LIMIT):
+                    batch = encoded[i:i + self._SQL_VARIABLE_LIMIT]
+                    rows = connection.execute("SELECT key, value FROM cache "
+                                              "WHERE namespace = ? AND expires > ? AND key IN ({})"
+                                              .format(', '.join('?' * len(batch))), [namespace, now] + batch)
+                    for encoded_key, value in rows:
+                        found[encoded_keys[encoded_key]] = json.loads(value)
+                    connection.execute("UPDATE cache SET accessed = ? "
+                                       "WHERE namespace = ? AND key IN ({})".format(', '.join('?' * len(batch))),
+                                       [now, namespace] + batch)
+        finally:
+            connection.close()
+
+        return found
+
+    def set_many(self, namespace, values, ttl=None):
+        """Stores entries and evicts expired and least recently used entries
+
+        Args:
+            namespace (str): The kind of lookup the entries belong to.
+            values (dict(tuple: object)): The JSON serializable value of each key.
+            ttl (float): The number of seconds the entries stay valid. (Defaults to the TTL of the cache)
+        """
+
+        if not self.enabled or not values:
+            return
+
+        now = time.time()
+        expires = now + (self._ttl if ttl is None else ttl)
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO cache (namespace, key, value, expires, accessed) "
+                                       "VALUES (?, ?, ?, ?, ?)",
+                                       [(namespace, self._encode_key(key), json.dumps(value), expires, now)
+                                        for key, value in values.items()])
+                connection.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+                connection.execute("DELETE FROM cache WHERE rowid IN "
+                                   "(SELECT rowid FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                                   (self._max_entries,))
+        finally:
+            connection.close()
+
+    def _connect(self):
+        """Open a connection to the SQLite database that waits for the locks held by other processes
+
+        Returns:
+            sqlite3.Connection
+        """
+
+        return sqlite3.connect(self._path, timeout=30)
+
+    @staticmethod
+    def _encode_key(key):
+        """Encode a key as text
+
+        Args:
+            key (tuple): The key to encode.
+
+        Returns:
+            str
+        """
+
+        return json.dumps(list(key))
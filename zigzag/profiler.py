@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import json
+import time
+from threading import Lock
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    _wall_clock = time.perf_counter
+    _cpu_clock = time.process_time
+except AttributeError:  # Python 2
+    _wall_clock = time.time
+    _cpu_clock = time.clock
+
+
+class Profiler(object):
+
+    def __init__(self):
+        """Collects the wall time, CPU time and call count of named spans around the phases of a run
+        Spans are thread safe and may be nested. The CPU time of a span is the CPU time of the whole process while the
+        span was open, so spans that run concurrently on several threads each include the CPU time of the others.
+        """
+
+        self._lock = Lock()
+        self._spans = OrderedDict()     # name: [calls, wall time, CPU time] in the order the spans were first opened
+
+    @contextmanager
+    def span(self, name):
+        """Measure the block of a 'with' statement as a named span
+
+        Args:
+            name (str): The name of the phase being measured. (e.g. 'parse.validate')
+        """
+
+        with self._lock:
+            stats = self._spans.setdefault(name, [0, 0.0, 0.0])
+        wall_start = _wall_clock()
+        cpu_start = _cpu_clock()
+        try:
+            yield
+        finally:
+            wall_time = _wall_clock() - wall_start
+            cpu_time = _cpu_clock() - cpu_start
+            with self._lock:
+                stats[0] += 1
+                stats[1] += wall_time
+                stats[2] += cpu_time
+
+    def report(self):
+        """Gets the totals of every span
+
+        Returns:
+            list(dict): The 'name', 'calls', 'wall_time' and 'cpu_time' of each span in the order they were opened.
+        """
+
+        with self._lock:
+            return [{'name': name, 'calls': calls, 'wall_time': wall_time, 'cpu_time': cpu_time}
+                    for name, (calls, wall_time, cpu_time) in self._spans.items()]
+
+    def format_text(self):
+        """Format the totals of every span as a table
+
+        Returns:
+            str
+        """
+
+        report = self.report()
+        width = max([len('Phase')] + [len(span['name']) for span in report])
+        lines = ['{:<{width}}  {:>8}  {:>12}  {:>12}'.format('Phase', 'Calls', 'Wall (s)', 'CPU (s)', width=width)]
+        row = '{:<{width}}  {:>8}  {:>12.3f}  {:>12.3f}'
+        lines.extend(row.format(span['name'], span['calls'], span['wall_time'], span['cpu_time'], width=width)
+                     for span in report)
+
+        return '\n'.join(lines)
+
+    def format_json(self):
+        """Format the totals of every span as JSON
+
+        Returns:
+            str
+        """
+
+        return json.dumps({'spans': self.report()}, indent=2)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+from multiprocessing.pool import ThreadPool
+
+
+class QTestEngine(object):
+
+    def __init__(self, max_concurrency=4):
+        """An engine that sends independent requests to the qTest API concurrently
+        Independent lookups and links are sent at the same time so that the wall time of a run grows with the latency
+        of the slowest chain of dependent requests instead of the number of requests. Requests go through the pooled
+        qTest session of the mediator which also applies the per host rate limit.
+
+        Args:
+            max_concurrency (int): The maximum number of requests sent to the qTest API at the same time.
+        """
+
+        self._max_concurrency = max_concurrency
+
+    @property
+    def max_concurrency(self):
+        """Gets the maximum number of requests sent to the qTest API at the same time
+
+        Returns:
+            int
+        """
+
+        return self._max_concurrency
+
+    def map(self, func, items, max_concurrency=None):
+        """Call a function for every item concurrently and wait for every call to finish
+
+        Args:
+            func (callable): The function to call with each item.
+            items (iterable): The items to call the function with.
+            max_concurrency (int): Overrides the maximum number of concurrent calls of the engine.
+
+        Returns:
+            list: The result of each call in the order of the items.
+
+        Raises:
+            Exception: The first exception raised by a call.
+        """
+
+        items = list(items)
+        workers = max(1, min(max_concurrency or self._max_concurrency, len(items)))
+        if workers == 1:
+            return [func(item) for item in items]
+
+        pool = ThreadPool(workers)
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import time
+import requests
+import swagger_client
+from threading import Lock
+from future.moves.urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError
+from swagger_client.rest import ApiException
+
+
+class QTestSession(object):
+
+    _DEFAULT_BASE_URL = 'https://apitryout.qtestnet.com'
+    _RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    _SSL_POOL_KW = ('cert_reqs', 'ca_certs', 'cert_file', 'key_file')
+
+    def __init__(self, pool_size=10, max_retries=3, backoff_factor=0.5, rate_limit=None, base_url=None):
+        """A single pooled, keep-alive transport shared by every request made to the qTest API
+
+        Both the 'requests' calls made by zigzag and the calls made by the swagger client go through the same
+        connection pool so that TCP and TLS handshakes are paid once per run instead of once per request.
+
+        Args:
+            pool_size (int): The maximum number of connections to keep open to the qTest API.
+            max_retries (int): The number of times to retry a request that failed with a 429 or 5xx response or
+                could not connect. (A POST that changes qTest is only retried when qTest did not process it)
+            backoff_factor (float): The backoff factor applied between retries. (See urllib3.util.retry.Retry)
+            rate_limit (float): The maximum number of requests per second sent to a host. (Unlimited if None)
+            base_url (str): The URL of the qTest instance. (Defaults to 'https://apitryout.qtestnet.com')
+        """
+
+        self._pool_size = pool_size
+        self._base_url = (base_url or self._DEFAULT_BASE_URL).rstrip('/')
+        self._rate_limiter = RateLimiter(rate_limit)
+        self._retry = self._build_retry(max_retries, backoff_factor)
+        self._read_only_retry = self._build_retry(max_retries, backoff_factor, read_only_post=True)
+
+        # only the read-only searches are sent through the session so its POST requests are as safe to retry as a GET
+        self._adapter = HTTPAdapter(pool_connections=pool_size,
+                                    pool_maxsize=pool_size,
+                                    max_retries=self._read_only_retry)
+        self._session = requests.Session()
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+
+        # hand the connection pool of the session to the swagger client, keeping the SSL settings of the swagger
+        # client configuration and retrying with the policy for requests that may change qTest
+        self._api_client = swagger_client.ApiClient(host=self._base_url)
+        pool_manager = self._adapter.poolmanager
+        swagger_pool_kw = self._api_client.rest_client.pool_manager.connection_pool_kw
+        for ssl_kw in self._SSL_POOL_KW:
+            pool_manager.connection_pool_kw[ssl_kw] = swagger_pool_kw.get(ssl_kw)
+        pool_manager.connection_pool_kw['retries'] = self._retry
+        self._api_client.rest_client.pool_manager = pool_manager
+        swagger_client.configuration.api_client = self._api_client
+
+        # the swagger client sends every request through 'RESTClientObject.request'
+        rest_request = self._api_client.rest_client.request
+
+        def _rate_limited_request(method, url, *args, **kwargs):
+            self._rate_limiter.acquire(urlparse(url).netloc)
+            try:
+                return rest_request(method, url, *args, **kwargs)
+            except HTTPError as e:
+                # the swagger client only reports SSL errors as an 'ApiException' so connection errors, timeouts and
+                # exhausted retries are reported the same way for the facades to handle
+                raise ApiException(status=0, reason="{0}\n{1}".format(type(e).__name__, str(e)))
+
+        self._api_client.rest_client.request = _rate_limited_request
+
+    @property
+    def pool_size(self):
+        """Gets the maximum number of connections kept open to the qTest API
+
+        Returns:
+            int
+        """
+
+        return self._pool_size
+
+    @property
+    def base_url(self):
+        """Gets the URL of the qTest instance that every request is sent to
+
+        Returns:
+            str
+        """
+
+        return self._base_url
+
+    @property
+    def rate_limiter(self):
+        """Gets the rate limiter applied to every request sent to the qTest API
+
+        Returns:
+            RateLimiter
+        """
+
+        return self._rate_limiter
+
+    @property
+    def api_client(self):
+        """Gets the swagger client that shares this session's connection pool
+
+        Returns:
+            swagger_client.ApiClient
+        """
+
+        return self._api_client
+
+    def url(self, path):
+        """Build the URL of a qTest API endpoint
+
+        Args:
+            path (str): The path and query of the endpoint. (e.g. '/api/v3/projects/1/search?page=1')
+
+        Returns:
+            str
+        """
+
+        return '{}/{}'.format(self._base_url, path.lstrip('/'))
+
+    def post(self, url, **kwargs):
+        """Send a read-only POST request, like a search, to the qTest API through the shared connection pool
+        The request is retried on 5xx responses and read errors so it must not change anything in qTest.
+
+        Args:
+            url (str): The URL to POST to.
+            **kwargs: Optional arguments that 'requests.Session.post' takes.
+
+        Returns:
+            requests.Response
+        """
+
+        self._rate_limiter.acquire(urlparse(url).netloc)
+        return self._session.post(url, **kwargs)
+
+    def _build_retry(self, max_retries, backoff_factor, read_only_post=False):
+        """Build a retry policy with an exponential backoff
+
+        Idempotent methods are retried on 429 and 5xx responses, connection errors and read errors. A POST request
+        may have been processed by qTest before it failed, like a submit that timed out, so it is only retried when
+        it could not connect or was answered with 429 or 503. The last response is returned instead of raising once
+        the retries are exhausted so that callers keep reporting the status code and reason of the qTest API.
+
+        Args:
+            max_retries (int): The number of times to retry.
+            backoff_factor (float): The backoff factor applied between retries.
+            read_only_post (bool): Retry POST requests like idempotent methods because they only read from qTest.
+
+        Returns:
+            urllib3.util.retry.Retry
+        """
+
+        retry_kwargs = {'total': max_retries,
+                        'backoff_factor': backoff_factor,
+                        'status_forcelist': self._RETRY_STATUS_CODES,
+                        'raise_on_status': False}
+        if not read_only_post:
+            return _QTestRetry(**retry_kwargs)
+
+        try:
+            return Retry(allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'POST'}, **retry_kwargs)
+        except (AttributeError, TypeError):  # urllib3 < 1.26
+            return Retry(method_whitelist=Retry.DEFAULT_METHOD_WHITELIST | {'POST'}, **retry_kwargs)
+
+
+class _QTestRetry(Retry):
+
+    # responses to a POST request that qTest did not process
+    _POST_RETRY_STATUS_CODES = (429, 503)
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        """Check if a response should be retried. POST requests are only retried when qTest did not process them.
+
+        Args:
+            method (str): The HTTP method of the request.
+            status_code (int): The status code of the response.
+            has_retry_after (bool): The response has a 'Retry-After' header.
+
+        Returns:
+            bool
+        """
+
+        if method.upper() == 'POST':
+            return status_code in self._POST_RETRY_STATUS_CODES
+        return super(_QTestRetry, self).is_retry(method, status_code, has_retry_after)
+
+
+class RateLimiter(object):
+
+    def __init__(self, rate=None):
+        """A thread safe limit on the number of requests per second sent to each host
+        Requests to a host are spaced evenly and callers block until their slot comes up.
+
+        Args:
+            rate (float): The maximum number of requests per second sent to a host. (Unlimited if None)
+        """
+
+        self._rate = rate
+        self._lock = Lock()
+        self._next_slots = {}   # host: the earliest time the next request may be sent
+
+    @property
+    def rate(self):
+        """Gets the maximum number of requests per second sent to a host
+
+        Returns:
+            float: The rate or None if unlimited
+        """
+
+        return self._rate
+
+    def acquire(self, host):
+        """Block until a request may be sent to a host
+
+        Args:
+            host (str): The host the request is sent to.
+        """
+
+        if not self._rate:
+            return
+
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slots.get(host, now))
+            self._next_slots[host] = slot + 1.0 / self._rate
+        if slot > now:
+            time.sleep(slot - now)
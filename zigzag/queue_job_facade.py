@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import time
+import swagger_client
+from swagger_client.rest import ApiException
+
+
+class QueueJobFacade(object):
+
+    _PENDING_STATES = ('IN_WAITING', 'IN_PROCESSING', 'PENDING')
+    _SUCCESS_STATE = 'SUCCESS'
+    _ERROR_STATE = 'ERROR'
+    _UNKNOWN_STATE = 'UNKNOWN'  # the job has not been polled successfully yet
+
+    def __init__(self, mediator):
+        """A facade to track the qTest queue jobs that process submitted test logs
+
+        Args:
+            mediator (ZigZag): the mediator that stores shared data
+        """
+
+        self._mediator = mediator
+        self._testlog_api = swagger_client.TestlogApi()
+        self._poll_errors = []
+
+    @property
+    def poll_errors(self):
+        """Gets the polls of the last 'wait' that failed for a reason that may go away and were tried again
+
+        Returns:
+            list(str): the reason every failed poll failed
+        """
+        return self._poll_errors
+
+    def wait(self, job_ids, timeout=600, interval=1.0, max_interval=30.0, backoff_factor=2.0, max_workers=4):
+        """Wait for queue jobs to finish processing
+        Every unfinished job is polled concurrently. The time between polls starts at 'interval' and grows
+        exponentially up to 'max_interval' until every job finished or the deadline passed. A poll that failed with
+        a connection error, a 429 or a 5xx response is kept in 'poll_errors' and the job is polled again with the
+        same backoff.
+
+        Args:
+            job_ids (list(int)): The queue processing IDs of the jobs to wait for.
+            timeout (float): The number of seconds to wait for every job to finish.
+            interval (float): The number of seconds to wait before polling the unfinished jobs again.
+            max_interval (float): The maximum number of seconds to wait between polls.
+            backoff_factor (float): The factor the time between polls is multiplied by after each poll.
+            max_workers (int): The maximum number of jobs polled at the same time.
+
+        Returns:
+            dict(int: str): The final state of each job.
+
+        Raises:
+            RuntimeError: A job failed.
+            QueueJobTimeoutError: No job failed but some did not finish before the deadline.
+        """
+
+        deadline = time.time() + timeout
+        self._poll_errors = []
+        states = {}
+        errors = {}
+        pending = list(job_ids)
+
+        while pending:
+            results = self._mediator.qtest_engine.map(self._track, pending, max_workers)
+            still_pending = []
+            for job_id, (state, error) in zip(pending, results):
+                if error is None:
+                    errors.pop(job_id, None)
+                else:
+                    errors[job_id] = error
+                if state is None:   # the poll failed for a reason that may go away so the job is polled again
+                    self._poll_errors.append("Failed to poll Job ID: {}, polled again\n{}".format(job_id, error))
+                    states.setdefault(job_id, self._UNKNOWN_STATE)
+                    still_pending.append(job_id)
+                else:
+                    states[job_id] = state
+                    if state in self._PENDING_STATES:
+                        still_pending.append(job_id)
+            pending = still_pending
+
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * backoff_factor, max_interval)
+
+        failed = [job_id for job_id in job_ids if job_id not in pending and states[job_id] != self._SUCCESS_STATE]
+        if failed or pending:
+            message = ["Failed to process {} of {} jobs!".format(len(failed) + len(pending), len(job_ids))]
+            message.extend("Job ID: {} State: {}\n{}".format(job_id, states[job_id], errors.get(job_id, ''))
+                           for job_id in failed)
+            if pending:
+                message.append("Timed out after {} seconds waiting for Job IDs: {}".format(
+                    timeout, ', '.join(str(job_id) for job_id in pending)))
+                message.extend("Job ID: {} Last poll error:\n{}".format(job_id, errors[job_id])
+                               for job_id in pending if job_id in errors)
+            if failed:
+                raise RuntimeError('\n'.join(message))
+            raise QueueJobTimeoutError('\n'.join(message), states)
+
+        return states
+
+    def _track(self, job_id):
+        """Get the state of a queue job without raising so that one failed poll does not stop the others
+        Only a 4xx response other than 429 fails the job. Connection errors (status 0), 429 and 5xx responses may go
+        away so the state of the job is unknown.
+
+        Args:
+            job_id (int): The queue processing ID of the job.
+
+        Returns:
+            tuple(str, str): The state of the job or None if it is unknown and the reason it failed or None.
+        """
+
+        try:
+            with self._mediator.profiler.span('qtest.track'):
+                response = self._testlog_api.track(job_id)
+        except ApiException as e:
+            error = ("The qTest API reported an error!\n"
+                     "Status code: {}\n"
+                     "Reason: {}\n"
+                     "Message: {}".format(e.status, e.reason, e.body))
+            if isinstance(e.status, int) and 400 <= e.status < 500 and e.status != 429:
+                return self._ERROR_STATE, error
+            return None, error
+
+        if response.state in self._PENDING_STATES or response.state == self._SUCCESS_STATE:
+            return response.state, None
+        return response.state, response.content
+
+
+class QueueJobTimeoutError(RuntimeError):
+    """An Error raised when qTest did not finish processing the queue jobs in time even though none of them failed"""
+
+    def __init__(self, message, states):
+        """An error to raise when the queue is slow rather than the upload broken
+
+        Args:
+            message (str): the reason waiting failed
+            states (dict(int: str)): the last known state of each job
+        """
+        super(QueueJobTimeoutError, self).__init__(message)
+        self.states = states
@@ -6,10 +6,13 @@
 from __future__ import absolute_import
 import swagger_client
 from swagger_client.rest import ApiException
+from zigzag.zigzag_test_log import ZigZagTestLogError
 
 
 class RequirementsLinkFacade(object):
 
+    _FIND_BATCH_SIZE = 100  # the number of requirements whose links are fetched in a single request
+
     def __init__(self, mediator):
         """A facade to link requirements to test-cases
 
@@ -19,41 +22,186 @@ class RequirementsLinkFacade(object):
         self._mediator = mediator
         self._object_link_api = swagger_client.ObjectlinkApi()
 
-    def link(self):
+    def link(self, incremental=True):
         """links known test requirements(jira tickets) to known test cases in qTest
+        The test cases are created by qTest while processing the queue jobs so this should only be called once the
+        jobs finished. (See ZigZag.link_requirements)
+
+        Args:
+            incremental (bool): only send the links that do not exist in qTest yet
+
+        Returns:
+            dict(int: list(int)): the qTest test case ids linked to each qTest requirement id
 
         Raises:
             RuntimeError: The qTest API reported an error!
         """
 
-        # build data structure to control linking dict[str: list]
-        links = {}
+        profiler = self._mediator.profiler
+        with profiler.span('link.plan'):
+            plan = self.plan()
+        if incremental:
+            with profiler.span('link.diff'):
+                plan = self.diff(plan)
+        with profiler.span('link.execute'):
+            failures = self.execute(plan)
+        if failures:
+            raise RuntimeError("Failed to link {} of {} requirements!\n{}".format(
+                len(failures), len(plan), '\n'.join(failures[requirement_id] for requirement_id in sorted(failures))))
+
+        return plan
+
+    def plan(self):
+        """Build the graph of requirements to test cases that should be linked
+        The testcase ids and requirements of every log are resolved with a few bulk searches up front so building the
+        graph does not trigger any lookups. Only requirements and test cases that were both found in qTest are linked.
+
+        Returns:
+            dict(int: list(int)): the unique qTest test case ids to link to each qTest requirement id
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        testcase_ids = self._mediator.search_facade.lookup_testcase_ids()
+        requirements = self._mediator.search_facade.lookup_requirements()
+
+        plan = {}
         for log in self._mediator.test_logs:
-            for requirement in log.qtest_requirements:
-                if requirement in links:
-                    links[requirement].append(log.qtest_testcase_id)
-                else:
-                    links[requirement] = []
-                    if log.qtest_testcase_id:
-                        links[requirement].append(log.qtest_testcase_id)
-
-        for requirement, test_case_ids in links.items():
-            if len(test_case_ids):
-                self._link_requirement_to_testcases(requirement, test_case_ids)
+            try:
+                testcase_id = testcase_ids.get(log.automation_content)
+            except ZigZagTestLogError:
+                continue  # if we cant find automation content this is a bad record
+            if not testcase_id:
+                continue
+            for jira_id in log.jira_issues:
+                for requirement_id in requirements.get(jira_id, []):
+                    plan.setdefault(requirement_id, set()).add(testcase_id)
+
+        return {requirement_id: sorted(test_case_ids) for requirement_id, test_case_ids in plan.items()}
+
+    def diff(self, plan):
+        """Remove the links that already exist in qTest from a plan
+        The existing links of the requirements are read from the persistent cache of the mediator and only the
+        requirements whose cached links do not cover the plan are fetched from qTest, in bulk.
+
+        Args:
+            plan (dict(int: list(int))): the qTest test case ids to link to each qTest requirement id
+
+        Returns:
+            dict(int: list(int)): the qTest test case ids that are not linked to each qTest requirement id yet
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        project_id = str(self._mediator.qtest_project_id)
+        cache = self._mediator.persistent_cache
+        cached = cache.get_many('links', [(project_id, requirement_id) for requirement_id in plan])
+        existing = {requirement_id: set(test_case_ids) for (_, requirement_id), test_case_ids in cached.items()}
+
+        unknown = sorted(requirement_id for requirement_id, test_case_ids in plan.items()
+                         if not existing.get(requirement_id, set()).issuperset(test_case_ids))
+        batches = [unknown[i:i + self._FIND_BATCH_SIZE] for i in range(0, len(unknown), self._FIND_BATCH_SIZE)]
+        fetched = {requirement_id: set() for requirement_id in unknown}
+        for containers in self._mediator.qtest_engine.map(self._find_linked_test_cases, batches):
+            fetched.update(containers)
+        existing.update(fetched)
+        cache.set_many('links', {(project_id, requirement_id): sorted(test_case_ids)
+                                 for requirement_id, test_case_ids in fetched.items()})
+
+        missing = {}
+        for requirement_id, test_case_ids in plan.items():
+            test_case_ids = [test_case_id for test_case_id in test_case_ids
+                             if test_case_id not in existing.get(requirement_id, set())]
+            if test_case_ids:
+                missing[requirement_id] = test_case_ids
+
+        return missing
+
+    def execute(self, plan):
+        """Link every requirement to its test cases concurrently
+        A failed link does not stop the other links.
+
+        Args:
+            plan (dict(int: list(int))): the qTest test case ids to link to each qTest requirement id
+
+        Returns:
+            dict(int: str): the reason linking failed for each qTest requirement id that failed to link
+        """
+
+        links = sorted(plan.items())
+        errors = self._mediator.qtest_engine.map(lambda link: self._try_link_requirement_to_testcases(*link), links)
+
+        # remember the new links so that the next run does not have to fetch them
+        project_id = str(self._mediator.qtest_project_id)
+        cache = self._mediator.persistent_cache
+        linked = {(project_id, requirement_id): test_case_ids
+                  for (requirement_id, test_case_ids), error in zip(links, errors) if error is None}
+        cached = cache.get_many('links', list(linked))
+        cache.set_many('links', {key: sorted(set(test_case_ids) | set(cached.get(key, [])))
+                                 for key, test_case_ids in linked.items()})
+
+        return {requirement_id: error for (requirement_id, _), error in zip(links, errors) if error is not None}
+
+    def _find_linked_test_cases(self, requirement_ids):
+        """Fetch the test cases that are already linked to a set of requirements in qTest
+
+        Args:
+            requirement_ids (list(int)): the qTest requirement ids
+
+        Returns:
+            dict(int: set(int)): the qTest test case ids linked to each qTest requirement id
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        try:
+            project_id = self._mediator.qtest_project_id
+            with self._mediator.profiler.span('qtest.find_links'):
+                containers = self._object_link_api.find(project_id, 'requirements', ids=requirement_ids)
+        except ApiException as e:
+            raise RuntimeError("The qTest API reported an error!\n"
+                               "Status code: {}\n"
+                               "Reason: {}\n"
+                               "Message: {}".format(e.status, e.reason, e.body))
+
+        # requirements can be linked to other kinds of objects which are told apart by their PID prefix
+        return {container.id: set(linked.id for linked in container.objects or []
+                                  if linked.pid and linked.pid.startswith('TC-'))
+                for container in containers or []}
+
+    def _try_link_requirement_to_testcases(self, requirement_id, test_case_ids):
+        """Links a requirement to a set of test cases without raising
+
+        Args:
+            requirement_id (int): the qTest requirement id
+            test_case_ids (list): the qTest test case ids
+
+        Returns:
+            str: the reason linking failed or None
+        """
+
+        try:
+            self._link_requirement_to_testcases(requirement_id, test_case_ids)
+        except RuntimeError as e:
+            return "Requirement ID: {}\n{}".format(requirement_id, str(e))
 
     def _link_requirement_to_testcases(self, requirement_id, test_case_ids):
-        """Links a test_case to a set of requirements in qTest
+        """Links a requirement to a set of test cases in qTest
 
         Args:
-            requirement_id (int): the qTest test case id
-            test_case_ids (list): the qTest requirement ids
+            requirement_id (int): the qTest requirement id
+            test_case_ids (list): the qTest test case ids
 
         Raises:
             RuntimeError: The qTest API reported an error!
         """
         try:
-            self._object_link_api.link_artifacts(self._mediator.qtest_project_id, 'requirements',
-                                                 'test-cases', test_case_ids, requirement_id)
+            with self._mediator.profiler.span('qtest.link'):
+                self._object_link_api.link_artifacts(self._mediator.qtest_project_id, 'requirements',
+                                                     'test-cases', test_case_ids, requirement_id)
         except ApiException as e:
             raise RuntimeError("The qTest API reported an error!\n"
                                "Status code: {}\n"
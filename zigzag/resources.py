@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import pkgutil
+from io import BytesIO
+
+
+# ======================================================================================================================
+# Functions
+# ======================================================================================================================
+def open_resource(resource):
+    """Open a data file shipped with zigzag without paying the import cost of 'pkg_resources'
+
+    Args:
+        resource (str): The path of the data file relative to the zigzag package. (e.g. 'data/junit.xsd')
+
+    Returns:
+        file: a binary file-like object
+    """
+
+    try:
+        from importlib.resources import files
+    except ImportError:  # Python < 3.9
+        return BytesIO(pkgutil.get_data('zigzag', resource))
+
+    return files('zigzag').joinpath(resource).open('rb')
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================================
+# Imports
+# ======================================================================================================================
+from __future__ import absolute_import
+import re
+import json
+import requests
+from zigzag.zigzag_test_log import ZigZagTestLogError
+
+
+class SearchFacade(object):
+
+    _PAGE_SIZE = 100
+    _QUERY_BATCH_SIZE = 50  # the number of terms OR'd together in a single search query
+    _EXACT_JIRA_RGX = re.compile(r'([a-zA-Z]+-\d+)')
+
+    def __init__(self, mediator):
+        """A facade to resolve qTest object ids in bulk for every test log in a run
+
+        Args:
+            mediator (ZigZag): the mediator that stores shared data
+        """
+
+        self._mediator = mediator
+
+    def lookup_testcase_ids(self, test_logs=None):
+        """Search for the testcase ids of every test log by automation content and store them on the test logs
+
+        Test logs that do not have a testcase in qTest yet will have a 'qtest_testcase_id' of None.
+        Testcase ids found in the persistent cache of the mediator are not searched for.
+
+        Args:
+            test_logs (list(_ZigZagTestLog)): the test logs to resolve (Every test log of the mediator if None)
+
+        Returns:
+            dict: a map of automation content to qTest testcase id
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        logs_by_automation_content = {}
+        for log in self._mediator.test_logs if test_logs is None else test_logs:
+            try:
+                logs_by_automation_content.setdefault(log.automation_content, []).append(log)
+            except ZigZagTestLogError:
+                pass  # if we cant find automation content this is a bad record
+
+        # only search for the automation content that is not in the persistent cache
+        project_id = str(self._mediator.qtest_project_id)
+        cache = self._mediator.persistent_cache
+        cached = cache.get_many('test-cases', [(project_id, automation_content)
+                                               for automation_content in logs_by_automation_content])
+        testcase_ids = {automation_content: testcase_id for (_, automation_content), testcase_id in cached.items()}
+
+        found = {}
+        automation_contents = [automation_content for automation_content in logs_by_automation_content
+                               if automation_content not in testcase_ids]
+        queries = [' or '.join("'Automation Content' = '{}'".format(automation_content)
+                               for automation_content in automation_contents[i:i + self._QUERY_BATCH_SIZE])
+                   for i in range(0, len(automation_contents), self._QUERY_BATCH_SIZE)]
+        for items in self._search_many('test-cases', ['id', 'properties'], queries):
+            for item in items:
+                automation_content = self._get_property_value(item, 'Automation Content')
+                if automation_content in logs_by_automation_content and automation_content not in found:
+                    found[automation_content] = item['id']
+
+        # test cases that have not been created yet are not cached so they are searched for again next time
+        cache.set_many('test-cases', {(project_id, automation_content): testcase_id
+                                      for automation_content, testcase_id in found.items()})
+        testcase_ids.update(found)
+
+        for automation_content, logs in logs_by_automation_content.items():
+            for log in logs:
+                log.qtest_testcase_id = testcase_ids.get(automation_content)
+
+        return testcase_ids
+
+    def lookup_requirements(self, test_logs=None):
+        """Search for the requirements of every unique Jira id across all test logs and store them on the test logs
+
+        The Jira id is stored on a requirements name ex: 'PRO-18404 Zach's requirement'. Only requirements whose name
+        starts with exactly the Jira id are associated with it.
+        Jira ids found in the persistent cache of the mediator are not searched for, including the ones that had no
+        requirement in qTest a short time ago.
+
+        Args:
+            test_logs (list(_ZigZagTestLog)): the test logs to resolve (Every test log of the mediator if None)
+
+        Returns:
+            dict: a map of Jira id to a list of qTest requirement ids
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        test_logs = self._mediator.test_logs if test_logs is None else test_logs
+        jira_ids = sorted(set(jira_id for log in test_logs for jira_id in log.jira_issues))
+
+        # only search for the Jira ids that are not in the persistent cache
+        project_id = str(self._mediator.qtest_project_id)
+        cache = self._mediator.persistent_cache
+        cached = cache.get_many('requirements', [(project_id, jira_id) for jira_id in jira_ids])
+        requirements = {jira_id: requirement_ids for (_, jira_id), requirement_ids in cached.items() if requirement_ids}
+
+        found = {}
+        jira_ids = [jira_id for jira_id in jira_ids if (project_id, jira_id) not in cached]
+        batches = [jira_ids[i:i + self._QUERY_BATCH_SIZE] for i in range(0, len(jira_ids), self._QUERY_BATCH_SIZE)]
+        queries = [' or '.join("'name' ~ '{}'".format(jira_id) for jira_id in batch) for batch in batches]
+        for batch, items in zip(batches, self._search_many('requirements', ['id', 'name'], queries)):
+            for item in items:
+                match = self._EXACT_JIRA_RGX.match(item['name'])
+                if match and match.group(1) in batch:
+                    found.setdefault(match.group(1), []).append(item['id'])
+
+        # Jira ids without a requirement are cached for a short time because the requirement may be imported soon
+        cache.set_many('requirements', {(project_id, jira_id): found[jira_id] for jira_id in jira_ids
+                                        if jira_id in found})
+        cache.set_many('requirements', {(project_id, jira_id): [] for jira_id in jira_ids if jira_id not in found},
+                       cache.negative_ttl)
+        requirements.update(found)
+
+        for log in test_logs:
+            log.qtest_requirements = [requirement_id
+                                      for jira_id in log.jira_issues
+                                      for requirement_id in requirements.get(jira_id, [])]
+
+        return requirements
+
+    def search(self, object_type, fields, query):
+        """Search the qTest project and yield every matching item, one page at a time
+
+        Using the 'requests' library gets us around the bugs in the Swagger client
+        The request goes through the pooled qTest session of the mediator
+
+        Args:
+            object_type (str): the qTest object type to search for
+            fields (list(str)): the fields to return for each item
+            query (str): the qTest query
+
+        Returns:
+            generator(dict): the items that matched the query
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        headers = {'Authorization': self._mediator.qtest_api_token,
+                   'Content-Type': 'application/json'}
+        body = {
+            "object_type": object_type,
+            "fields": fields,
+            "query": query
+        }
+
+        page = 1
+        while True:
+            endpoint = self._mediator.qtest_session.url("/api/v3/projects/{}/search?pageSize={}&page={}".format(
+                self._mediator.qtest_project_id, self._PAGE_SIZE, page
+            ))
+            try:
+                with self._mediator.profiler.span('qtest.search'):
+                    r = self._mediator.qtest_session.post(endpoint, data=json.dumps(body), headers=headers)
+                r.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                if e.response is None:  # connection errors, timeouts and exhausted retries have no response
+                    raise RuntimeError("Failed to reach the qTest API!\n{}".format(str(e)))
+                raise RuntimeError("The qTest API reported an error!\n"
+                                   "Status code: {}\n"
+                                   "Reason: {}\n".format(e.response.status_code, e.response.reason))
+            parsed = json.loads(r.text)
+
+            for item in parsed['items']:
+                yield item
+
+            if not parsed['items'] or page * self._PAGE_SIZE >= parsed['total']:
+                break
+            page += 1
+
+    def _search_many(self, object_type, fields, queries):
+        """Run independent searches concurrently with the qTest engine of the mediator
+
+        Args:
+            object_type (str): the qTest object type to search for
+            fields (list(str)): the fields to return for each item
+            queries (list(str)): the qTest queries
+
+        Returns:
+            list(list(dict)): the items that matched each query in the order of the queries
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        return self._mediator.qtest_engine.map(lambda query: list(self.search(object_type, fields, query)), queries)
+
+    @staticmethod
+    def _get_property_value(item, field_name):
+        """Gets the value of a field from the properties of a qTest search result item
+
+        Args:
+            item (dict): a qTest search result item
+            field_name (str): the name of the field
+
+        Returns:
+            str: the value of the field
+            None: the item does not have the field
+        """
+
+        for prop in item.get('properties', []):
+            if prop.get('field_name') == field_name:
+                return prop.get('field_value')
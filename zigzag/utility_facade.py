@@ -21,6 +21,7 @@ class UtilityFacade(object):
 
         self._mediator = mediator
         self._field_api = swagger_client.FieldApi()
+        self._field_maps = {}  # (project_id, object_type): dict(label: FieldResource)
 
         self._testcase_group_rgx = re.compile(r'tests\.(test_[\w-]+)\.?(Test\w+)?$')
 
@@ -35,6 +36,37 @@ class UtilityFacade(object):
 
         return self._testcase_group_rgx
 
+    def get_field_map(self, object_type):
+        """Gets the fields of an object type indexed by label
+        The fields are only fetched from qTest once per project and object type.
+
+        Args:
+            object_type (str): The object type to get the fields for
+
+        Returns:
+            dict(str: swagger_client.FieldResource): the fields indexed by label
+
+        Raises:
+            RuntimeError: The qTest API reported an error!
+        """
+
+        key = (self._mediator.qtest_project_id, object_type)
+        if key not in self._field_maps:
+            try:
+                with self._mediator.profiler.span('qtest.fields'):
+                    fields = self._field_api.get_fields(*key)
+            except ApiException as e:
+                raise RuntimeError("The qTest API reported an error!\n"
+                                   "Status code: {}\n"
+                                   "Reason: {}\n"
+                                   "Message: {}".format(e.status, e.reason, e.body))
+            field_map = {}
+            for field in fields:
+                field_map.setdefault(field.label, field)  # the first field with a label wins
+            self._field_maps[key] = field_map
+
+        return self._field_maps[key]
+
     def find_custom_field_id_by_label(self, field_name, object_type):
         """Find a custom field id by its label
 
@@ -49,12 +81,6 @@ class UtilityFacade(object):
             RuntimeError: The qTest API reported an error!
         """
 
-        try:
-            for field in self._field_api.get_fields(self._mediator.qtest_project_id, object_type):
-                if field.label == field_name:
-                    return field.id
-        except ApiException as e:
-            raise RuntimeError("The qTest API reported an error!\n"
-                               "Status code: {}\n"
-                               "Reason: {}\n"
-                               "Message: {}".format(e.status, e.reason, e.body))
+        field = self.get_field_map(object_type).get(field_name)
+        if field is not None:
+            return field.id
@@ -5,14 +5,17 @@
 # ======================================================================================================================
 from __future__ import absolute_import
 import os
-import pkg_resources
+import threading
 from lxml import etree
+from zigzag.resources import open_resource
 from zigzag.zigzag_test_log import ZigZagTestLogs
 
 
 class XmlParsingFacade(object):
 
     _MAX_FILE_SIZE = 52428800
+    _xmlschema = None  # compiled once per process & shared by every instance
+    _xmlschema_lock = threading.Lock()
 
     def __init__(self, mediator):
         """A facade to parse xml
@@ -31,15 +34,22 @@ class XmlParsingFacade(object):
         sets the property 'build_number' on the mediator
         """
 
-        self._read(file_path)
-        self._validate()
+        profiler = self._mediator.profiler
+        if self._mediator.stream:
+            # reading and validating happen while the test logs are created one 'testcase' element at a time
+            with profiler.span('parse.test_logs'):
+                # new test logs attach themselves to the mediator
+                ZigZagTestLogs(self._mediator, self._iterparse_testcases(file_path))
+        else:
+            with profiler.span('parse.read'):
+                self._read(file_path)
+            with profiler.span('parse.validate'):
+                self._validate()
+            with profiler.span('parse.test_logs'):
+                ZigZagTestLogs(self._mediator)  # new test logs attach themselves to the mediator
+
         self._mediator.testsuite_props = {p.attrib['name']: p.attrib['value']
                                           for p in self._mediator.junit_xml.findall('./properties/property')}
-        self._mediator.serialized_junit_xml = etree.tostring(self._mediator.junit_xml,
-                                                             encoding='UTF-8',
-                                                             xml_declaration=True)
-
-        ZigZagTestLogs(self._mediator)  # new test logs attach themselves to the mediator
 
     def _read(self, file_path):
         """Read the input file contents
@@ -52,10 +62,11 @@ class XmlParsingFacade(object):
         """
 
         try:
+            if os.path.getsize(file_path) > self._MAX_FILE_SIZE:
+                raise RuntimeError("Input file '{}' is larger than allowed max file size! "
+                                   "Use streaming mode for large files.".format(file_path))
             junit_xml_doc = etree.parse(file_path)
             junit_xml = junit_xml_doc.getroot()
-            if os.path.getsize(file_path) > self._MAX_FILE_SIZE:
-                raise RuntimeError("Input file '{}' is larger than allowed max file size!".format(file_path))
         except (IOError, OSError):
             raise RuntimeError("Invalid path '{}' for JUnitXML results file!".format(file_path))
         except etree.ParseError:
@@ -65,6 +76,50 @@ class XmlParsingFacade(object):
         self._mediator.serialized_junit_xml = etree.tostring(junit_xml, encoding='UTF-8', xml_declaration=True)
         self._mediator.junit_xml_doc = junit_xml_doc
 
+    def _iterparse_testcases(self, file_path):
+        """Incrementally read and validate the input file contents one 'testcase' element at a time
+        Every finished 'testcase' element is detached from the document before it is handed out so the parsed tree
+        never holds more than the testcase currently being read. The test logs only copy the values they need from a
+        testcase element so it is freed as soon as its test log was created.
+        sets the property 'junit_xml' & 'junit_xml_doc' on the mediator
+
+        Args:
+            file_path (str): The path to the JUnitXML file to stream.
+
+        Yields:
+            ElementTree: A XML element representing a JUnit style testcase result.
+
+        Raises:
+            RuntimeError: invalid path.
+            RuntimeError: The file does not contain valid XML!
+            RuntimeError: The file does not conform to schema!
+            RuntimeError: The file does not have JUnitXML root element!
+        """
+
+        root_element = 'testsuite'
+        xmlschema = self.get_xmlschema()
+
+        try:
+            for event, element in etree.iterparse(file_path, events=('start', 'end'), schema=xmlschema):
+                parent = element.getparent()
+                if event == 'start':
+                    if parent is None:
+                        if element.tag != root_element:
+                            raise RuntimeError("The file '{}' does not have JUnitXML '{}' root element!".format(
+                                file_path, root_element))
+                        self._mediator.junit_xml = element
+                        self._mediator.junit_xml_doc = element.getroottree()
+                elif element.tag == 'testcase':
+                    parent.remove(element)
+                    yield element
+        except (IOError, OSError):
+            raise RuntimeError("Invalid path '{}' for JUnitXML results file!".format(file_path))
+        except etree.XMLSyntaxError as e:
+            if any(error.domain == etree.ErrorDomains.SCHEMASV for error in e.error_log):
+                raise RuntimeError("The file '{}' does not conform to schema!"
+                                   "\n\nSchema Violation:\n{}".format(file_path, str(e)))
+            raise RuntimeError("The file '{}' does not contain valid XML!".format(file_path))
+
     def _validate(self):
         """Validate the input file contents.
 
@@ -74,11 +129,10 @@ class XmlParsingFacade(object):
         """
 
         root_element = 'testsuite'
-        junit_xsd = self._get_xsd()
         file_path = self._mediator.junit_xml_file_path
 
         try:
-            xmlschema = etree.XMLSchema(etree.parse(junit_xsd))
+            xmlschema = self.get_xmlschema()
             xmlschema.assertValid(self._mediator.junit_xml_doc)
         except etree.DocumentInvalid as e:
             debug = "\n\n---DEBUG XML PRETTY PRINT---\n\n"
@@ -95,6 +149,43 @@ class XmlParsingFacade(object):
             raise RuntimeError("The file '{}' does not have JUnitXML '{}' root element!".format(
                 file_path, root_element))
 
+    @classmethod
+    def get_xmlschema(cls):
+        """Gets the compiled XML schema used to validate JUnitXML results.
+        The XSD is compiled lazily on first use and then shared by every ZigZag instance in the process.
+
+        Returns:
+            etree.XMLSchema: The compiled XML schema.
+        """
+
+        if cls._xmlschema is None:
+            with cls._xmlschema_lock:
+                if cls._xmlschema is None:
+                    cls._xmlschema = etree.XMLSchema(etree.parse(cls._get_xsd()))
+        return cls._xmlschema
+
+    @classmethod
+    def set_xsd(cls, xsd):
+        """Pin or replace the XML schema used to validate JUnitXML results for every ZigZag instance in the process.
+        The XSD is compiled once here so later parses do not pay for compilation.
+
+        Args:
+            xsd (str|file|etree.XMLSchema): A path or file like object for a XSD, an already compiled XML schema or
+                None to go back to the XSD shipped with zigzag.
+
+        Raises:
+            RuntimeError: The XSD could not be compiled.
+        """
+
+        if xsd is not None and not isinstance(xsd, etree.XMLSchema):
+            try:
+                xsd = etree.XMLSchema(etree.parse(xsd))
+            except (IOError, OSError, etree.ParseError, etree.XMLSchemaParseError) as e:
+                raise RuntimeError("Failed to compile the XSD '{}'!: {}".format(xsd, str(e)))
+
+        with cls._xmlschema_lock:
+            cls._xmlschema = xsd
+
     @staticmethod
     def _get_xsd():
         """Retrieve a XSD for validating JUnitXML results produced by this plug-in.
@@ -102,4 +193,4 @@ class XmlParsingFacade(object):
         Returns:
             io.BytesIO: A file like stream object.
         """
-        return pkg_resources.resource_stream('zigzag', 'data/junit.xsd')
+        return open_resource('data/junit.xsd')
@@ -4,25 +4,45 @@
 # Imports
 # ======================================================================================================================
 from __future__ import absolute_import
+import os
+import json
 import swagger_client
+from base64 import b64encode
 from datetime import datetime
 from swagger_client.rest import ApiException
 from zigzag.utility_facade import UtilityFacade
 from zigzag.xml_parsing_facade import XmlParsingFacade
 from zigzag.requirements_link_facade import RequirementsLinkFacade
+from zigzag.search_facade import SearchFacade
+from zigzag.queue_job_facade import QueueJobFacade
+from zigzag.qtest_session import QTestSession
+from zigzag.qtest_engine import QTestEngine
+from zigzag.persistent_cache import PersistentCache
+from zigzag.profiler import Profiler
 from zigzag.zigzag_test_log import ZigZagTestLogError
 from zigzag.module_hierarchy_facade import ModuleHierarchyFacade
-from zigzag.zigzag_config import ZigZagConfig
-from zigzag.zigzag_config import ZigZagConfigError
+from zigzag.zigzag_error import ZigZagConfigError
 
 
 class ZigZag(object):
 
+    # a larger streamed JUnitXML file is not attached because its encoded copies would undo streaming
+    _MAX_STREAMED_ATTACHMENT_SIZE = 10485760
+
     def __init__(self,
                  junit_xml_file_path,
                  config_file,
                  qtest_api_token,
-                 pprint_on_fail=False):
+                 pprint_on_fail=False,
+                 stream=False,
+                 pool_size=10,
+                 cache_path=None,
+                 cache_ttl=604800,
+                 cache_size=100000,
+                 cache_negative_ttl=3600,
+                 max_concurrency=4,
+                 rate_limit=None,
+                 qtest_url=None):
         """ Create a ZigZag facade class object. The ZigZag class uses the Facade pattern to call out to
         subsystems and sub Facades.
 
@@ -31,12 +51,26 @@ class ZigZag(object):
             config_file (str): A file path to a JSON config file
             qtest_api_token (str): Token to use for authorization to the qTest API.
             pprint_on_fail (bool): A flag for enabling debug pretty print on schema failure.
+            stream (bool): A flag for parsing the JUnitXML file incrementally which lifts the max file size limit.
+            pool_size (int): The maximum number of connections to keep open to the qTest API.
+            cache_path (str): The path to a cache of qTest lookups shared between runs. (Disabled if None)
+            cache_ttl (float): The number of seconds a cached qTest lookup stays valid.
+            cache_size (int): The maximum number of cached qTest lookups.
+            cache_negative_ttl (float): The number of seconds a cached qTest lookup that found nothing stays valid.
+            max_concurrency (int): The maximum number of requests sent to the qTest API at the same time.
+            rate_limit (float): The maximum number of requests per second sent to the qTest API. (Unlimited if None)
+            qtest_url (str): The URL of the qTest instance. (Defaults to 'https://apitryout.qtestnet.com')
         """
 
         swagger_client.configuration.api_key['Authorization'] = qtest_api_token
+        self._profiler = Profiler()
+        self._qtest_session = QTestSession(pool_size, rate_limit=rate_limit, base_url=qtest_url)
+        self._qtest_engine = QTestEngine(max_concurrency)
+        self._persistent_cache = PersistentCache(cache_path, cache_ttl, cache_size, cache_negative_ttl)
         self._qtest_api_token = qtest_api_token
         self._junit_xml_file_path = junit_xml_file_path
         self._pprint_on_fail = pprint_on_fail
+        self._stream = stream
         self._config_file = config_file
         self._test_logs = []
 
@@ -51,11 +85,15 @@ class ZigZag(object):
         self._qtest_test_cycle_pid = None
         self._qtest_project_id = None
         self._config_dict = None
+        self._junit_xml_attachment_mode = None
+        self._qtest_junit_xml_attachment = None
 
         self._utility_facade = UtilityFacade(self)
         self._parsing_facade = XmlParsingFacade(self)
         self._requirement_link_facade = RequirementsLinkFacade(self)
         self._module_hierarchy_facade = ModuleHierarchyFacade(self)
+        self._search_facade = SearchFacade(self)
+        self._queue_job_facade = QueueJobFacade(self)
 
     #  properties with only getters
     @property
@@ -78,6 +116,66 @@ class ZigZag(object):
 
         return self._module_hierarchy_facade
 
+    @property
+    def search_facade(self):
+        """Gets the attached search_facade
+
+        Returns:
+            SearchFacade
+        """
+
+        return self._search_facade
+
+    @property
+    def queue_job_facade(self):
+        """Gets the attached queue_job_facade
+
+        Returns:
+            QueueJobFacade
+        """
+
+        return self._queue_job_facade
+
+    @property
+    def qtest_session(self):
+        """Gets the pooled session that every request to the qTest API goes through
+
+        Returns:
+            QTestSession
+        """
+
+        return self._qtest_session
+
+    @property
+    def profiler(self):
+        """Gets the profiler that measures the phases of a run
+
+        Returns:
+            Profiler
+        """
+
+        return self._profiler
+
+    @property
+    def qtest_engine(self):
+        """Gets the engine that sends independent requests to the qTest API concurrently
+
+        Returns:
+            QTestEngine
+        """
+
+        return self._qtest_engine
+
+    @property
+    def persistent_cache(self):
+        """Gets the cache of qTest lookups that is shared between runs
+
+        Returns:
+            PersistentCache
+        """
+
+        return self._persistent_cache
+
     @property
     def qtest_api_token(self):
         """Gets the qTest API token
@@ -105,6 +203,7 @@ class ZigZag(object):
         """
 
         if self._config_dict is None:
+            from zigzag.zigzag_config import ZigZagConfig  # jinja2 and jsonschema are only needed once configured
             self._config_dict = ZigZagConfig(self._config_file, self.testsuite_props)
         return self._config_dict
 
@@ -155,6 +254,50 @@ class ZigZag(object):
         """
         return self._pprint_on_fail
 
+    @property
+    def stream(self):
+        """Get the stream value
+
+        Returns:
+            bool: If zigzag should parse the JUnitXML file incrementally
+        """
+        return self._stream
+
+    @property
+    def junit_xml_attachment_mode(self):
+        """Gets where the JUnitXML file is attached in qTest
+
+        Returns:
+            str: 'run' to attach the file once per submission or 'log' to attach it to every test log
+        """
+        if self._junit_xml_attachment_mode is None:
+            try:
+                self._junit_xml_attachment_mode = self.config_dict.get_config('junit_xml_attachment')
+            except ZigZagConfigError:
+                self._junit_xml_attachment_mode = 'run'  # this is not a required property
+        return self._junit_xml_attachment_mode
+
+    @property
+    def qtest_junit_xml_attachment(self):
+        """Gets the qTest attachment for the JUnitXML file
+        The file is only encoded once no matter how many test logs it is attached to.
+
+        Returns:
+            swagger_client.AttachmentResource
+            None: the file is streamed and larger than '_MAX_STREAMED_ATTACHMENT_SIZE' so it is not attached
+        """
+        if self._qtest_junit_xml_attachment is None:
+            if self._stream and os.path.getsize(self._junit_xml_file_path) > self._MAX_STREAMED_ATTACHMENT_SIZE:
+                return None
+            attachment_suffix = datetime.utcnow().strftime('%Y-%m-%dT%H-%M')
+            encoded_xml = b64encode(self.serialized_junit_xml).decode('UTF-8')
+            self._qtest_junit_xml_attachment = \
+                swagger_client.AttachmentResource(name="junit_{}.xml".format(attachment_suffix),
+                                                  content_type='application/xml',
+                                                  data=encoded_xml,
+                                                  author={})
+        return self._qtest_junit_xml_attachment
+
     #  properties with setters and getters
 
     @property
@@ -232,6 +375,10 @@ class ZigZag(object):
         Returns:
             str: The serialized junit xml
         """
+        if self._serialized_junit_xml is None and self._stream:
+            # a streamed document is never held in memory so read it from disk only when it is needed
+            with open(self._junit_xml_file_path, 'rb') as f:
+                self._serialized_junit_xml = f.read()
         return self._serialized_junit_xml
 
     @serialized_junit_xml.setter
@@ -263,24 +410,114 @@ class ZigZag(object):
             AutomationRequest: A qTest swagger model for an automation request.
         """
 
+        with self._profiler.span('generate'):
+            return self._build_auto_request(self._generate_qtest_test_logs())
+
+    def _generate_auto_requests(self, batch_size, max_batch_bytes):
+        """Construct qTest automation requests for a JUnitXML test run result split into batches. A batch is closed
+        once it holds 'batch_size' test logs or adding the next test log would take its serialized size over
+        'max_batch_bytes'. (A single test log larger than 'max_batch_bytes' gets a batch of its own)
+
+        Args:
+            batch_size (int): The maximum number of test logs in a batch.
+            max_batch_bytes (int): The maximum size in bytes of the serialized test logs in a batch.
+
+        Returns:
+            list(AutomationRequest): A qTest swagger model for each batch.
+        """
+
+        with self._profiler.span('generate'):
+            qtest_test_logs = self._generate_qtest_test_logs()
+
+            api_client = self._qtest_session.api_client
+            batches = []
+            batch = []
+            batch_bytes = 0
+            with self._profiler.span('generate.serialize'):
+                for qtest_test_log in qtest_test_logs:
+                    log_bytes = len(json.dumps(api_client.sanitize_for_serialization(qtest_test_log)))
+                    if batch and (len(batch) >= batch_size or batch_bytes + log_bytes > max_batch_bytes):
+                        batches.append(batch)
+                        batch = []
+                        batch_bytes = 0
+                    batch.append(qtest_test_log)
+                    batch_bytes += log_bytes
+                if batch or not batches:
+                    batches.append(batch)
+
+            execution_date = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')   # UTC timezone 'Zulu'
+            return [self._build_auto_request(b, execution_date) for b in batches]
+
+    def _generate_qtest_test_logs(self):
+        """Construct the qTest swagger models for every test log that can be uploaded.
+
+        Returns:
+            list(swagger_client.AutomationTestLogResource): The qTest swagger models for the test logs.
+        """
+
+        # the test cycle and the test run fields do not depend on each other so they are looked up at the same time
+        with self._profiler.span('generate.lookups'):
+            self._qtest_engine.map(lambda lookup: lookup(), [lambda: self.qtest_test_cycle_pid,
+                                                             lambda: self._utility_facade.get_field_map('test-runs')])
+
+        qtest_test_logs = []
+        with self._profiler.span('generate.test_logs'):
+            for log in self.test_logs:
+                try:
+                    qtest_test_logs.append(log.qtest_test_log)
+                except ZigZagTestLogError:
+                    pass  # if we cant find automation content this is a bad record
+            if self.junit_xml_attachment_mode == 'run' and qtest_test_logs:
+                self._attach_junit_xml_to_run(qtest_test_logs)
+
+        return qtest_test_logs
+
+    def _build_auto_request(self, qtest_test_logs, execution_date=None):
+        """Construct a qTest automation request for a list of test logs.
+
+        Args:
+            qtest_test_logs (list(swagger_client.AutomationTestLogResource)): The test logs of the request.
+            execution_date (str): The execution date of the request. (Defaults to now)
+
+        Returns:
+            AutomationRequest: A qTest swagger model for an automation request.
+        """
+
         auto_req = swagger_client.AutomationRequest()
-        auto_req.test_logs = []
-        for log in self.test_logs:
-            try:
-                auto_req.test_logs.append(log.qtest_test_log)
-            except ZigZagTestLogError:
-                pass  # if we cant find automation content this is a bad record
+        auto_req.test_logs = qtest_test_logs
         auto_req.test_cycle = self.qtest_test_cycle_pid
-        auto_req.execution_date = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')   # UTC timezone 'Zulu'
+        auto_req.execution_date = execution_date or datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')   # UTC 'Zulu'
 
         return auto_req
 
-    def upload_test_results(self):
-        """Construct a 'AutomationRequest' qTest resource and upload the test results to the desired project in
-        qTest Manager.
+    def _attach_junit_xml_to_run(self, qtest_test_logs):
+        """Attach the JUnitXML file to the first test log of a run and reference it from every test log in the run.
+        The reference is added to the note a test log already has.
+
+        Args:
+            qtest_test_logs (list(swagger_client.AutomationTestLogResource)): The test logs of the run.
+        """
+
+        junit_xml_attachment = self.qtest_junit_xml_attachment
+        if junit_xml_attachment is None:
+            return
+        qtest_test_logs[0].attachments.insert(0, junit_xml_attachment)
+        note = "The JUnitXML results for this run are attached to the '{}' test log as '{}'".format(
+            qtest_test_logs[0].name, junit_xml_attachment.name)
+        for log in qtest_test_logs:
+            log.note = "{}\n{}".format(log.note, note) if log.note else note
+
+    def upload_test_results(self, batch_size=1000, max_batch_bytes=20971520, max_workers=4):
+        """Construct 'AutomationRequest' qTest resources and upload the test results to the desired project in
+        qTest Manager. The test logs are split into batches which are submitted concurrently.
+
+        Args:
+            batch_size (int): The maximum number of test logs submitted in a single request.
+            max_batch_bytes (int): The maximum size in bytes of the test logs submitted in a single request.
+            max_workers (int): The maximum number of requests submitted at the same time.
 
         Returns:
-            int: The queue processing ID for the job.
+            list(int): The queue processing IDs for the jobs. (One per batch)
 
         Raises:
             RuntimeError: Failed to upload test results to qTest Manager.
@@ -288,13 +525,113 @@ class ZigZag(object):
 
         project_id = self.config_dict.get_config('project_id')
         self.qtest_project_id = project_id
-        auto_api = swagger_client.TestlogApi()
-        auto_req = self._generate_auto_request()
+        auto_reqs = self._generate_auto_requests(batch_size, max_batch_bytes)
+
+        with self._profiler.span('upload'):
+            results = self._qtest_engine.map(self._try_submit_auto_request, auto_reqs, max_workers)
+
+        job_ids = [job_id for job_id, error in results if error is None]
+        errors = [error for job_id, error in results if error is not None]
+        if errors:
+            raise RuntimeError("Failed to upload {} of {} batches!\n{}\nSubmitted Job IDs: {}".format(
+                len(errors), len(auto_reqs), '\n'.join(errors), ', '.join(str(job_id) for job_id in job_ids)))
+
+        return job_ids
+
+    def wait_for_jobs(self, job_ids, timeout=600, max_workers=4):
+        """Wait for the queue jobs returned by 'upload_test_results' to finish processing in qTest Manager.
+
+        Args:
+            job_ids (list(int)): The queue processing IDs for the jobs.
+            timeout (float): The number of seconds to wait for every job to finish.
+            max_workers (int): The maximum number of jobs polled at the same time.
+
+        Returns:
+            dict(int: str): The final state of each job.
+
+        Raises:
+            RuntimeError: A job failed.
+            QueueJobTimeoutError: No job failed but some did not finish before the deadline.
+        """
 
+        with self._profiler.span('wait'):
+            return self._queue_job_facade.wait(job_ids, timeout=timeout, max_workers=max_workers)
+
+    def link_requirements(self, job_ids, timeout=600, max_workers=4, incremental=True):
+        """Link the requirements (Jira tickets) of the test logs to their test cases once qTest Manager finished
+        processing the queue jobs that create the test cases.
+
+        The test cases of the jobs that reached success are linked even if other jobs failed or timed out. The test
+        cases of those jobs do not exist in qTest yet so they are not found and skipped.
+
+        Args:
+            job_ids (list(int)): The queue processing IDs for the jobs returned by 'upload_test_results'.
+            timeout (float): The number of seconds to wait for every job to finish.
+            max_workers (int): The maximum number of jobs polled at the same time.
+            incremental (bool): Only send the links that do not exist in qTest yet.
+
+        Returns:
+            dict(int: str): The final state of each job.
+
+        Raises:
+            RuntimeError: A job failed or the requirements failed to link.
+            QueueJobTimeoutError: No job failed but some did not finish before the deadline. (The requirements of the
+                jobs that finished were linked)
+        """
+
+        wait_error = None
+        try:
+            states = self.wait_for_jobs(job_ids, timeout, max_workers)
+        except RuntimeError as e:
+            wait_error = e
+
+        try:
+            with self._profiler.span('link'):
+                self._requirement_link_facade.link(incremental)
+        except RuntimeError as e:
+            if wait_error is None:
+                raise
+            raise RuntimeError("{}\n{}".format(str(wait_error), str(e)))
+
+        if wait_error is not None:
+            raise wait_error
+
+        return states
+
+    def _try_submit_auto_request(self, auto_req):
+        """Submit a single automation request without raising so that one failed batch does not stop the others.
+
+        Args:
+            auto_req (AutomationRequest): A qTest swagger model for an automation request.
+
+        Returns:
+            tuple(int, str): The queue processing ID for the job and None or None and the reason the submit failed.
+        """
+
+        try:
+            return self._submit_auto_request(auto_req), None
+        except RuntimeError as e:
+            return None, str(e)
+
+    def _submit_auto_request(self, auto_req):
+        """Submit a single automation request to qTest Manager.
+
+        Args:
+            auto_req (AutomationRequest): A qTest swagger model for an automation request.
+
+        Returns:
+            int: The queue processing ID for the job.
+
+        Raises:
+            RuntimeError: Failed to upload test results to qTest Manager.
+        """
+
+        auto_api = swagger_client.TestlogApi()
         try:
-            response = auto_api.submit_automation_test_logs_0(project_id=self._qtest_project_id,
-                                                              body=auto_req,
-                                                              type='automation')
+            with self._profiler.span('qtest.submit'):
+                response = auto_api.submit_automation_test_logs_0(project_id=self._qtest_project_id,
+                                                                  body=auto_req,
+                                                                  type='automation')
         except ApiException as e:
             raise RuntimeError("The qTest API reported an error!\n"
                                "Status code: {}\n"
@@ -303,13 +640,10 @@ class ZigZag(object):
         if response.state == 'FAILED':
             raise RuntimeError("The qTest API failed to process the job!\nJob ID: {}".format(response.id))
 
-        # for now we will always try to link the cases
-        # this should move somewhere else in the future or be optional to this
-        self._requirement_link_facade.link()
-
         return int(response.id)
 
     def parse(self):
         """Parse the xml"""
 
-        self._parsing_facade.parse(self._junit_xml_file_path)  # this was moved from the init method
+        with self._profiler.span('parse'):
+            self._parsing_facade.parse(self._junit_xml_file_path)  # this was moved from the init method
@@ -5,13 +5,12 @@
 # ======================================================================================================================
 from __future__ import absolute_import
 from zigzag.zigzag_error import ZigZagConfigError
-from pkg_resources import resource_stream
+from zigzag.resources import open_resource
 from jsonschema import validate, ValidationError
 from six import string_types
 from json import loads
-from jinja2 import Template
+from jinja2 import Environment, meta, TemplateSyntaxError
 import time
-import copy
 
 
 class ZigZagConfig(object):
@@ -19,6 +18,8 @@ class ZigZagConfig(object):
     Will raise custom errors attempting to access keys that dont exist
     """
 
+    _TEST_LOG_VARIABLES = ('zz_testcase_class',)  # variables that are only available when evaluated with a test log
+
     def __init__(self, config_file_path, global_props):
         """Create a new ZigZagConfig
 
@@ -32,8 +33,8 @@ class ZigZagConfig(object):
             with open(config_file_path, 'r') as f:
                 self._config_dict = loads(f.read())
             self._global_props = global_props
-            schema = loads(resource_stream('zigzag',
-                                           'data/schema/zigzag-config.schema.json').read().decode())
+            with open_resource('data/schema/zigzag-config.schema.json') as schema_file:
+                schema = loads(schema_file.read().decode())
             validate(self._config_dict, schema)
 
         except (OSError, IOError) as e:
@@ -43,8 +44,19 @@ class ZigZagConfig(object):
         except ValidationError as e:
             raise ZigZagConfigError("Config file '{}' does not comply with schema: {}".format(config_file_path, str(e)))
 
+        self._templates = {}
+        self._template_variables = {}
+        self._rendered_values = {}
+        try:
+            self._compile_templates()
+        except TemplateSyntaxError as e:
+            message = "Config file '{}' contains an invalid template: {}".format(config_file_path, str(e))
+            raise ZigZagConfigError(message)
+
     def get_config(self, config_name, test_log=None):
         """Gets a config can be evaluated with optional test_log
+        Rendered configs are memoized by the test log specific variables they use. A config that only uses global
+        props is rendered once and a config that uses 'zz_testcase_class' is rendered once per test case class.
 
         Args:
             config_name (str): the name of the config to get
@@ -63,28 +75,21 @@ class ZigZagConfig(object):
         error_message = "The config setting '{}' was not found in the config file".format(config_name)
 
         try:
-            if test_log:
-                # add testcase specific info to the props
-                props = copy.copy(self._global_props)
-                props['zz_testcase_class'] = test_log.classname
-            else:
-                props = self._global_props
-
-            props['strftime'] = time.strftime
             pre_render_config_value = self._config_dict['zigzag'][config_name]
-            if isinstance(pre_render_config_value, string_types):
-                value = Template(self._config_dict['zigzag'][config_name]).render(props)
-            elif isinstance(pre_render_config_value, list):
-                # try to render each object
-                value = [Template(v).render(props) for v in pre_render_config_value]
-            elif any([isinstance(pre_render_config_value, None),
-                      isinstance(pre_render_config_value, int),
-                      isinstance(pre_render_config_value, float)]):
-                value = pre_render_config_value
-
         except KeyError:
             raise ZigZagConfigError(error_message)
 
+        if config_name in self._templates:
+            test_log_props = self._get_test_log_props(test_log)
+            key = (config_name, tuple(test_log_props.get(v) for v in self._template_variables[config_name]))
+            if key not in self._rendered_values:
+                self._rendered_values[key] = self._render(config_name, test_log_props)
+            value = self._rendered_values[key]
+            if isinstance(value, list):
+                value = list(value)  # callers should not be able to change the memoized value
+        else:
+            value = pre_render_config_value
+
         if not value:
             #  value is an empty object
             raise ZigZagConfigError(error_message)
@@ -93,3 +98,65 @@ class ZigZagConfig(object):
             raise ZigZagConfigError("The config {} contained an empty value".format(config_name))
 
         return value
+
+    def _compile_templates(self):
+        """Compile every config template once and record which test log specific variables each config uses
+
+        Raises:
+            TemplateSyntaxError
+        """
+
+        env = Environment()
+        for config_name, pre_render_config_value in self._config_dict['zigzag'].items():
+            if isinstance(pre_render_config_value, string_types):
+                sources = [pre_render_config_value]
+            elif isinstance(pre_render_config_value, list):
+                sources = pre_render_config_value
+            else:
+                continue
+
+            variables = set()
+            templates = []
+            for source in sources:
+                ast = env.parse(source)
+                variables.update(meta.find_undeclared_variables(ast))
+                templates.append(env.from_string(ast))
+
+            self._templates[config_name] = templates if isinstance(pre_render_config_value, list) else templates[0]
+            self._template_variables[config_name] = tuple(v for v in self._TEST_LOG_VARIABLES if v in variables)
+
+    def _get_test_log_props(self, test_log):
+        """Gets the test log specific variables that can be used in a config
+
+        Args:
+            test_log (ZigZagTestLog): an optional test log to evaluate special test specific variables
+
+        Returns:
+            dict
+        """
+
+        if test_log:
+            return {'zz_testcase_class': test_log.classname}
+        return {}
+
+    def _render(self, config_name, test_log_props):
+        """Render a compiled config template
+
+        Args:
+            config_name (str): the name of the config to render
+            test_log_props (dict): the test log specific variables
+
+        Returns:
+            str
+            list
+        """
+
+        props = dict(self._global_props)
+        props.update(test_log_props)
+        props['strftime'] = time.strftime
+
+        template = self._templates[config_name]
+        if isinstance(template, list):
+            # try to render each object
+            return [t.render(props) for t in template]
+        return template.render(props)
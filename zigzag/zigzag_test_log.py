@@ -5,13 +5,10 @@
 # ======================================================================================================================
 from __future__ import absolute_import
 import re
-import json
-import requests
 import swagger_client
 from base64 import b64encode
 from datetime import datetime
 from future.moves.collections import Sequence
-from zigzag.utility_facade import UtilityFacade
 from zigzag.link_generation_facade import LinkGenerationFacade
 
 SWEET_UNICORN_GIF = 'https://media.giphy.com/media/g6i1lEax9Pa24/giphy.gif'
@@ -20,6 +17,69 @@ SWEET_UNICORN_GIF = 'https://media.giphy.com/media/g6i1lEax9Pa24/giphy.gif'
 # ======================================================================================================================
 # Classes
 # ======================================================================================================================
+class _TestCase(object):
+
+    # the attributes & properties of the testcase element that a test log reads
+    _ATTRIBUTES = ('name', 'classname', 'file', 'line')
+    _PROPERTIES = ('start_time', 'end_time', 'test_id')
+    __slots__ = _ATTRIBUTES + _PROPERTIES + ('jira_issues', 'errors', 'failures', 'skipped', 'system_out', 'system_err')
+
+    def __init__(self, testcase_xml):
+        """Read the parts of a JUnit style testcase XML element that a test log uses.
+        The XML element is not referenced afterwards so a streamed document can free it as soon as it was read.
+
+        Args:
+            testcase_xml (ElementTree): A XML element representing a JUnit style testcase result.
+        """
+
+        for name in self._ATTRIBUTES:
+            setattr(self, name, testcase_xml.get(name))
+        for name in self._PROPERTIES:
+            setattr(self, name, None)
+        self.jira_issues = []
+        for prop in testcase_xml.iterfind('./properties/property'):
+            name = prop.get('name')
+            if name == 'jira':
+                self.jira_issues.append(prop.get('value'))
+            elif name in self._PROPERTIES and getattr(self, name) is None:  # the first one wins like 'find'
+                setattr(self, name, prop.get('value'))
+        self.errors = [error.text for error in testcase_xml.iterfind('error')]
+        self.failures = [failure.text for failure in testcase_xml.iterfind('failure')]
+        self.skipped = testcase_xml.find('skipped') is not None
+        self.system_out = self._text(testcase_xml.find('system-out'))
+        self.system_err = self._text(testcase_xml.find('system-err'))
+
+    def require(self, name):
+        """Get an attribute or property of the testcase element that must exist.
+
+        Args:
+            name (str): The name of the attribute or property.
+
+        Returns:
+            str: The value.
+
+        Raises:
+            KeyError: The testcase element does not have the attribute or property.
+        """
+
+        value = getattr(self, name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    @staticmethod
+    def _text(element):
+        """Get the text of an optional element.
+
+        Args:
+            element (ElementTree): A XML element or None if it is missing.
+
+        Returns:
+            str: The text of the element or an empty string if it is missing.
+        """
+        return element.text if element is not None else ''
+
+
 class _ZigZagTestLog(object):
 
     _TESTCASE_NAME_RGX = re.compile(r'(^[\w-]+)')
@@ -33,19 +93,22 @@ class _ZigZagTestLog(object):
         """Create a TestLog object.
 
         Args:
-            testcase_xml (ElementTree): A XML element representing a JUnit style testcase result.
+            testcase_xml (ElementTree): A XML element representing a JUnit style testcase result. (The XML is read
+                right away and not referenced afterwards)
             mediator (ZigZag): The mediator that stores shared data.
         """
 
         self._end_date = None
         self._start_date = None
 
-        self._testcase_xml = testcase_xml
+        self._testcase = _TestCase(testcase_xml) if testcase_xml is not None else None
         self._mediator = mediator
 
         # this is data that will be collected from qTest
         self._qtest_requirements = None  # lazy loaded & simple cache
+        self._qtest_requirements_resolved = False
         self._qtest_testcase_id = None
+        self._qtest_testcase_id_resolved = False
         self._test_execution_parameters = None
 
         self._stdout = None
@@ -64,7 +127,6 @@ class _ZigZagTestLog(object):
 
         self._jira_issues = None
         self._qtest_property_resource_list = None
-        self._qtest_attachment_list = None
         self._date_time_now = datetime.utcnow()  # use same time for all operations
 
     @property
@@ -76,7 +138,7 @@ class _ZigZagTestLog(object):
         """
         if self._name is None:
             try:
-                self._name = _ZigZagTestLog._TESTCASE_NAME_RGX.match(self._testcase_xml.attrib['name']).group(0)
+                self._name = _ZigZagTestLog._TESTCASE_NAME_RGX.match(self._testcase.require('name')).group(0)
             except AttributeError:
                 raise RuntimeError("Test case '{}' is missing the required property name!".format(self._name))
 
@@ -90,10 +152,20 @@ class _ZigZagTestLog(object):
             int: The qTest testcase id
             None: The testcase has not been created yet
         """
-        if self._qtest_testcase_id is None:
-            self._lookup_ids()
+        if self._qtest_testcase_id is None and not self._qtest_testcase_id_resolved:
+            self._mediator.search_facade.lookup_testcase_ids([self])
         return self._qtest_testcase_id
 
+    @qtest_testcase_id.setter
+    def qtest_testcase_id(self, value):
+        """Sets the testcase id that corresponds to this test log when it was resolved in bulk
+
+        Args:
+            value (int): The qTest testcase id or None if the testcase has not been created yet
+        """
+        self._qtest_testcase_id = value
+        self._qtest_testcase_id_resolved = True
+
     @property
     def test_execution_parameters(self):
         """ Gets the array of job config attributes
@@ -114,11 +186,7 @@ class _ZigZagTestLog(object):
             list[str]: A list of jira issue ids
         """
         if self._jira_issues is None:
-            try:
-                self._jira_issues = \
-                    [jira.get('value') for jira in self._testcase_xml.findall("./properties/property/[@name='jira']")]
-            except AttributeError:
-                raise RuntimeError("Test case '{}' is missing the required property!".format(self._name))
+            self._jira_issues = list(self._testcase.jira_issues)
 
         return self._jira_issues
 
@@ -129,10 +197,20 @@ class _ZigZagTestLog(object):
         Returns:
             list[int]: a list of associated qTest requirements object IDs
         """
-        if not self._qtest_requirements:
-            self._lookup_requirements()
+        if not self._qtest_requirements and not self._qtest_requirements_resolved:
+            self._mediator.search_facade.lookup_requirements([self])
         return self._qtest_requirements
 
+    @qtest_requirements.setter
+    def qtest_requirements(self, value):
+        """Sets the qTest requirements ids when they were resolved in bulk
+
+        Args:
+            value (list[int]): a list of associated qTest requirements object IDs
+        """
+        self._qtest_requirements = value
+        self._qtest_requirements_resolved = True
+
     @property
     def status(self):
         """Gets the status of this test log
@@ -146,7 +224,7 @@ class _ZigZagTestLog(object):
                 all_failures = self.failures + self.errors
                 if len(all_failures):
                     self._status = 'FAILED'
-                elif self._testcase_xml.find('skipped') is not None:
+                elif self._testcase.skipped:
                     self._status = 'SKIPPED'
             except AttributeError:
                 self._status = ''
@@ -162,10 +240,7 @@ class _ZigZagTestLog(object):
         """
 
         if self._stderr is None:
-            try:
-                self._stderr = self._testcase_xml.find('system-err').text
-            except AttributeError:
-                self._stderr = ''
+            self._stderr = self._testcase.system_err
 
         return self._stderr
 
@@ -178,10 +253,7 @@ class _ZigZagTestLog(object):
         """
 
         if self._stdout is None:
-            try:
-                self._stdout = self._testcase_xml.find('system-out').text
-            except AttributeError:
-                self._stdout = ''
+            self._stdout = self._testcase.system_out
 
         return self._stdout
 
@@ -214,10 +286,10 @@ class _ZigZagTestLog(object):
         """Gets the errors form the testcase_xml
 
         Returns:
-            list: the list of errors found
+            list(str): the messages of the errors found
         """
         if self._errors is None:
-            self._errors = self._testcase_xml.findall('error')
+            self._errors = self._testcase.errors
 
         return self._errors
 
@@ -226,10 +298,10 @@ class _ZigZagTestLog(object):
         """Gets the failures from the testcase_xml
 
         Returns:
-            list: the list of failures found
+            list(str): the messages of the failures found
         """
         if self._failures is None:
-            self._failures = self._testcase_xml.findall('failure')
+            self._failures = self._testcase.failures
 
         return self._failures
 
@@ -244,7 +316,7 @@ class _ZigZagTestLog(object):
             possible_messages = self.errors + self.failures
             if len(possible_messages):
                 if self.test_run_failure_output_field_id is not None:
-                    message = "\n".join([element.text for element in possible_messages if element is not None])
+                    message = "\n".join([text for text in possible_messages if text is not None])
                     self._full_failure_output = message
             else:
                 self._full_failure_output = ''  # hard code this to empty string
@@ -260,7 +332,7 @@ class _ZigZagTestLog(object):
         if self._start_date is None:
             try:
                 self._start_date = self._find_property('start_time')
-            except AttributeError:
+            except KeyError:
                 self._start_date = self._date_time_now.strftime(self._date_time_format)
 
         return self._start_date
@@ -275,7 +347,7 @@ class _ZigZagTestLog(object):
         if self._end_date is None:
             try:
                 self._end_date = self._find_property('end_time')
-            except AttributeError:
+            except KeyError:
                 self._end_date = self._date_time_now.strftime(self._date_time_format)
 
         return self._end_date
@@ -290,7 +362,7 @@ class _ZigZagTestLog(object):
         if self._automation_content is None:
             try:
                 self._automation_content = self._find_property('test_id')
-            except AttributeError:
+            except KeyError:
                 message = "Test case '{}' is missing the required property! automation content".format(self._name)
                 raise ZigZagTestLogError(message)
         return self._automation_content
@@ -334,7 +406,7 @@ class _ZigZagTestLog(object):
             str: the file containing the test that generated the xml
         """
         if self._test_file is None:
-            self._test_file = self._testcase_xml.attrib['file']
+            self._test_file = self._testcase.require('file')
 
         return self._test_file
 
@@ -346,7 +418,7 @@ class _ZigZagTestLog(object):
             str: the classname of the test
         """
         if self._classname is None:
-            self._classname = self._testcase_xml.attrib['classname']
+            self._classname = self._testcase.require('classname')
 
         return self._classname
 
@@ -358,7 +430,7 @@ class _ZigZagTestLog(object):
             str: the sting that is the def_line_number
         """
         if self._def_line_number is None:
-            self._def_line_number = self._testcase_xml.attrib['line']
+            self._def_line_number = self._testcase.require('line')
 
         return self._def_line_number
 
@@ -400,6 +472,7 @@ class _ZigZagTestLog(object):
     @property
     def qtest_attachment_list(self):
         """Gets the list of qtest attachments
+        The JUnitXML file is only part of this list when it is configured to be attached to every test log.
 
         Returns:
             list: the list of swagger_client.AttachmentResource
@@ -407,35 +480,44 @@ class _ZigZagTestLog(object):
 
         attachments = []
 
-        if self._qtest_attachment_list is None:
-            attachment_suffix = self._date_time_now.strftime('%Y-%m-%dT%H-%M')
-            encoded_xml = b64encode(self._mediator.serialized_junit_xml).decode('UTF-8')
+        if self._mediator.junit_xml_attachment_mode == 'log' and self._mediator.qtest_junit_xml_attachment:
+            attachments.append(self._mediator.qtest_junit_xml_attachment)
+        attachments.extend(self.qtest_output_attachment_list)
+
+        return attachments
+
+    @property
+    def qtest_output_attachment_list(self):
+        """Gets the list of qtest attachments for the output captured by this test log
+
+        Returns:
+            list: the list of swagger_client.AttachmentResource
+        """
+
+        attachments = []
+
+        attachment_suffix = self._date_time_now.strftime('%Y-%m-%dT%H-%M')
+        if self.full_failure_output:
+            encoded_output = b64encode(self.full_failure_output.encode('UTF-8')).decode('UTF-8')
+            attachments.append(
+                swagger_client.AttachmentResource(name="failure_output_{}.txt".format(attachment_suffix),
+                                                  content_type='text/plain',
+                                                  data=encoded_output,
+                                                  author={}))
+        if self.status == 'FAILED' and self.stderr:
+            encoded_stderr = b64encode(self.stderr.encode('UTF-8')).decode('UTF-8')
+            attachments.append(
+                swagger_client.AttachmentResource(name="stderr_{}.txt".format(attachment_suffix),
+                                                  content_type='text/plain',
+                                                  data=encoded_stderr,
+                                                  author={}))
+        if self.status == 'FAILED' and self.stdout:
+            encoded_stdout = b64encode(self.stdout.encode('UTF-8')).decode('UTF-8')
             attachments.append(
-                swagger_client.AttachmentResource(name="junit_{}.xml".format(attachment_suffix),
-                                                  content_type='application/xml',
-                                                  data=encoded_xml,
+                swagger_client.AttachmentResource(name="stdout_{}.txt".format(attachment_suffix),
+                                                  content_type='text/plain',
+                                                  data=encoded_stdout,
                                                   author={}))
-            if self.full_failure_output:
-                encoded_output = b64encode(self.full_failure_output.encode('UTF-8')).decode('UTF-8')
-                attachments.append(
-                    swagger_client.AttachmentResource(name="failure_output_{}.txt".format(attachment_suffix),
-                                                      content_type='text/plain',
-                                                      data=encoded_output,
-                                                      author={}))
-            if self.status == 'FAILED' and self.stderr:
-                encoded_stderr = b64encode(self.stderr.encode('UTF-8')).decode('UTF-8')
-                attachments.append(
-                    swagger_client.AttachmentResource(name="stderr_{}.txt".format(attachment_suffix),
-                                                      content_type='text/plain',
-                                                      data=encoded_stderr,
-                                                      author={}))
-            if self.status == 'FAILED' and self.stdout:
-                encoded_stdout = b64encode(self.stdout.encode('UTF-8')).decode('UTF-8')
-                attachments.append(
-                    swagger_client.AttachmentResource(name="stdout_{}.txt".format(attachment_suffix),
-                                                      content_type='text/plain',
-                                                      data=encoded_stdout,
-                                                      author={}))
 
         return attachments
 
@@ -508,39 +590,11 @@ class _ZigZagTestLog(object):
 
         Returns:
             str: The value of the property
-        """
-        return self._testcase_xml.find("./properties/property/[@name='{}']".format(name)).attrib['value']
-
-    def _lookup_ids(self):
-        """Search for testcase id by automation content
 
-        Using the 'requests' library gets us around the bugs in the Swagger client
-        If the API response contains no items _qtest_testcase_id will be None
+        Raises:
+            KeyError: The test case does not have the property
         """
-        headers = {'Authorization': self._mediator.qtest_api_token,
-                   'Content-Type': 'application/json'}
-        endpoint = "https://apitryout.qtestnet.com/api/v3/projects/{}/search?pageSize=100&page=1".format(
-            self._mediator.qtest_project_id
-        )
-        body = {
-            "object_type": "test-cases",
-            "fields": [
-                "id"
-            ],
-            "query": "'Automation Content' = '{}'".format(self.automation_content)
-        }
-        try:
-            r = requests.post(endpoint, data=json.dumps(body), headers=headers)
-            r.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError("The qTest API reported an error!\n"
-                               "Status code: {}\n"
-                               "Reason: {}\n".format(e.response.status_code, e.response.reason))
-        parsed = json.loads(r.text)
-        try:
-            self._qtest_testcase_id = parsed['items'][0]['id']
-        except IndexError:  # test case has not been created yet in qTest
-            pass
+        return self._testcase.require(name)
 
     def _lookup_test_execution_parameters(self, delimiter):
         """ Finds the array of job config attributes on the end of the job name. In some cases,
@@ -550,53 +604,11 @@ class _ZigZagTestLog(object):
         Returns:
             List: of job config attributes.
         """
-        full_name = self._testcase_xml.attrib['name']
+        full_name = self._testcase.require('name')
         delimited_list = full_name[full_name.find("[")+1:full_name.find("]")]
         test_execution_parameter_list = delimited_list.split(delimiter) if "[" in full_name else []
         return test_execution_parameter_list
 
-    def _lookup_requirements(self):
-        """finds an exact matches for all requirements imported from jira associated with this log
-        The Jira id is stored on a requirements name ex: 'PRO-18404 Zach's requirement'
-
-        Using the 'requests' library gets us around the bugs in the Swagger client
-        If the API response contains no items _qtest_requirements will be an empty list
-        """
-        for jira_id in self.jira_issues:
-            headers = {'Authorization': self._mediator.qtest_api_token,
-                       'Content-Type': 'application/json'}
-            endpoint = "https://apitryout.qtestnet.com/api/v3/projects/{}/search?pageSize=100&page=1".format(
-                self._mediator.qtest_project_id
-            )
-            query = "'name' ~ '{}'".format(jira_id)
-            body = {
-                "object_type": "requirements",
-                "fields": [
-                    "id",
-                    "name"
-                ],
-                "query": "{}".format(query)
-            }
-            try:
-                r = requests.post(endpoint, data=json.dumps(body), headers=headers)
-                r.raise_for_status()
-                parsed = json.loads(r.text)
-            except requests.exceptions.RequestException as e:
-                # noinspection PyUnresolvedReferences
-                raise RuntimeError("The qTest API reported an error!\n"
-                                   "Status code: {}\n"
-                                   "Reason: {}\n"
-                                   "Message: {}".format(e.status, e.reason, e.body))
-            exact_jira_regex = re.compile(r'([a-zA-Z]+-\d+)')
-            if not self._qtest_requirements:
-                self._qtest_requirements = []
-            if parsed['total'] == 1:
-                self._qtest_requirements.append(parsed['items'][0]['id'])
-            elif parsed['total'] > 1:
-                for requirement in parsed['items']:
-                    if exact_jira_regex.match(requirement['name']).group(1) == jira_id:
-                        self._qtest_requirements.append(requirement['id'])
-
     @classmethod
     def _get_test_run_failure_output_field_id(cls, mediator):
         """Gets the test_run_failure_output_field_id from this class
@@ -609,7 +621,7 @@ class _ZigZagTestLog(object):
         """
         if cls._test_run_failure_output_field_id == 0:
             cls._test_run_failure_output_field_id = \
-                UtilityFacade(mediator).find_custom_field_id_by_label('Failure Output', 'test-runs')
+                mediator.utility_facade.find_custom_field_id_by_label('Failure Output', 'test-runs')
         return cls._test_run_failure_output_field_id
 
     @classmethod
@@ -626,7 +638,7 @@ class _ZigZagTestLog(object):
             cls._fields = {}
             for prop, value in list(mediator.testsuite_props.items()):
                 f = {
-                    'id': UtilityFacade(mediator).find_custom_field_id_by_label(prop, 'test-runs'),
+                    'id': mediator.utility_facade.find_custom_field_id_by_label(prop, 'test-runs'),
                     'name': prop,
                     'value': value
                 }
@@ -659,7 +671,7 @@ class _ZigZagTestLog(object):
         """
         if cls._failure_link_field_id == 0:
             cls._failure_link_field_id = \
-                UtilityFacade(mediator).find_custom_field_id_by_label('Failure Link', 'test-runs')
+                mediator.utility_facade.find_custom_field_id_by_label('Failure Link', 'test-runs')
         return cls._failure_link_field_id
 
     @classmethod
@@ -674,30 +686,28 @@ class _ZigZagTestLog(object):
         """
         if cls._test_sha_field_id == 0:
             cls._test_sha_field_id = \
-                UtilityFacade(mediator).find_custom_field_id_by_label('Test SHA', 'test-runs')
+                mediator.utility_facade.find_custom_field_id_by_label('Test SHA', 'test-runs')
         return cls._test_sha_field_id
 
 
 class _ZigZagTestLogWithSteps(_ZigZagTestLog):
-    def __init__(self, testcase_name, teststeps_xml, mediator):
+    def __init__(self, testcase_name, test_step_logs, mediator):
         """Create a TestLog object that contains steps.
 
         Args:
             testcase_name (str): The name of the test case.
-            teststeps_xml (list(ElementTree)): A list of JUnit style testcase XML elements representing test steps for
-                a single qTest test log.
+            test_step_logs (list(_ZigZagTestLog)): The test logs of the JUnit style testcase XML elements representing
+                test steps for a single qTest test log.
             mediator (ZigZag): The mediator that stores shared data.
         """
 
-        super(_ZigZagTestLogWithSteps, self).__init__(teststeps_xml[0], mediator)
-
-        self._name = testcase_name
-        self._teststeps_xml = teststeps_xml
-        self._zz_test_step_logs = []
+        self._zz_test_step_logs = test_step_logs
         self._qtest_test_step_logs = []
 
-        # Convert the test steps into test logs for easier post-processing.
-        self._zz_test_step_logs = [_ZigZagTestLog(ts_xml, self._mediator) for ts_xml in self._teststeps_xml]
+        super(_ZigZagTestLogWithSteps, self).__init__(None, mediator)
+
+        self._name = testcase_name
+        self._testcase = test_step_logs[0]._testcase  # the test case reads the same XML as its first step
 
     @property
     def errors(self):
@@ -853,7 +863,7 @@ class _ZigZagTestLogWithSteps(_ZigZagTestLog):
         """
         if self._classname is None:
             # Get tricky with the classname by reading the first step and stripping the test name.
-            self._classname = self._teststeps_xml[0].attrib['classname'].replace(".{}".format(self.name), '')
+            self._classname = self._zz_test_step_logs[0].classname.replace(".{}".format(self.name), '')
 
         return self._classname
 
@@ -887,7 +897,7 @@ class _ZigZagTestLogWithSteps(_ZigZagTestLog):
             qtest_test_step_log.expected_result = 'pass'
             if zz_test_step_log.status == 'FAILED':
                 # Attach the failure log along with stderr and stdout to the test step if the exist.
-                qtest_test_step_log.attachments = zz_test_step_log.qtest_test_log.attachments[1:]
+                qtest_test_step_log.attachments = zz_test_step_log.qtest_output_attachment_list
                 qtest_test_step_log.actual_result = zz_test_step_log.failure_output
             else:
                 qtest_test_step_log.actual_result = qtest_test_step_log.status
@@ -897,18 +907,26 @@ class _ZigZagTestLogWithSteps(_ZigZagTestLog):
 
 
 class ZigZagTestLogs(Sequence):
-    def __init__(self, mediator):
+    def __init__(self, mediator, testcases_xml=None):
         """Create test logs.
 
         Args:
             mediator (ZigZag): The mediator that stores shared data.
+            testcases_xml (iter(ElementTree)): An optional iterable of JUnit style testcase XML elements to build the
+                test logs from incrementally. (Defaults to every testcase in the 'junit_xml' of the mediator)
         """
 
         self._mediator = mediator
         self._test_logs = []
+        self._test_step_logs = {}
+        self._test_logs_without_steps = []
 
+        if testcases_xml is None:
+            testcases_xml = self._mediator.junit_xml.iter('testcase')
+
+        self._index_test_cases(testcases_xml)
         self._parse_test_cases_with_steps()
-        self._parse_test_cases_without_steps()
+        self._test_logs.extend(self._test_logs_without_steps)
 
         self._mediator.test_logs = self
 
@@ -971,52 +989,43 @@ class ZigZagTestLogs(Sequence):
         return len(self._test_logs)
 
     def _parse_test_cases_with_steps(self):
-        """Parse the JUnitXML for test cases that are marked as steps."""
-
-        tc_group_rgx = self._mediator.utility_facade.testcase_group_rgx
-        testcases_with_steps_xml = {}
+        """Group the indexed test steps into a test log per test case."""
 
-        for testcase_xml in self._find_test_step_test_cases(True):
-            tc_name = tc_group_rgx.search(testcase_xml.attrib['classname']).group(2)
-
-            if tc_name in testcases_with_steps_xml:
-                testcases_with_steps_xml[tc_name].append(testcase_xml)
-            else:
-                testcases_with_steps_xml[tc_name] = [testcase_xml]
+        for tc_name in self._test_step_logs:
+            self._test_logs.append(_ZigZagTestLogWithSteps(tc_name,
+                                                           self._test_step_logs[tc_name],
+                                                           self._mediator))
 
-        for tc_name in testcases_with_steps_xml:
-            self._test_logs.append(_ZigZagTestLogWithSteps(tc_name, testcases_with_steps_xml[tc_name], self._mediator))
-
-    def _parse_test_cases_without_steps(self):
-        """Parse the JUnitXML for test cases that are NOT marked as steps."""
-
-        for testcase_xml in self._find_test_step_test_cases(False):
-            try:
-                self._test_logs.append(_ZigZagTestLog(testcase_xml, self._mediator))
-            except ZigZagTestLogError:
-                pass  # TODO log this error because we cant process this log
-
-    def _find_test_step_test_cases(self, test_step_property_value):
-        """Find test_step testcases
+    def _index_test_cases(self, testcases_xml):
+        """Sort test cases into test steps grouped by test case name and test cases without steps in a single pass.
+        Test cases that do not implement the 'test_step' property are ignored.
+        The test log of every test case is created as soon as it is read so no XML element is kept after its test log
+        was created.
 
         Args:
-            test_step_property_value (bool): the value to look for
-
-        Returns:
-            list: the list of testcases
+            testcases_xml (iter(ElementTree)): An iterable of JUnit style testcase XML elements.
 
         Raises:
-            ZigZagTestLogError: when a case is found that does not implement test_steps
+            ZigZagTestLogError: when none of the test cases implement test_steps
         """
 
-        testcases_with_steps_xpath = ".//property/[@name='test_step'][@value='{}']/../..".format(
-            str(test_step_property_value).lower()
-        )
-        implements_test_step = ".//property/[@name='test_step']/../.."
-        if not self._mediator.junit_xml.findall(implements_test_step):
+        tc_group_rgx = self._mediator.utility_facade.testcase_group_rgx
+        implements_test_step = False
+
+        for testcase_xml in testcases_xml:
+            test_step = testcase_xml.find("./properties/property[@name='test_step']")
+            if test_step is None:
+                continue
+
+            implements_test_step = True
+            if test_step.attrib['value'] == 'true':
+                tc_name = tc_group_rgx.search(testcase_xml.attrib['classname']).group(2)
+                self._test_step_logs.setdefault(tc_name, []).append(_ZigZagTestLog(testcase_xml, self._mediator))
+            elif test_step.attrib['value'] == 'false':
+                self._test_logs_without_steps.append(_ZigZagTestLog(testcase_xml, self._mediator))
+
+        if not implements_test_step:
             raise ZigZagTestLogError('Test found without test_step property')
-        else:
-            return self._mediator.junit_xml.findall(testcases_with_steps_xpath)
 
 
 class ZigZagTestLogError(Exception):